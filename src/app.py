@@ -1,4 +1,5 @@
 import ipaddress
+from threading import Thread, Lock
 
 from flask import Flask, Blueprint, render_template_string, request, abort, Response
 from flask_cors import CORS
@@ -11,15 +12,38 @@ from src.apps.auth_endpoint import ns_auth
 from src.apps.metric_endpoint import ns_metrics
 from src.apps.test_endpoint import ns_test
 from src.apps.user_endpoint import ns_user
+from src.helpers.cache.cache_warmup import warmup_cache
+from src.helpers.externapi.externapi_scheduler import ExternApiScheduler
 from src.lib.configuration.configuration import get_env_var, config
 from src.lib.exception.exception_handler import register_error_handlers
 from src.lib.utility.utils_server import RequestUtility
+from src.models.article.article_suggest_model import ARTICLE_TITLE_SUGGESTER
 from src.models.init_model import init_all_model
 
 ALLOWED_NETWORKS = config.swagger_allowed_hosts
 
 init_all_model()
 
+_background_jobs_lock = Lock()
+_background_jobs_started = False
+
+
+def start_background_jobs():
+    """
+    Cache warm-up, title suggester and in-process scheduler, started once per process by
+    the first request it serves: importing the app (tools, tests) starts nothing.
+    """
+    global _background_jobs_started
+    with _background_jobs_lock:
+        if _background_jobs_started:
+            return
+        _background_jobs_started = True
+
+    Thread(target=warmup_cache, kwargs={"lock": True}, daemon=True).start()
+    ARTICLE_TITLE_SUGGESTER.build_in_background()
+    if ExternApiScheduler.in_process:
+        ExternApiScheduler.start_in_background()
+
 def create_app():
     app = Flask(__name__)
 
@@ -68,6 +92,10 @@ def create_app():
     """
 
 
+    @app.before_request
+    def start_jobs():
+        start_background_jobs()
+
     @app.before_request
     def restrict_swagger_access():
         RequestUtility.print_info_request(request)
@@ -7,6 +7,9 @@ from src.apps import token_required
 from src.lib.configuration.configuration import config_manager
 from src.lib.exception.exception_server import NotFoundException
 from src.models.article.article_model import ArticleModel
+from src.models.article.article_readers_model import ArticleReadersModel
+from src.models.article.article_recommendation_model import ArticleCollaborativeFilter
+from src.models.article.article_similar_model import ArticleSimilarityJob
 from src.models.article.comment_model import CommentModel
 from src.models.article.user_article_interaction_models import ArticleInteractionDashboard, UserArticleInteractionModel
 from src.models.model import Model
@@ -180,6 +183,7 @@ class AdminDashboardSummary(Resource):
             'total_users': fields.Integer(required=False),
             'total_interactions': fields.Integer(required=False),
             'total_errors': fields.Integer(required=False),
+            'total_unique_readers': fields.Integer(required=False),
         }), code=200)
     def get(self):
         after_date_arg = request.args.get('after_date', default='', type=str)
@@ -208,13 +212,18 @@ class AdminDashboardSummary(Resource):
         total_users = User.get_all_count(user_token, after_date=after_date, before_date=before_date)
         total_interactions = UserArticleInteractionModel.get_all_count(user_token, after_date=after_date, before_date=before_date)
         total_errors = ServerErrorLogModel.get_all_count(user_token, after_date=after_date, before_date=before_date)
+        total_unique_readers = ArticleReadersModel.count_unique_readers(
+            start=after_date.date() if after_date else datetime.date.min,
+            end=(before_date - datetime.timedelta(days=1)).date() if before_date else None
+        )
 
         return {
             "total_articles": total_articles,
             "total_comments": total_comments,
             "total_users": total_users,
             "total_interactions": total_interactions,
-            "total_errors": total_errors
+            "total_errors": total_errors,
+            "total_unique_readers": total_unique_readers,
         }
 
 @ns_admin.route('/dashboard/top-articles')
@@ -236,13 +245,32 @@ class AdminDashboardTopArticles(Resource):
         else:
             date = (datetime.datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
 
+        limit_arg = request.args.get('limit', default=5, type=int)
+        limit = limit_arg if limit_arg > 0 else 5
+
         user_token: UserToken = g.user
 
-        articles_stat = ArticleInteractionDashboard.get_most_interacted_articles(date_check=date)
+        articles_stat = ArticleInteractionDashboard.get_most_interacted_articles(date_check=date, limit=limit)
 
         return [article.to_json() for article in articles_stat]
 
 
+@ns_admin.route('/dashboard/unique-readers')
+@ns_admin.param('article_id', 'The article ID (whole site if missing)')
+class AdminDashboardUniqueReaders(Resource):
+
+    @token_required
+    @ns_admin.marshal_with(ArticleReadersModel.to_model(name_space=ns_admin), code=200)
+    def get(self):
+        article_id = request.args.get('article_id', default=None, type=str)
+
+        user_token: UserToken = g.user
+
+        readers = ArticleReadersModel.get_stats(article_id=article_id)
+
+        return readers.to_json()
+
+
 @ns_admin.route('/dashboard/top-tags')
 class AdminDashboardTopTags(Resource):
 
@@ -268,6 +296,71 @@ class AdminDashboardActivity(Resource):
         user_token: UserToken = g.user
 
 
+# Manages ingestion
+
+
+@ns_admin.route('/dedup')
+class AdminDedupFilter(Resource):
+
+    @token_required
+    def get(self):
+        user_token: UserToken = g.user
+
+        return ArticleModel.dedup_filter_stats()
+
+
+@ns_admin.route('/dedup/rebuild')
+class AdminDedupFilterRebuild(Resource):
+
+    @token_required
+    @ns_admin.marshal_with(Model.get_message_response_model(name_space=ns_admin), code=200)
+    def post(self):
+        user_token: UserToken = g.user
+
+        ArticleModel.rebuild_dedup_filter_in_background()
+
+        return {"success": True, "message": "Rebuild started"}
+
+
+@ns_admin.route('/search/rebuild')
+class AdminSearchIndexRebuild(Resource):
+
+    @token_required
+    @ns_admin.marshal_with(Model.get_message_response_model(name_space=ns_admin), code=200)
+    def post(self):
+        user_token: UserToken = g.user
+
+        ArticleModel.rebuild_search_index_in_background()
+
+        return {"success": True, "message": "Rebuild started"}
+
+
+@ns_admin.route('/similar/rebuild')
+class AdminSimilarArticlesRebuild(Resource):
+
+    @token_required
+    @ns_admin.marshal_with(Model.get_message_response_model(name_space=ns_admin), code=200)
+    def post(self):
+        user_token: UserToken = g.user
+
+        ArticleSimilarityJob.run_in_background(rebuild=True)
+
+        return {"success": True, "message": "Rebuild started"}
+
+
+@ns_admin.route('/recommendation/rebuild')
+class AdminRecommendationRebuild(Resource):
+
+    @token_required
+    @ns_admin.marshal_with(Model.get_message_response_model(name_space=ns_admin), code=200)
+    def post(self):
+        user_token: UserToken = g.user
+
+        ArticleCollaborativeFilter.run_in_background()
+
+        return {"success": True, "message": "Rebuild started"}
+
+
 # Manages errors
 
 
@@ -1,15 +1,25 @@
+from bson import ObjectId
 from flask import g, request
 from flask_restx import Namespace, Resource
 
 from src.apps import token_required
 from src.lib.exception.exception_server import NotFoundException, UnauthorizedException
+from src.models.article.article_facet_model import ArticleFacetFilter
+from src.models.article.article_feed_model import ArticleFeedRanker
+from src.models.article.article_inbox_model import ArticleInbox
 from src.models.article.article_model import ArticleSummaryModel, ArticleModel, ArticleWithInteractionModel, \
     ArticleTagsModel, ArticleSearchModel
+from src.models.article.article_recommendation_model import ArticleCollaborativeFilter
+from src.models.article.article_similar_model import ArticleSimilarityJob, ArticleSimilarModel
+from src.models.article.article_story_model import ArticleStoryClusterer, ArticleStoryModel
+from src.models.article.article_suggest_model import ARTICLE_TITLE_SUGGESTER, ArticleSuggestionModel
 from src.models.article.comment_model import CommentModel, CommentDetailsModel
+from src.models.article.tag_graph_model import TagGraph
 from src.models.article.user_article_interaction_models import UserArticleInteractionModel, UserArticleInteraction, \
     ArticleInteractionStatus, ArticleInteractionType
 from src.models.model import Model
 from src.models.user.auth_model import UserToken
+from src.models.user.user_tag_affinity_model import UserTagAffinity
 from src.models.user.user_model import UserAuthor, User
 
 ns_article = Namespace('article', description='Article endpoint')
@@ -23,9 +33,9 @@ class ArticleTags(Resource):
     def get(self):
         user_token: UserToken = g.user
 
-        tags = ArticleModel.get_all_tags(user_token)
+        tags = ArticleModel.search_tags(user_token)
 
-        result = ArticleTagsModel(tags=tags)
+        result = ArticleTagsModel.from_tags(tags)
 
         return result.to_json()
 
@@ -37,18 +47,65 @@ class ArticleTags(Resource):
 
         data = request.get_json()
         search = data.get('search', None)
+        limit = data.get('limit', None)
 
-        tags = ArticleModel.get_all_tags(user_token, search=search)
+        tags = ArticleModel.search_tags(user_token, search=search, limit=limit if isinstance(limit, int) and limit > 0 else None)
 
-        result = ArticleTagsModel(tags=tags)
+        result = ArticleTagsModel.from_tags(tags)
 
         return result.to_json()
 
 
 
+@ns_article.route('/tags/related')
+@ns_article.param('tag', 'The tag')
+@ns_article.param('limit', 'Number of tags to return')
+class RelatedTagsResource(Resource):
+
+    @token_required
+    @ns_article.marshal_with(ArticleTagsModel.to_model(name_space=ns_article), code=200)
+    def get(self):
+        tag_arg = request.args.get('tag', default='', type=str)
+        limit_arg = request.args.get('limit', default=10, type=int)
+
+        limit = limit_arg if 0 < limit_arg <= 50 else 10
+
+        user_token: UserToken = g.user
+
+        if not tag_arg.strip():
+            return ArticleTagsModel().to_json()
+
+        return ArticleTagsModel.from_counts(TagGraph.related_tags(tag_arg, limit=limit)).to_json()
+
+
+@ns_article.route('/tags/suggested')
+@ns_article.param('limit', 'Number of tags to return')
+class SuggestedTagsResource(Resource):
+
+    @token_required
+    @ns_article.marshal_with(ArticleTagsModel.to_model(name_space=ns_article), code=200)
+    def get(self):
+        limit_arg = request.args.get('limit', default=10, type=int)
+
+        limit = limit_arg if 0 < limit_arg <= 50 else 10
+
+        user_token: UserToken = g.user
+
+        user = User.get(user_token, user_token.user_id)
+
+        preferences = user.preferences if user and user.preferences else UserTagAffinity.top_tags(user_token.user_id)
+
+        return ArticleTagsModel.from_counts(TagGraph.suggest_tags(preferences, limit=limit)).to_json()
+
+
 @ns_article.route('/latest')
 @ns_article.param('page', 'Page')
 @ns_article.param('limit', 'Number of articles to return')
+@ns_article.param('extern_api', 'Filter on the provider')
+@ns_article.param('source', 'Filter on the source name')
+@ns_article.param('language', 'Filter on the language')
+@ns_article.param('country', 'Filter on the country')
+@ns_article.param('tag', 'Filter on a tag')
 class LatestArticleResource(Resource):
 
     @token_required
@@ -64,12 +121,23 @@ class LatestArticleResource(Resource):
 
         user = User.get(user_token, user_token.user_id)
 
-        if user.preferences_enable and user.preferences:
-            total = ArticleModel.last_articles_count(user_token, preferences=user.preferences)
-            articles = ArticleModel.last_articles(user_token, preferences=user.preferences, page=page, limit=limit)
+        facets = ArticleFacetFilter.from_args(request.args)
+
+        # implicit preferences, learned from the reads and likes, when the explicit ones are off
+        automatic_preferences = UserTagAffinity.top_tags(user_token.user_id) if not user.preferences_enable else []
+
+        if user.preferences_enable and user.preferences and not facets and ArticleInbox.enabled:
+            articles, total = ArticleModel.inbox_articles(user_token, user.preferences, page=page, limit=limit)
+        elif user.preferences_enable and user.preferences and not facets:
+            articles, total = ArticleFeedRanker.feed(user_token.user_id, user.preferences, page=page, limit=limit)
+        elif automatic_preferences and not facets:
+            articles, total = ArticleFeedRanker.feed(user_token.user_id, automatic_preferences, page=page, limit=limit)
+        elif user.preferences_enable and user.preferences:
+            total = ArticleModel.last_articles_count(user_token, preferences=user.preferences, facets=facets)
+            articles = ArticleModel.last_articles(user_token, preferences=user.preferences, page=page, limit=limit, facets=facets)
         else:
-            total = ArticleModel.last_articles_count(user_token)
-            articles = ArticleModel.last_articles(user_token, page=page, limit=limit)
+            total = ArticleModel.last_articles_count(user_token, facets=facets)
+            articles = ArticleModel.last_articles(user_token, page=page, limit=limit, facets=facets)
 
         ArticleModel.cache_articles(user_token, articles=articles)
 
@@ -79,6 +147,7 @@ class LatestArticleResource(Resource):
             "page": page,
             "limit": limit,
             "pageCount": len(articles),
+            "facets": ArticleModel.get_facets(user_token).to_json(),
         }
 
 
@@ -86,6 +155,11 @@ class LatestArticleResource(Resource):
 @ns_article.param('q', 'Query search')
 @ns_article.param('page', 'Page')
 @ns_article.param('limit', 'Number of articles to return')
+@ns_article.param('extern_api', 'Filter on the provider')
+@ns_article.param('source', 'Filter on the source name')
+@ns_article.param('language', 'Filter on the language')
+@ns_article.param('country', 'Filter on the country')
+@ns_article.param('tag', 'Filter on a tag')
 class SearchArticleResource(Resource):
 
     @token_required
@@ -101,8 +175,66 @@ class SearchArticleResource(Resource):
 
         user_token: UserToken = g.user
 
-        total = ArticleModel.search_articles_count(user_token, query=query)
-        articles = ArticleModel.search_articles(user_token, query=query, page=page, limit=limit)
+        facets = ArticleFacetFilter.from_args(request.args)
+
+        articles, total = ArticleModel.search_articles(user_token, query=query, page=page, limit=limit, facets=facets)
+
+        ArticleModel.cache_articles(user_token, articles=articles)
+
+        return {
+            "articles": [article.to_summary() for article in articles],
+            "total": total,
+            "page": page,
+            "limit": limit,
+            "pageCount": len(articles),
+            "facets": ArticleModel.get_facets(user_token).to_json(),
+        }
+
+
+@ns_article.route('/suggest')
+@ns_article.param('q', 'Beginning of the title')
+@ns_article.param('limit', 'Number of suggestions to return')
+class SuggestArticleResource(Resource):
+
+    @token_required
+    @ns_article.marshal_with(ArticleSuggestionModel.to_model_list(name_space=ns_article), code=200)
+    def get(self):
+        query_arg = request.args.get('q', default='', type=str)
+        limit_arg = request.args.get('limit', default=10, type=int)
+
+        limit = limit_arg if 0 < limit_arg <= 50 else 10
+
+        user_token: UserToken = g.user
+
+        suggestions = ARTICLE_TITLE_SUGGESTER.suggest_articles(query_arg, limit=limit)
+
+        return {
+            "suggestions": [suggestion.to_json() for suggestion in suggestions],
+        }
+
+
+@ns_article.route('/recommended')
+@ns_article.param('page', 'Page')
+@ns_article.param('limit', 'Number of articles to return')
+class RecommendedArticleResource(Resource):
+
+    @token_required
+    @ns_article.marshal_with(ArticleSummaryModel.to_model_list(name_space=ns_article), code=200)
+    def get(self):
+        page_arg = request.args.get('page', default=1, type=int)
+        limit_arg = request.args.get('limit', default=10, type=int)
+
+        page = page_arg if page_arg > 0 else 1
+        limit = limit_arg if limit_arg > 0 else 10
+
+        user_token: UserToken = g.user
+
+        articles, total = ArticleCollaborativeFilter.recommend(user_token.user_id, page=page, limit=limit)
+
+        if total == 0:
+            # no reading history yet (or no neighbours): latest articles
+            total = ArticleModel.last_articles_count(user_token)
+            articles = ArticleModel.last_articles(user_token, page=page, limit=limit)
 
         ArticleModel.cache_articles(user_token, articles=articles)
 
@@ -115,6 +247,58 @@ class SearchArticleResource(Resource):
         }
 
 
+@ns_article.route('/story/top')
+@ns_article.param('limit', 'Number of stories to return')
+class TopStoriesResource(Resource):
+
+    @token_required
+    @ns_article.marshal_with(ArticleStoryModel.to_model_list(name_space=ns_article), code=200)
+    def get(self):
+        limit_arg = request.args.get('limit', default=10, type=int)
+
+        limit = limit_arg if 0 < limit_arg <= 50 else 10
+
+        user_token: UserToken = g.user
+
+        stories = ArticleStoryClusterer.top_stories(limit=limit)
+
+        return {
+            "stories": [story.to_json() for story in stories],
+        }
+
+
+@ns_article.route('/story/<string:story_id>')
+@ns_article.param('story_id', 'The story ID')
+@ns_article.param('page', 'Page')
+@ns_article.param('limit', 'Number of articles to return')
+class StoryResource(Resource):
+
+    @token_required
+    @ns_article.marshal_with(ArticleStoryModel.to_model_details(name_space=ns_article), code=200)
+    def get(self, story_id):
+        page_arg = request.args.get('page', default=1, type=int)
+        limit_arg = request.args.get('limit', default=10, type=int)
+
+        page = page_arg if page_arg > 0 else 1
+        limit = limit_arg if limit_arg > 0 else 10
+
+        user_token: UserToken = g.user
+
+        result = ArticleStoryClusterer.get_story(story_id, page=page, limit=limit)
+        if result is None:
+            raise NotFoundException("Story not found")
+        story, articles = result
+
+        return {
+            "story": story.to_json(),
+            "articles": [article.to_summary() for article in articles],
+            "total": story.article_count,
+            "page": page,
+            "limit": limit,
+            "pageCount": len(articles),
+        }
+
+
 @ns_article.route('/history')
 @ns_article.param('page', 'Page')
 @ns_article.param('limit', 'Number of articles to return')
@@ -170,7 +354,8 @@ class ArticleSummaryResource(Resource):
         UserArticleInteractionModel.update_interaction_read(
             user_token=user_token,
             article_id=article_id,
-            article_title=article.title
+            article_title=article.title,
+            article_tags=article.tags
         )
 
         return article.to_json()
@@ -192,6 +377,31 @@ class ArticleSummaryResource(Resource):
         return article.to_summary()
 
 
+@ns_article.route('/<string:article_id>/similar')
+@ns_article.param('article_id', 'The article ID')
+@ns_article.param('limit', 'Number of articles to return')
+class ArticleSimilarResource(Resource):
+
+    @token_required
+    @ns_article.marshal_with(ArticleSimilarModel.to_model_list(name_space=ns_article))
+    def get(self, article_id):
+        limit_arg = request.args.get('limit', default=10, type=int)
+
+        limit = limit_arg if 0 < limit_arg <= ArticleSimilarityJob.top_k else 10
+
+        user_token: UserToken = g.user
+
+        if not ObjectId.is_valid(article_id):
+            raise NotFoundException("Article not found")
+
+        similar = ArticleSimilarityJob.get_similar(article_id, limit=limit)
+
+        return {
+            "article_id": article_id,
+            "similar": [item.to_json() for item in similar],
+        }
+
+
 @ns_article.route('/<string:article_id>/interaction')
 @ns_article.param('article_id', 'The article ID')
 class ArticleInteractionResource(Resource):
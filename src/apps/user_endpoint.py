@@ -3,7 +3,8 @@ from flask_restx import Namespace, Resource
 
 from src.apps import token_required
 from src.lib.authentication.auth_token import UserToken
-from src.models.article.article_model import ArticleModel
+from src.models.article.article_feed_model import ArticleFeedRanker
+from src.models.article.article_inbox_model import ArticleInbox
 from src.models.user.user_model import User, UserMe, UserMePreferences, Address
 
 ns_user = Namespace('user', description='User related operations')
@@ -78,13 +79,16 @@ class UserMePreferenceResource(Resource):
         user = User.get_directly(user_id=user_token.user_id)
         if user is None:
             return jsonify({"message": "Invalid user"}), 400
+        old_preferences = user.preferences if user.preferences_enable else []
         user.preferences = preferences
         user.preferences_enable = preferences_enable
 
         is_updated = user.update_user(user_token)
         if is_updated:
-            ArticleModel.scache_last_articles(user_token, preferences)
-            ArticleModel.scache_last_articles_count(user_token, preferences)
+            if ArticleInbox.enabled:
+                ArticleInbox.set_preferences(user_token.user_id, old_preferences, preferences, preferences_enable)
+            # the ranked feed is cached per user; the preference set feeds do not depend on the user
+            ArticleFeedRanker.scache_ranked(user_token.user_id)
             return user.to_preferences_json()
         return jsonify({"message": "Error during update"}), 400
 
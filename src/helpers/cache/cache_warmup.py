@@ -0,0 +1,101 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.log.api_logger import ApiLogger, EnumColor
+from src.models.article.article_model import ArticleModel
+from src.models.article.user_article_interaction_models import ArticleInteractionDashboard
+
+
+class CacheWarmup:
+    """
+    Pre-materialize the hottest cache entries so that the first users after a deploy
+    or an ingestion run do not pay the cold-miss cost.
+
+    Steps run by priority and the job stops as soon as the time budget is spent.
+    Preference feeds are not warmed: they are ranked per user (ArticleFeedRanker) or
+    pushed to the inboxes on insert (ArticleInbox).
+    """
+
+    def __init__(self
+                 , pages: int = 5
+                 , limit: int = 10
+                 , top_k: int = 10
+                 , time_budget: timedelta = timedelta(seconds=30)
+                 ):
+        self.pages = pages
+        self.limit = limit
+        self.top_k = top_k
+        self.time_budget = time_budget
+        self._deadline = None
+
+    def _has_time(self) -> bool:
+        return time.monotonic() < self._deadline
+
+    def warm_latest_feed(self) -> int:
+        return ArticleModel.prefetch_last_articles(pages=self.pages, limit=self.limit)
+
+    def warm_tags(self) -> int:
+        # article counts changed with the last ingestion: drop every cached tag search
+        ArticleModel.scache_all_tags()
+        tags = ArticleModel.get_all_tags(None, refresh=True)
+        return len(tags)
+
+    def warm_popular_articles(self) -> int:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        stats = ArticleInteractionDashboard.get_most_interacted_articles(date_check=today, limit=self.top_k, refresh=True)
+        return len(stats)
+
+    def run(self, lock: bool = False) -> dict:
+        # with several workers starting at once, only the first one warms the cache
+        if lock and not RedisManagerInstance.get_instance().set(key="cache:warmup:lock", value="1", ex=self.time_budget, nx=True):
+            ApiLogger(f"[CACHE] [WARMUP] already running in another process", color=EnumColor.ORANGE)
+            return {}
+
+        api_logger = ApiLogger(f"[CACHE] [WARMUP] : pages={self.pages}, limit={self.limit}, top k={self.top_k} and budget={self.time_budget}")
+
+        self._deadline = time.monotonic() + self.time_budget.total_seconds()
+
+        steps = [
+            ("latest_feed", self.warm_latest_feed),
+            ("tags", self.warm_tags),
+            ("popular_articles", self.warm_popular_articles),
+        ]
+
+        report = {}
+        for name, step in steps:
+            if not self._has_time():
+                ApiLogger(f"[CACHE] [WARMUP] time budget exhausted, skipping {name}", color=EnumColor.ORANGE)
+                report[name] = None
+                continue
+            try:
+                report[name] = step()
+            except Exception as e:
+                ApiLogger(f"[CACHE] [WARMUP] error during {name}: {e}", color=EnumColor.RED)
+                report[name] = None
+
+        api_logger.print_log(extend_message=f"report={report}")
+        return report
+
+
+def warmup_cache(time_budget: Optional[timedelta] = None, lock: bool = False) -> dict:
+    cache_warmup = CacheWarmup(time_budget=time_budget) if time_budget else CacheWarmup()
+    return cache_warmup.run(lock=lock)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Warm up the Redis cache")
+    parser.add_argument("--pages", type=int, default=5, help="Number of feed pages to materialize")
+    parser.add_argument("--limit", type=int, default=10, help="Articles per page")
+    parser.add_argument("--top-k", type=int, default=10, help="Number of popular articles to materialize")
+    parser.add_argument("--time-budget", type=int, default=30, help="Time budget in seconds")
+    args = parser.parse_args()
+
+    CacheWarmup(
+        pages=args.pages,
+        limit=args.limit,
+        top_k=args.top_k,
+        time_budget=timedelta(seconds=args.time_budget)
+    ).run()
@@ -1,16 +1,15 @@
-from typing import Optional, List
-
-import requests
+from datetime import datetime
+from typing import Optional, List, Iterator
 
 from src.helpers.externapi.externapi_base import ExternApiBase
 from src.lib.configuration import configuration
-from src.lib.log.api_logger import ApiLogger
 from src.models.article.article_model import ArticleModel, ArticleSourceModel
 
 
 # https://currentsapi.services/en/docs/
 class CurrentsAPI(ExternApiBase):
     api_name = "CurrentsAPI"
+    config_name = "currentsapi"
     base_url = "https://api.currentsapi.services/v1/latest-news"
     data_field = "news"
 
@@ -18,46 +17,35 @@ class CurrentsAPI(ExternApiBase):
         super().__init__(api_key)
         self.api_key = api_key if api_key else configuration.get_env_var("externapi.currentsapi.api_key")
 
-    def fetch_news(self) -> List[dict]:
+    def _fetch_pages(self, since: Optional[datetime], cursor=None) -> Iterator[List[dict]]:
         """
-        Fetch news from currents API.
+        Fetch news from currents API (latest news only: no date filter).
         """
-        if self.api_key:
-            api_log = ApiLogger(f"[EXTERN API] Retrieving news from {self.api_name} API.")
-
-            all_articles = []
-
-            headers = {
-                'Authorization': f'{self.api_key}'
-            }
-
-            response = requests.get(self.base_url, headers=headers)
-            status_code = response.status_code
-            response_data = response.json()
-            is_success = status_code == 200 and self.data_field in response_data
-
-            total_articles = None
-            fetched_count = len(response_data[self.data_field]) if status_code == 200 and self.data_field in response_data else None
-
-            self.log_request(
-                api_name=self.api_name,
-                url=self.base_url,
-                headers=headers,
-                params={},
-                status_code=status_code,
-                data=response_data,
-                total_articles=total_articles,
-                fetched_count=fetched_count,
-                is_success=is_success
-            )
-
-            if is_success:
-                all_articles.extend(response_data[self.data_field])
-
-            api_log.print_log(extend_message=f"Retrieved {len(all_articles)} articles")
-            return all_articles
+        headers = {
+            'Authorization': f'{self.api_key}'
+        }
+
+        status_code, response_data = self.get(self.base_url, headers=headers)
+        is_success = status_code == 200 and self.data_field in response_data
+
+        total_articles = None
+        fetched_count = len(response_data[self.data_field]) if status_code == 200 and self.data_field in response_data else None
+
+        self.log_request(
+            api_name=self.api_name,
+            url=self.base_url,
+            headers=headers,
+            params={},
+            status_code=status_code,
+            data=response_data,
+            total_articles=total_articles,
+            fetched_count=fetched_count,
+            is_success=is_success
+        )
 
-        return []
+        if is_success:
+            self.exhausted = True
+            yield response_data[self.data_field]
 
     @classmethod
     def to_article(cls, data: dict) -> ArticleModel:
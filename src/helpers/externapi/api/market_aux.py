@@ -1,7 +1,5 @@
-import time
-from typing import Optional, List
-
-import requests
+from datetime import datetime
+from typing import Optional, List, Iterator
 
 from src.helpers.externapi.externapi_base import ExternApiBase
 from src.lib.configuration import configuration
@@ -12,70 +10,63 @@ from src.models.article.article_model import ArticleModel, ArticleSourceModel
 # https://www.marketaux.com/documentation
 class MarketAux(ExternApiBase):
     api_name = "MarketAux"
+    config_name = "marketaux"
     base_url = "https://api.marketaux.com/v1/news/all"
     data_field = "data"
+    max_pages = 5
 
     def __init__(self, api_key: Optional[str] = None):
         super().__init__(api_key)
         self.api_key = api_key if api_key else configuration.get_env_var("externapi.marketaux.api_key")
 
-    def fetch_news(self) -> List[dict]:
+    def _fetch_pages(self, since: Optional[datetime], cursor=None) -> Iterator[List[dict]]:
         """
         Fetch news from Market Aux API.
         """
-        if self.api_key:
-            api_log = ApiLogger(f"[EXTERN API] Retrieving news from {self.api_name} API.")
-
-            all_articles = []
-
-            params = {
-                'api_token': f'{self.api_key}',
-                'limit': 100,
-                'page': 1
-            }
-
-            num_request = 0
-            while True:
-                num_request += 1
-                response = requests.get(self.base_url, params=params)
-                status_code = response.status_code
-                response_data = response.json()
-                is_success = status_code == 200 and self.data_field in response_data
-
-                fetched_count = len(response_data[self.data_field]) if status_code == 200 and self.data_field in response_data else None
-                total_articles = response_data['meta']['found'] if status_code == 200 and 'meta' in response_data else None
-
-                self.log_request(
-                    api_name=self.api_name,
-                    url=self.base_url,
-                    headers={},
-                    params=params,
-                    status_code=status_code,
-                    data=response_data,
-                    total_articles=total_articles,
-                    fetched_count=fetched_count,
-                    is_success=is_success
-                )
-
-                if response.status_code == 200 and self.data_field in response.json():
-                    all_articles.extend(response_data[self.data_field])
-
-                    params['page'] += 1
-                else:
-                    try:
-                        ApiLogger(f"Error while fetching news from {self.api_name} API: status code: {response.status_code} --- info {response.json()}", color=EnumColor.RED)
-                    except Exception as e:
-                        ApiLogger(f"Error while fetching news from {self.api_name} API: {e}", color=EnumColor.RED)
-                    break
-                if num_request >= 5:
+        params = {
+            'api_token': f'{self.api_key}',
+            'limit': 100,
+            'page': cursor or 1
+        }
+        if since:
+            params['published_after'] = since.strftime('%Y-%m-%dT%H:%M:%S')
+
+        num_request = 0
+        while True:
+            num_request += 1
+            status_code, response_data = self.get(self.base_url, params=params)
+            is_success = status_code == 200 and self.data_field in response_data
+
+            fetched_count = len(response_data[self.data_field]) if status_code == 200 and self.data_field in response_data else None
+            total_articles = response_data['meta']['found'] if status_code == 200 and 'meta' in response_data else None
+
+            self.log_request(
+                api_name=self.api_name,
+                url=self.base_url,
+                headers={},
+                params=params,
+                status_code=status_code,
+                data=response_data,
+                total_articles=total_articles,
+                fetched_count=fetched_count,
+                is_success=is_success
+            )
+
+            if is_success:
+                # the plan may return fewer articles per page than asked: meta.limit is the page size applied
+                meta = response_data.get('meta', {})
+                self.exhausted = not response_data[self.data_field] or params['page'] * meta.get('limit', params['limit']) >= meta.get('found', 0)
+                self.cursor = params['page'] + 1
+                yield response_data[self.data_field]
+
+                if self.exhausted:
                     break
-
-                time.sleep(1)
-
-            api_log.print_log(extend_message=f"Retrieved {len(all_articles)} articles")
-            return all_articles
-
-        return []
+                params['page'] += 1
+            else:
+                ApiLogger(f"Error while fetching news from {self.api_name} API: status code: {status_code} --- info {response_data}", color=EnumColor.RED)
+                break
+            if num_request >= self.max_pages:
+                break
 
     @classmethod
     def to_article(cls, data: dict) -> ArticleModel:
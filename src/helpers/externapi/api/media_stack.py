@@ -1,17 +1,16 @@
-import time
-from typing import Optional, List
-
-import requests
+import math
+from datetime import datetime, timezone
+from typing import Optional, List, Iterator
 
 from src.helpers.externapi.externapi_base import ExternApiBase
 from src.lib.configuration import configuration
-from src.lib.log.api_logger import ApiLogger
 from src.models.article.article_model import ArticleModel, ArticleSourceModel
 
 
 # https://mediastack.com
 class MediaStack(ExternApiBase):
     api_name = "MediaStack"
+    config_name = "mediastack"
     base_url = "https://api.mediastack.com/v1/news"
     data_field = "data"
     limit = 100
@@ -20,56 +19,48 @@ class MediaStack(ExternApiBase):
         super().__init__(api_key)
         self.api_key = api_key if api_key else configuration.get_env_var("externapi.mediastack.access_key")
 
-    def fetch_news(self) -> List[dict]:
+    def _fetch_pages(self, since: Optional[datetime], cursor=None) -> Iterator[List[dict]]:
         """
         Fetch news from MediaStack API.
         """
-        if self.api_key:
-            api_log = ApiLogger(f"[EXTERN API] Retrieving news from {self.api_name} API.")
-
-            all_articles = []
-            params = {
-                "access_key": self.api_key,
-                "limit": self.limit,
-                "offset": 0,
-                "sort": "published_desc"
-            }
-            while True:
-                response = requests.get(self.base_url, params=params)
-                status_code = response.status_code
-                response_data = response.json()
-                is_success = status_code == 200 and self.data_field in response_data
-
-                fetched_count = len(response_data[self.data_field]) if status_code == 200 and self.data_field in response_data else None
-                total_articles = response_data['pagination']['total'] if status_code == 200 and 'pagination' in response_data else None
-
-                self.log_request(
-                    api_name=self.api_name,
-                    url=self.base_url,
-                    headers={},
-                    params=params,
-                    status_code=status_code,
-                    data=response_data,
-                    total_articles=total_articles,
-                    fetched_count=fetched_count,
-                    is_success=is_success
-                )
-
-                if is_success:
-                    all_articles.extend(response_data[self.data_field])
-
-                    params["offset"] += self.limit
-                    if params["offset"] >= response_data["pagination"]["total"]:
-                        break
-                else:
+        params = {
+            "access_key": self.api_key,
+            "limit": self.limit,
+            "offset": cursor or 0,
+            "sort": "published_desc"
+        }
+        if since:
+            params["date"] = f"{since.date().isoformat()},{datetime.now(timezone.utc).date().isoformat()}"
+        while True:
+            status_code, response_data = self.get(self.base_url, params=params)
+            is_success = status_code == 200 and self.data_field in response_data
+
+            fetched_count = len(response_data[self.data_field]) if status_code == 200 and self.data_field in response_data else None
+            total_articles = response_data['pagination']['total'] if status_code == 200 and 'pagination' in response_data else None
+
+            self.log_request(
+                api_name=self.api_name,
+                url=self.base_url,
+                headers={},
+                params=params,
+                status_code=status_code,
+                data=response_data,
+                total_articles=total_articles,
+                fetched_count=fetched_count,
+                is_success=is_success
+            )
+
+            if is_success:
+                self.total_pages = math.ceil(response_data["pagination"]["total"] / self.limit)
+                self.cursor = params["offset"] + self.limit
+                self.exhausted = self.cursor >= response_data["pagination"]["total"]
+                yield response_data[self.data_field]
+
+                if self.exhausted:
                     break
-
-                time.sleep(1)
-
-            api_log.print_log(extend_message=f"Retrieved {len(all_articles)} articles")
-            return all_articles
-
-        return []
+                params["offset"] = self.cursor
+            else:
+                break
 
     @classmethod
     def to_article(cls, data: dict) -> ArticleModel:
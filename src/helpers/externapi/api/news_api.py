@@ -1,6 +1,5 @@
-from typing import Optional, List
-
-import requests
+from datetime import datetime
+from typing import Optional, List, Iterator
 
 from src.helpers.externapi.externapi_base import ExternApiBase
 from src.lib.configuration import configuration
@@ -11,6 +10,7 @@ from src.models.article.article_model import ArticleModel, ArticleSourceModel
 # https://newsapi.org
 class NewsApi(ExternApiBase):
     api_name = "NewsApi"
+    config_name = "newsapi"
     base_url = "https://newsapi.org/v2/everything"
     data_field = "articles"
 
@@ -18,53 +18,41 @@ class NewsApi(ExternApiBase):
         super().__init__(api_key)
         self.api_key = api_key if api_key else configuration.get_env_var("externapi.newsapi.api_key")
 
-    def fetch_news(self) -> List[dict]:
+    def _fetch_pages(self, since: Optional[datetime], cursor=None) -> Iterator[List[dict]]:
         """
         Fetch news from News API.
         """
-        if self.api_key:
-            api_log = ApiLogger(f"Retrieving news from {self.api_name} API.")
-
-            all_articles = []
-
-            params = {
-                'apiKey': f'{self.api_key}',
-                'sortBy': 'publishedAt',
-                'q': 'technology',
-            }
-
-            response = requests.get(self.base_url, params=params)
-            status_code = response.status_code
-            response_data = response.json()
-            is_success = status_code == 200 and self.data_field in response_data
-
-            fetched_count = len(response_data[self.data_field]) if status_code == 200 and self.data_field in response_data else None
-            total_articles = response_data['totalResults'] if status_code == 200 and 'totalResults' in response_data else None
-
-            self.log_request(
-                api_name=self.api_name,
-                url=self.base_url,
-                headers={},
-                params=params,
-                status_code=status_code,
-                data=response_data,
-                total_articles=total_articles,
-                fetched_count=fetched_count,
-                is_success=is_success
-            )
-
-            if is_success:
-                all_articles.extend(response_data[self.data_field])
-            else:
-                try:
-                    ApiLogger(f"Error while fetching news from {self.api_name} API: status code: {response.status_code} --- info {response.json()}", color=EnumColor.RED)
-                except Exception as e:
-                    ApiLogger(f"Error while fetching news from {self.api_name} API: {e}", color=EnumColor.RED)
-
-            api_log.print_log(extend_message=f"Retrieved {len(all_articles)} articles")
-            return all_articles
-
-        return []
+        params = {
+            'apiKey': f'{self.api_key}',
+            'sortBy': 'publishedAt',
+            'q': 'technology',
+        }
+        if since:
+            params['from'] = since.strftime('%Y-%m-%dT%H:%M:%S')
+
+        status_code, response_data = self.get(self.base_url, params=params)
+        is_success = status_code == 200 and self.data_field in response_data
+
+        fetched_count = len(response_data[self.data_field]) if status_code == 200 and self.data_field in response_data else None
+        total_articles = response_data['totalResults'] if status_code == 200 and 'totalResults' in response_data else None
+
+        self.log_request(
+            api_name=self.api_name,
+            url=self.base_url,
+            headers={},
+            params=params,
+            status_code=status_code,
+            data=response_data,
+            total_articles=total_articles,
+            fetched_count=fetched_count,
+            is_success=is_success
+        )
+
+        if is_success:
+            self.exhausted = True
+            yield response_data[self.data_field]
+        else:
+            ApiLogger(f"Error while fetching news from {self.api_name} API: status code: {status_code} --- info {response_data}", color=EnumColor.RED)
 
     @classmethod
     def to_article(cls, data: dict) -> ArticleModel:
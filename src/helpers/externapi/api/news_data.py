@@ -1,7 +1,5 @@
-import time
-from typing import Optional, List
-
-import requests
+from datetime import datetime
+from typing import Optional, List, Iterator
 
 from src.helpers.externapi.externapi_base import ExternApiBase, LogRequest, LogRequestRequest, LogRequestResponse
 from src.lib.configuration import configuration
@@ -11,70 +9,61 @@ from src.models.article.article_model import ArticleModel, ArticleSourceModel
 
 class NewsData(ExternApiBase):
     api_name = "NewsData"
+    config_name = "newsdata"
     base_url = "https://newsdata.io/api/1/latest"
     data_field = "results"
+    max_pages = 5
     page_size = 100
 
     def __init__(self, api_key: Optional[str] = None):
         super().__init__(api_key)
         self.api_key = api_key if api_key else configuration.get_env_var("externapi.newsdata.api_key")
 
-    def fetch_news(self) -> List[dict]:
+    def _fetch_pages(self, since: Optional[datetime], cursor=None) -> Iterator[List[dict]]:
         """
-        Fetch news from News Data API.
+        Fetch news from News Data API (latest news, no date filter: the pagination stops at the watermark).
         """
-        if self.api_key:
-            api_log = ApiLogger(f"Retrieving news from {self.api_name} API.")
-
-            all_articles = []
-
-            params = {
-                'apikey': f'{self.api_key}'
-            }
-
-            request_number = 0
-            while True:
-                request_number += 1
-                response = requests.get(self.base_url, params=params)
-                status_code = response.status_code
-                response_data = response.json()
-                is_success = status_code == 200 and self.data_field in response_data
-
-                fetched_count = len(response_data[self.data_field]) if status_code == 200 and self.data_field in response_data else None
-                total_articles = response_data['totalResults'] if status_code == 200 and 'totalResults' in response_data else None
-
-                self.log_request(
-                    api_name=self.api_name,
-                    url=self.base_url,
-                    headers={},
-                    params=params,
-                    status_code=status_code,
-                    data=response_data,
-                    total_articles=total_articles,
-                    fetched_count=fetched_count,
-                    is_success=is_success
-                )
-
-                if is_success:
-                    all_articles.extend(response_data[self.data_field])
-
-                    params['page'] = response_data['nextPage']
-                else:
-                    try:
-                        ApiLogger(f"Error while fetching news from {self.api_name} API: status code: {response.status_code} --- info {response.json()}", color=EnumColor.RED)
-                    except Exception as e:
-                        ApiLogger(f"Error while fetching news from {self.api_name} API: {e}", color=EnumColor.RED)
-                    break
-
-                if request_number >= 5:
+        params = {
+            'apikey': f'{self.api_key}'
+        }
+        if cursor:
+            params['page'] = cursor
+
+        request_number = 0
+        while True:
+            request_number += 1
+            status_code, response_data = self.get(self.base_url, params=params)
+            is_success = status_code == 200 and self.data_field in response_data
+
+            fetched_count = len(response_data[self.data_field]) if status_code == 200 and self.data_field in response_data else None
+            total_articles = response_data['totalResults'] if status_code == 200 and 'totalResults' in response_data else None
+
+            self.log_request(
+                api_name=self.api_name,
+                url=self.base_url,
+                headers={},
+                params=params,
+                status_code=status_code,
+                data=response_data,
+                total_articles=total_articles,
+                fetched_count=fetched_count,
+                is_success=is_success
+            )
+
+            if is_success:
+                self.cursor = response_data.get('nextPage')
+                self.exhausted = not self.cursor
+                yield response_data[self.data_field]
+
+                if self.exhausted:
                     break
+                params['page'] = self.cursor
+            else:
+                ApiLogger(f"Error while fetching news from {self.api_name} API: status code: {status_code} --- info {response_data}", color=EnumColor.RED)
+                break
 
-                time.sleep(1)
-
-            api_log.print_log(extend_message=f"Retrieved {len(all_articles)} articles")
-            return all_articles
-
-        return []
+            if request_number >= self.max_pages:
+                break
 
     @classmethod
     def to_article(cls, data: dict) -> ArticleModel:
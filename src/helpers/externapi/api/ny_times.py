@@ -1,7 +1,6 @@
-import time
-from typing import Optional, List
-
-import requests
+import math
+from datetime import datetime
+from typing import Optional, List, Iterator
 
 from src.helpers.externapi.externapi_base import ExternApiBase
 from src.lib.configuration import configuration
@@ -12,69 +11,65 @@ from src.models.article.article_model import ArticleModel, ArticleSourceModel
 # https://developer.nytimes.com/docs/articlesearch-product/1/overview
 class NYTimes(ExternApiBase):
     api_name = "NewYork Times"
+    config_name = "nytimes"
     base_url = "https://api.nytimes.com/svc/search/v2/articlesearch.json"
     limit = 100
     data_field = "response"
+    max_pages = 10
 
     def __init__(self, api_key: Optional[str] = None):
         super().__init__(api_key)
         self.api_key = api_key if api_key else configuration.get_env_var("externapi.nytimes.api_key")
 
-    def fetch_news(self) -> List[dict]:
+    def _fetch_pages(self, since: Optional[datetime], cursor=None) -> Iterator[List[dict]]:
         """
-        Fetch news from Market Aux API.
+        Fetch news from NewYork Times API.
         """
-        if self.api_key:
-            api_log = ApiLogger(f"Retrieving news from {self.api_name} API.")
-
-            all_articles = []
-
-            params = {
-                'api-key': f'{self.api_key}',
-                'page': 0
-            }
-
-            while True:
-                response = requests.get(self.base_url, params=params)
-                status_code = response.status_code
-                response_data = response.json()
-                is_success = status_code == 200 and self.data_field in response_data
-
-                fetched_count = len(response_data[self.data_field]['docs']) if status_code == 200 and self.data_field in response_data else None
-                total_articles = response_data['metadata']['hits'] if status_code == 200 and 'metadata' in response_data else None
-
-                self.log_request(
-                    api_name=self.api_name,
-                    url=self.base_url,
-                    headers={},
-                    params=params,
-                    status_code=status_code,
-                    data=response_data,
-                    total_articles=total_articles,
-                    fetched_count=fetched_count,
-                    is_success=is_success
-                )
-
-                if is_success:
-                    all_articles.extend(response_data[self.data_field]['docs'])
-
-                    params['page'] += 1
-                else:
-                    try:
-                        ApiLogger(f"Error while fetching news from {self.api_name} API: status code: {response.status_code} --- info {response.json()}", color=EnumColor.RED)
-                    except Exception as e:
-                        ApiLogger(f"Error while fetching news from {self.api_name} API: {e}", color=EnumColor.RED)
-                    break
-
-                if params['page'] >= 10:
+        params = {
+            'api-key': f'{self.api_key}',
+            'page': cursor or 0,
+            'sort': 'newest'
+        }
+        if since:
+            params['begin_date'] = since.strftime('%Y%m%d')
+
+        request_number = 0
+        while True:
+            request_number += 1
+            status_code, response_data = self.get(self.base_url, params=params)
+            is_success = status_code == 200 and self.data_field in response_data
+
+            fetched_count = len(response_data[self.data_field]['docs']) if status_code == 200 and self.data_field in response_data else None
+            total_articles = response_data['metadata']['hits'] if status_code == 200 and 'metadata' in response_data else None
+
+            self.log_request(
+                api_name=self.api_name,
+                url=self.base_url,
+                headers={},
+                params=params,
+                status_code=status_code,
+                data=response_data,
+                total_articles=total_articles,
+                fetched_count=fetched_count,
+                is_success=is_success
+            )
+
+            if is_success:
+                hits = response_data[self.data_field].get('meta', {}).get('hits', 0)
+                self.total_pages = min(self.max_pages, math.ceil(hits / 10))
+                self.cursor = params['page'] + 1
+                self.exhausted = self.cursor * 10 >= hits
+                yield response_data[self.data_field]['docs']
+
+                if self.exhausted:
                     break
+                params['page'] = self.cursor
+            else:
+                ApiLogger(f"Error while fetching news from {self.api_name} API: status code: {status_code} --- info {response_data}", color=EnumColor.RED)
+                break
 
-                time.sleep(1)
-
-            api_log.print_log(extend_message=f"Retrieved {len(all_articles)} articles")
-            return all_articles
-
-        return []
+            if request_number >= self.max_pages:
+                break
 
     @classmethod
     def to_article(cls, data: dict) -> ArticleModel:
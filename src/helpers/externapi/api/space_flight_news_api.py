@@ -1,6 +1,6 @@
-from typing import Optional, List
-
-import requests
+import math
+from datetime import datetime
+from typing import Optional, List, Iterator
 
 from src.helpers.externapi.externapi_base import ExternApiBase
 from src.lib.configuration import configuration
@@ -10,60 +10,57 @@ from src.models.article.article_model import ArticleModel, ArticleSourceModel
 
 class SpaceFlightNewsAPI(ExternApiBase):
     api_name = "SpaceFlightNewsAPI"
-    base_url = "https://api.spaceflightnewsapi.net/v4/articles/?limit=500"
+    config_name = "spaceflightnewsapi"
+    base_url = "https://api.spaceflightnewsapi.net/v4/articles/"
     data_field = "results"
+    limit = 500
 
     def __init__(self, api_key: Optional[str] = None):
         super().__init__(api_key)
         self.api_key = api_key if api_key else configuration.get_env_var("externapi.spaceflightnewsapi.api_key")
 
-    def fetch_news(self) -> List[dict]:
+    def _fetch_pages(self, since: Optional[datetime], cursor=None) -> Iterator[List[dict]]:
         """
-        Fetch news from News API.
+        Fetch news from Space Flight News API.
         """
-        if self.api_key:
-            api_log = ApiLogger(f"Retrieving news from {self.api_name} API.")
-
-            all_articles = []
-
-            url = self.base_url
-
-            while url:
-                response = requests.get(url)
-                status_code = response.status_code
-                response_data = response.json()
-                is_success = status_code == 200 and self.data_field in response_data
-
-                fetched_count = len(response_data[self.data_field]) if status_code == 200 and self.data_field in response_data else None
-                total_articles = response_data['count'] if status_code == 200 and 'count' in response_data else None
-
-                self.log_request(
-                    api_name=self.api_name,
-                    url=url,
-                    headers={},
-                    params={},
-                    status_code=status_code,
-                    data=response_data,
-                    total_articles=total_articles,
-                    fetched_count=fetched_count,
-                    is_success=is_success
-                )
-
-                if is_success:
-                    all_articles.extend(response_data[self.data_field])
-
-                    url = response_data["next"]
-                else:
-                    try:
-                        ApiLogger(f"Error while fetching news from {self.api_name} API: status code: {response.status_code} --- info {response.json()}", color=EnumColor.RED)
-                    except Exception as e:
-                        ApiLogger(f"Error while fetching news from {self.api_name} API: {e}", color=EnumColor.RED)
-                    break
-
-            api_log.print_log(extend_message=f"Retrieved {len(all_articles)} articles")
-            return all_articles
-
-        return []
+        url = cursor or self.base_url
+        params = {
+            'limit': self.limit,
+            'ordering': '-published_at'
+        }
+        if since:
+            params['published_at_gte'] = since.isoformat()
+
+        while url:
+            # the next urls already carry the parameters
+            status_code, response_data = self.get(url, params=params if url == self.base_url else None)
+            is_success = status_code == 200 and self.data_field in response_data
+
+            fetched_count = len(response_data[self.data_field]) if status_code == 200 and self.data_field in response_data else None
+            total_articles = response_data['count'] if status_code == 200 and 'count' in response_data else None
+
+            self.log_request(
+                api_name=self.api_name,
+                url=url,
+                headers={},
+                params=params if url == self.base_url else {},
+                status_code=status_code,
+                data=response_data,
+                total_articles=total_articles,
+                fetched_count=fetched_count,
+                is_success=is_success
+            )
+
+            if is_success:
+                self.total_pages = math.ceil(response_data.get('count', 0) / self.limit)
+                self.cursor = response_data["next"]
+                self.exhausted = not self.cursor
+                yield response_data[self.data_field]
+
+                url = self.cursor
+            else:
+                ApiLogger(f"Error while fetching news from {self.api_name} API: status code: {status_code} --- info {response_data}", color=EnumColor.RED)
+                break
 
     @classmethod
     def to_article(cls, data: dict) -> ArticleModel:
@@ -1,14 +1,26 @@
 import json
 import os
-from datetime import datetime, timezone
-from typing import List, Optional
+import random
+import time
+from datetime import datetime, timezone, timedelta
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Iterator
 
+import requests
 from bson import ObjectId
 from pydantic import Field, BaseModel, field_serializer
+from requests.adapters import HTTPAdapter
 
+from src.helpers.externapi.externapi_monitoring_middleware import EXTERNAPI_RATE_LIMIT_WAIT, EXTERNAPI_REQUESTS, EXTERNAPI_REQUEST_LATENCY, EXTERNAPI_RETRIES, EXTERNAPI_ARTICLES, EXTERNAPI_PAGES_SKIPPED, EXTERNAPI_QUOTA_USED
+from src.helpers.externapi.externapi_watermark import ExternApiWatermark
+from src.lib.configuration import configuration
+from src.lib.configuration.configuration import ExternAPIConfig
 from src.lib.database.nosql.document.mongodb.base import MongoDBBaseModel
 from src.lib.database.nosql.document.mongodb.objectid import PydanticObjectId
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
 from src.lib.log.api_logger import ApiLogger, EnumColor
+from src.lib.utility.rate_limiter import TokenBucket
+from src.lib.utility.utils import convert_str_to_datetime
 from src.models.article.article_model import ArticleModel
 from src.models.user.auth_model import UserToken
 
@@ -95,17 +107,298 @@ class LogRequest(MongoDBBaseModel):
 
 
 
+class ExternApiQuotaExceededException(Exception):
+    pass
+
+
 class ExternApiBase:
     api_name = "Extern api"
+    # prefix of the provider settings: EXTERNAPI_<CONFIG_NAME>_...
+    config_name = None
     base_url = None
     data_field = "data"
+    # hard limit of pages per run, when the provider has one
+    max_pages: Optional[int] = None
+
+    connect_timeout: float = configuration.get_env_var("externapi.connect_timeout", 5.0, float)
+    read_timeout: float = configuration.get_env_var("externapi.read_timeout", 30.0, float)
+    max_retries: int = configuration.get_env_var("externapi.max_retries", 3, int)
+    backoff: float = configuration.get_env_var("externapi.backoff", 1.0, float)
+    backoff_max: float = configuration.get_env_var("externapi.backoff_max", 60.0, float)
+    retry_status_codes: set[int] = {429, 500, 502, 503, 504}
 
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key
+        # EXTERNAPI_<CONFIG_NAME>_BASE_URL points a provider to another server (a local stub for instance)
+        self.base_url = configuration.get_env_var(f"externapi.{self.config_name}.base_url", self.base_url)
+        self.session = self._create_session()
+        # pagination state of the running fetch_pages() (see _fetch_pages)
+        self.total_pages = None
+        self.cursor = None
+        self.exhausted = False
+        self.pending_watermark: Optional[dict] = None
+        # requests per day (EXTERNAPI_<CONFIG_NAME>_MAX_REQUEST), 0: unlimited
+        self.max_request = ExternAPIConfig.from_name(self.config_name).max_request
+        # older pages fetched per run once the new articles are (EXTERNAPI_<CONFIG_NAME>_BACKFILL_PAGES), 0: no backfill
+        self.backfill_pages = configuration.get_env_var(f"externapi.{self.config_name}.backfill_pages", 0, int)
+        # requests per second (and burst) allowed by the provider, instead of a fixed sleep between pages
+        self.rate_limiter = TokenBucket(
+            rate=configuration.get_env_var(f"externapi.{self.config_name}.rate", 1.0, float),
+            burst=configuration.get_env_var(f"externapi.{self.config_name}.burst", 1, int),
+        )
 
-    def fetch_news(self) -> List[dict]:
+    def wait_rate_limit(self):
+        waited = self.rate_limiter.acquire()
+        EXTERNAPI_RATE_LIMIT_WAIT.labels(self.api_name).observe(waited)
+
+    def _quota_key(self) -> str:
+        return f"externapi:quota:{self.config_name}:{datetime.now(timezone.utc).strftime('%Y%m%d')}"
+
+    def quota_used(self) -> int:
+        return int(RedisManagerInstance.get_instance().get(self._quota_key()) or 0)
+
+    def has_quota(self) -> bool:
+        return not self.max_request or self.quota_used() < self.max_request
+
+    def _take_quota(self):
+        """
+        Count one request in the daily quota of the provider (shared by every process).
+        """
+        if not self.max_request:
+            return
+        pipeline = RedisManagerInstance.get_instance().pipeline()
+        pipeline.incr(self._quota_key())
+        pipeline.expire(self._quota_key(), timedelta(days=2))
+        used, _ = pipeline.execute()
+        EXTERNAPI_QUOTA_USED.labels(self.api_name).set(min(used, self.max_request))
+        if used > self.max_request:
+            raise ExternApiQuotaExceededException(f"{self.api_name}: daily quota of {self.max_request} requests reached")
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        # keep-alive: the connection (and TLS session) is reused for every page of the provider
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """
+        Retry-After when the provider sends it, exponential backoff with full jitter otherwise.
+        """
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+            try:
+                return min(self.backoff_max, max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()))
+            except (TypeError, ValueError):
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def _json(response: requests.Response) -> dict:
+        try:
+            data = response.json()
+        except ValueError:
+            # html error pages, empty bodies...
+            return {"error": response.text[:1_000]}
+        return data if isinstance(data, dict) else {"data": data}
+
+    def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None) -> tuple[int, dict]:
+        """
+        GET through the provider session, rate limited, with connect/read timeouts and retries
+        on network errors, 429 and 5xx. Returns the status code and the JSON body (never raises
+        on a non-JSON body); raises the network error once the retries are exhausted and
+        ExternApiQuotaExceededException when the daily quota is reached.
+        """
+        attempt = 0
+        while True:
+            self._take_quota()
+            self.wait_rate_limit()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=(self.connect_timeout, self.read_timeout))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                EXTERNAPI_REQUEST_LATENCY.labels(self.api_name).observe(time.perf_counter() - start)
+                EXTERNAPI_REQUESTS.labels(self.api_name, "error").inc()
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                EXTERNAPI_RETRIES.labels(self.api_name, type(e).__name__).inc()
+                ApiLogger(f"[EXTERN API] [RETRY] {self.api_name} : {e}, attempt {attempt + 1} in {delay:.1f}s", color=EnumColor.RED)
+            else:
+                EXTERNAPI_REQUEST_LATENCY.labels(self.api_name).observe(time.perf_counter() - start)
+                EXTERNAPI_REQUESTS.labels(self.api_name, str(response.status_code)).inc()
+                if response.status_code not in self.retry_status_codes or attempt >= self.max_retries:
+                    return response.status_code, self._json(response)
+                delay = self._retry_delay(attempt, response)
+                EXTERNAPI_RETRIES.labels(self.api_name, str(response.status_code)).inc()
+                ApiLogger(f"[EXTERN API] [RETRY] {self.api_name} : status code {response.status_code}, attempt {attempt + 1} in {delay:.1f}s", color=EnumColor.RED)
+            time.sleep(delay)
+            attempt += 1
+
+    def _fetch_pages(self, since: Optional[datetime], cursor=None) -> Iterator[List[dict]]:
+        """
+        Yield the raw articles of the provider page by page, newest first, as soon as each page
+        is received. `since` (the watermark) is sent to the providers that can filter by date and
+        `cursor` (see self.cursor) starts at a page of a previous run (backfill).
+
+        Before yielding a page, the provider sets self.cursor to the position of the next page,
+        and self.exhausted to True once there is no next page. The next page must only be
+        requested when the generator is resumed.
+        """
         raise NotImplementedError
 
+    def _position(self, data: dict) -> tuple[Optional[datetime], Optional[str]]:
+        try:
+            article = self.to_article(data)
+        except Exception:
+            return None, None
+        return ExternApiWatermark.as_utc(convert_str_to_datetime(article.published_at)), article.extern_id
+
+    def _paginate(self, since: Optional[datetime], last_extern_id: Optional[str], cursor, state: dict, max_pages: Optional[int] = None) -> Iterator[List[dict]]:
+        """
+        Yield the articles of _fetch_pages from `cursor`, dropping the ones older than `since`
+        (or equal to `last_extern_id`) and stopping at the first page reaching it, or after
+        `max_pages` pages. `state` follows the run: pages, cursor (next page), newest article
+        and complete (`since` or the last page reached).
+        """
+        self.total_pages = None
+        self.cursor = None
+        self.exhausted = False
+
+        reached = False
+        for page in self._fetch_pages(since, cursor):
+            state["pages"] += 1
+            articles = []
+            for data in page:
+                published_at, extern_id = self._position(data)
+                if since and ((published_at and published_at < since) or (last_extern_id and extern_id == last_extern_id)):
+                    reached = True
+                    continue
+                articles.append(data)
+                if published_at and (state["newest"] is None or published_at > state["newest"][0]):
+                    state["newest"] = (published_at, extern_id)
+
+            EXTERNAPI_ARTICLES.labels(self.api_name, "known").inc(len(page) - len(articles))
+            state["cursor"] = self.cursor
+            if articles:
+                yield articles
+            if reached:
+                # closing the generator: the next pages are never requested
+                skipped = max(0, (self.total_pages or self.max_pages or state["pages"]) - state["pages"])
+                EXTERNAPI_PAGES_SKIPPED.labels(self.api_name).inc(skipped)
+                ApiLogger(f"[EXTERN API] [WATERMARK] {self.api_name} : reached {since} after {state['pages']} pages, {skipped} pages skipped", color=EnumColor.GREEN)
+                break
+            if max_pages and state["pages"] >= max_pages:
+                break
+
+        state["complete"] = reached or self.exhausted
+
+    def fetch_pages(self) -> Iterator[List[dict]]:
+        """
+        Yield the new articles of the provider page by page, newest first: the pagination
+        starts at the first page on every run and stops at the watermark (newest content of
+        the previous runs), then continues the backfill, if any, for `backfill_pages` pages.
+
+        Nothing is saved here: once the pages are stored, save_watermark() applies
+        self.pending_watermark. The watermark moves to the newest article as soon as one page
+        is fetched; when the run stopped before the previous watermark (first run, max_pages,
+        error), the older articles left behind become the backfill (see ExternApiWatermark).
+        """
+        watermark = ExternApiWatermark.get(self.api_name)
+        since, last_extern_id = watermark.get("published_at"), watermark.get("extern_id")
+        backfill = watermark.get("backfill")
+        self.pending_watermark = None
+
+        head = {"pages": 0, "cursor": None, "newest": None, "complete": False}
+        try:
+            yield from self._paginate(since, last_extern_id, None, head)
+        finally:
+            self.pending_watermark = self._pending_watermark(since, last_extern_id, head)
+            if self.pending_watermark and self.pending_watermark.get("backfill"):
+                ApiLogger(f"[EXTERN API] [WATERMARK] {self.api_name} : stopped after {head['pages']} pages before {since}, backfill from {head['cursor']}", color=EnumColor.RED)
+                if backfill:
+                    ApiLogger(f"[EXTERN API] [WATERMARK] {self.api_name} : backfill down to {backfill.get('published_at')} abandoned", color=EnumColor.RED)
+
+        if self.pending_watermark and "backfill" in self.pending_watermark:
+            backfill = self.pending_watermark["backfill"]
+        if not backfill or not self.backfill_pages:
+            return
+
+        # older articles, once the new ones are fetched
+        state = {"pages": 0, "cursor": backfill.get("cursor"), "newest": None, "complete": False}
+        failed = False
+        try:
+            yield from self._paginate(backfill.get("published_at"), backfill.get("extern_id"), backfill.get("cursor"), state, max_pages=self.backfill_pages)
+        except Exception as e:
+            # the new articles are fetched: the backfill stops here and resumes at the next run
+            ApiLogger(f"[EXTERN API] [BACKFILL] {self.api_name}").print_error(str(e))
+            failed = True
+
+        pending_backfill = self._pending_backfill(backfill, state, failed)
+        if pending_backfill is None:
+            ApiLogger(f"[EXTERN API] [BACKFILL] {self.api_name} : {'complete' if state['complete'] else 'dropped, its cursor failed'} after {state['pages']} pages", color=EnumColor.GREEN)
+        self.pending_watermark = (self.pending_watermark or {}) | {"backfill": pending_backfill}
+
+    @staticmethod
+    def _pending_watermark(since: Optional[datetime], last_extern_id: Optional[str], head: dict) -> Optional[dict]:
+        """
+        Watermark after the newest pages (`head`, see _paginate): the newest article fetched, and
+        the backfill of the pages left before the previous watermark when the run stopped
+        early. None when nothing moves, no "backfill" key when the backfill is unchanged.
+        """
+        if not head["pages"] or head["newest"] is None:
+            # nothing new: the next run starts again from the first page
+            return None
+        pending = {"published_at": head["newest"][0], "extern_id": head["newest"][1], "pages": head["pages"]}
+        if not head["complete"]:
+            pending["backfill"] = {"cursor": head["cursor"], "published_at": since, "extern_id": last_extern_id}
+        return pending
+
+    @staticmethod
+    def _pending_backfill(backfill: dict, state: dict, failed: bool) -> Optional[dict]:
+        """
+        Backfill after a backfill run (`state`, see _paginate): None once complete, or when its
+        cursor returns nothing (expired token, page past the provider limit); an exception
+        (network, quota) keeps the cursor for the next run.
+        """
+        if state["complete"] or (not state["pages"] and not failed):
+            return None
+        return backfill | {"cursor": state["cursor"]}
+
+    def save_watermark(self):
+        """
+        Apply the watermark of the last fetch_pages() run, once its pages are stored.
+        """
+        pending, self.pending_watermark = self.pending_watermark, None
+        if not pending:
+            return
+        if pending.get("published_at"):
+            ExternApiWatermark.save(self.api_name, pending["published_at"], pending["extern_id"], pages=pending["pages"])
+        if "backfill" in pending:
+            ExternApiWatermark.save_backfill(self.api_name, pending["backfill"])
+
+    def fetch_news(self) -> List[dict]:
+        """
+        All the new articles of the provider, without storing them: the watermark is not moved.
+        """
+        if not self.api_key:
+            return []
+
+        api_log = ApiLogger(f"[EXTERN API] Retrieving news from {self.api_name} API.")
+
+        all_articles = []
+        for page in self.fetch_pages():
+            all_articles.extend(page)
+
+        api_log.print_log(extend_message=f"Retrieved {len(all_articles)} articles")
+        return all_articles
+
     @staticmethod
     def get_dir_path() -> str:
         return os.path.dirname(__file__)
@@ -0,0 +1,172 @@
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Optional
+
+import ijson
+
+from src.helpers.externapi.api.currents_api import CurrentsAPI
+from src.helpers.externapi.api.g_news import GNews
+from src.helpers.externapi.api.market_aux import MarketAux
+from src.helpers.externapi.api.media_stack import MediaStack
+from src.helpers.externapi.api.news_api import NewsApi
+from src.helpers.externapi.api.news_data import NewsData
+from src.helpers.externapi.api.ny_times import NYTimes
+from src.helpers.externapi.api.space_flight_news_api import SpaceFlightNewsAPI
+from src.helpers.externapi.externapi_base import ExternApiBase
+from src.lib.configuration import configuration
+from src.lib.database.nosql.document.mongodb.mongodb_manager import MongoDBManager, mongodb_client
+from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+from src.lib.log.api_logger import ApiLogger
+from src.models.article.article_model import ArticleModel
+
+
+class ExternApiFileImporter:
+    """
+    Import of the provider responses archived on disk (see ExternApiBase.save_data).
+
+    Files are spread over a pool of processes. Each file is parsed incrementally (ijson):
+    only `batch_size` articles are in memory at once, whatever the size of the file, and
+    they are stored with ArticleModel.bulk_save.
+
+    A manifest (one document per file: {_id: path, hash, offset, done, counts}) records the
+    number of articles already imported after every batch, so a rerun skips the completed
+    files and resumes the others where they stopped. A file whose hash changed is imported
+    again from the start.
+    """
+
+    # provider name in the file name -> (provider, path of the articles in the JSON document)
+    FILE_PROVIDERS: list[tuple[str, type[ExternApiBase], str]] = [
+        ("CurrentsAPI", CurrentsAPI, "news.item"),
+        ("GNews", GNews, "articles.item"),
+        ("MarketAux", MarketAux, "data.item"),
+        ("MediaStack", MediaStack, "data.item"),
+        ("NewsApi", NewsApi, "articles.item"),
+        ("NewsData", NewsData, "results.item"),
+        ("NYTimes", NYTimes, "response.docs.item"),
+        (NYTimes.api_name, NYTimes, "response.docs.item"),
+        ("SpaceFlightNewsAPI", SpaceFlightNewsAPI, "results.item"),
+    ]
+
+    batch_size: int = configuration.get_env_var("externapi.import.batch_size", 1_000, int)
+    workers: int = configuration.get_env_var("externapi.import.workers", 4, int)
+
+    @staticmethod
+    def manifest():
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("externapi_import")]
+
+    @staticmethod
+    def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+        digest = hashlib.sha1()
+        with open(path, "rb") as file:
+            while chunk := file.read(chunk_size):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @classmethod
+    def provider_for(cls, path: str) -> Optional[tuple[type[ExternApiBase], str]]:
+        name = os.path.basename(path)
+        for provider_name, provider, prefix in cls.FILE_PROVIDERS:
+            if provider_name in name:
+                return provider, prefix
+        return None
+
+    @staticmethod
+    def list_files(folder_path: str) -> list[str]:
+        all_files = []
+        for root, dirs, files in os.walk(folder_path):
+            for file in files:
+                if file.endswith(".json"):
+                    all_files.append(os.path.join(root, file))
+        return sorted(all_files)
+
+    @classmethod
+    def _checkpoint(cls, path: str, **values):
+        with MONGO_QUERY_TIME.time():
+            cls.manifest().update_one({"_id": path}, {"$set": values | {"updated_at": datetime.now(timezone.utc)}}, upsert=True)
+
+    @classmethod
+    def import_file(cls, path: str, provider: type[ExternApiBase], prefix: str, batch_size: Optional[int] = None) -> dict:
+        """
+        Import one file, resuming from its checkpoint. Returns the counts of this run.
+        """
+        batch_size = batch_size or cls.batch_size
+        counts = {"file": path, "articles": 0, "inserted": 0, "duplicates": 0, "linked": 0, "failed": 0, "skipped": False}
+
+        file_hash = cls.file_hash(path)
+        with MONGO_QUERY_TIME.time():
+            checkpoint = cls.manifest().find_one({"_id": path}) or {}
+        if checkpoint.get("hash") != file_hash:
+            checkpoint = {}
+        if checkpoint.get("done"):
+            counts["skipped"] = True
+            return counts
+
+        offset = checkpoint.get("offset", 0)
+        api_logger = ApiLogger(f"[EXTERN API] [IMPORT] [FILE] : {path}, provider={provider.api_name} and offset={offset}")
+
+        with open(path, "rb") as file:
+            items = islice(ijson.items(file, prefix, use_float=True), offset, None)
+            while batch := list(islice(items, batch_size)):
+                articles = []
+                for data in batch:
+                    try:
+                        articles.append(provider.to_article(data))
+                    except Exception as e:
+                        ApiLogger(f"[EXTERN API] [IMPORT] [CONVERT] : {path}").print_error(str(e))
+                        counts["failed"] += 1
+
+                result = ArticleModel.bulk_save(None, articles)
+                counts["articles"] += len(batch)
+                counts["inserted"] += result.inserted
+                counts["duplicates"] += result.duplicates
+                counts["linked"] += result.linked
+                counts["failed"] += result.failed
+
+                offset += len(batch)
+                cls._checkpoint(path, hash=file_hash, offset=offset, done=False)
+
+        cls._checkpoint(path, hash=file_hash, offset=offset, done=True, provider=provider.api_name)
+
+        api_logger.print_log(extend_message=f"{counts['articles']} articles: {counts['inserted']} inserted, {counts['duplicates']} duplicates, {counts['linked']} linked and {counts['failed']} failed")
+        return counts
+
+    @classmethod
+    def import_folder(cls, folder_path: str, file_provider: Optional[tuple[type[ExternApiBase], str]] = None, workers: Optional[int] = None) -> dict:
+        """
+        Import every JSON file of the folder, `workers` files at a time. The provider of a file
+        is found from its name, unless `file_provider` (provider, path of the articles) is given.
+        """
+        workers = workers or cls.workers
+        api_logger = ApiLogger(f"[EXTERN API] [IMPORT] [FOLDER] : {folder_path} and workers={workers}")
+
+        totals = {"files": 0, "skipped_files": 0, "articles": 0, "inserted": 0, "duplicates": 0, "linked": 0, "failed": 0}
+
+        jobs = []
+        for path in cls.list_files(folder_path):
+            provider = file_provider or cls.provider_for(path)
+            if provider is None:
+                ApiLogger(f"[EXTERN API] [IMPORT] [FILE] : {path}").print_error("Unknown provider")
+                continue
+            jobs.append((path, *provider))
+
+        # spawn: every worker opens its own MongoDB and Redis connections
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = {executor.submit(cls.import_file, path, provider, prefix): path for path, provider, prefix in jobs}
+            for future in as_completed(futures):
+                try:
+                    counts = future.result()
+                except Exception as e:
+                    # the checkpoint is kept: the next run resumes the file
+                    ApiLogger(f"[EXTERN API] [IMPORT] [FILE] : {futures[future]}").print_error(str(e))
+                    continue
+                totals["files"] += 1
+                totals["skipped_files"] += int(counts["skipped"])
+                for name in ("articles", "inserted", "duplicates", "linked", "failed"):
+                    totals[name] += counts[name]
+
+        api_logger.print_log(extend_message=f"{totals}")
+        return totals
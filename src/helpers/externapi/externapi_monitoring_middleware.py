@@ -0,0 +1,16 @@
+from prometheus_client import Counter, Summary, Gauge, Histogram
+
+EXTERNAPI_PAGES = Counter('externapi_pages_total', 'Pages fetched from the extern APIs', ['provider'])
+EXTERNAPI_ARTICLES = Counter('externapi_articles_total', 'Articles handled by the ingestion', ['provider', 'result'])
+EXTERNAPI_FETCH_TIME = Summary('externapi_fetch_duration_seconds', 'Time spent fetching all the pages of a provider', ['provider'])
+EXTERNAPI_RATE_LIMIT_WAIT = Summary('externapi_rate_limit_wait_seconds', 'Time spent waiting for a provider rate limiter token', ['provider'])
+EXTERNAPI_THROUGHPUT = Gauge('externapi_articles_per_second', 'Articles stored per second during the last ingestion cycle', ['provider'])
+EXTERNAPI_REQUESTS = Counter('externapi_requests_total', 'HTTP requests sent to the extern APIs', ['provider', 'status'])
+EXTERNAPI_REQUEST_LATENCY = Histogram('externapi_request_latency_seconds', 'Latency of the extern API requests', ['provider'])
+EXTERNAPI_RETRIES = Counter('externapi_retries_total', 'Extern API requests retried', ['provider', 'reason'])
+EXTERNAPI_PAGES_SKIPPED = Counter('externapi_pages_skipped_total', 'Pages not requested because the provider watermark was reached', ['provider'])
+EXTERNAPI_QUOTA_USED = Gauge('externapi_quota_used_requests', 'Requests sent to the provider today', ['provider'])
+EXTERNAPI_SCHEDULER_NEXT_RUN = Gauge('externapi_scheduler_next_run_timestamp_seconds', 'Next scheduled run of the provider', ['provider'])
+EXTERNAPI_SCHEDULER_LAST_DURATION = Gauge('externapi_scheduler_last_run_duration_seconds', 'Duration of the last scheduled run of the provider', ['provider'])
+EXTERNAPI_SCHEDULER_ARTICLES = Gauge('externapi_scheduler_last_run_articles', 'Articles saved by the last scheduled run of the provider', ['provider'])
+EXTERNAPI_SCHEDULER_SKIPPED = Counter('externapi_scheduler_skipped_runs_total', 'Scheduled runs skipped', ['provider', 'reason'])
@@ -0,0 +1,192 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from queue import Queue
+from threading import Thread, Lock
+from typing import Optional
+
+from src.helpers.cache.cache_warmup import warmup_cache
+from src.helpers.externapi.api.currents_api import CurrentsAPI
+from src.helpers.externapi.api.g_news import GNews
+from src.helpers.externapi.api.market_aux import MarketAux
+from src.helpers.externapi.api.media_stack import MediaStack
+from src.helpers.externapi.api.news_api import NewsApi
+from src.helpers.externapi.api.news_data import NewsData
+from src.helpers.externapi.api.ny_times import NYTimes
+from src.helpers.externapi.api.space_flight_news_api import SpaceFlightNewsAPI
+from src.helpers.externapi.externapi_base import ExternApiBase
+from src.helpers.externapi.externapi_monitoring_middleware import EXTERNAPI_PAGES, EXTERNAPI_ARTICLES, EXTERNAPI_FETCH_TIME, EXTERNAPI_THROUGHPUT
+from src.lib.configuration import configuration
+from src.lib.log.api_logger import ApiLogger, EnumColor
+from src.models.article.article_model import ArticleModel
+from src.models.article.article_similar_model import ArticleSimilarityJob
+from src.models.article.article_story_model import ArticleStoryClusterer
+
+
+@dataclass
+class ProviderThroughput:
+    provider: str
+    pages: int = 0
+    fetched: int = 0
+    saved: int = 0
+    skipped: int = 0
+    failed: int = 0
+    # pages whose bulk save failed: the watermark of the provider is not moved
+    store_errors: int = 0
+    fetch_seconds: float = 0.0
+    duration: float = 0.0
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def add(self, **counts: int):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    @property
+    def articles_per_second(self) -> float:
+        return self.saved / self.duration if self.duration > 0 else 0.0
+
+
+class ExternApiOrchestrator:
+    """
+    One ingestion cycle over all the extern APIs.
+
+    Every provider is fetched in its own thread, spaced by its own token bucket
+    (EXTERNAPI_<PROVIDER>_RATE / _BURST) instead of a fixed sleep, so a cycle lasts as
+    long as the slowest provider. Pages are handed over, as soon as received, to a bounded
+    queue consumed by `storage_workers` threads that convert and bulk save the articles:
+    fetching and storage overlap, and a slow database slows the fetchers down instead of
+    piling pages up.
+    """
+
+    PROVIDERS: list[type[ExternApiBase]] = [CurrentsAPI, GNews, MarketAux, MediaStack, NewsApi, NewsData, NYTimes, SpaceFlightNewsAPI]
+
+    storage_workers: int = configuration.get_env_var("externapi.storage_workers", 4, int)
+    queue_size: int = configuration.get_env_var("externapi.queue_size", 32, int)
+
+    def __init__(self, providers: Optional[list[ExternApiBase]] = None):
+        self.providers = providers if providers is not None else [provider() for provider in self.PROVIDERS]
+
+    @staticmethod
+    def _fetch(provider: ExternApiBase, pages: Queue, stats: ProviderThroughput):
+        start = time.perf_counter()
+        try:
+            for page in provider.fetch_pages():
+                EXTERNAPI_PAGES.labels(provider.api_name).inc()
+                EXTERNAPI_ARTICLES.labels(provider.api_name, "fetched").inc(len(page))
+                stats.add(pages=1, fetched=len(page))
+                pages.put((provider, page, stats))
+        except Exception as e:
+            ApiLogger(f"[EXTERN API] [ORCHESTRATOR] [FETCH] : {provider.api_name}").print_error(str(e))
+        finally:
+            stats.fetch_seconds = time.perf_counter() - start
+            EXTERNAPI_FETCH_TIME.labels(provider.api_name).observe(stats.fetch_seconds)
+
+    @staticmethod
+    def _store(pages: Queue, start: float):
+        while True:
+            item = pages.get()
+            if item is None:
+                return
+
+            provider, page, stats = item
+            articles = []
+            failed = 0
+            for data in page:
+                try:
+                    articles.append(provider.to_article(data))
+                except Exception as e:
+                    ApiLogger(f"[EXTERN API] [ORCHESTRATOR] [CONVERT] : {provider.api_name}").print_error(str(e))
+                    failed += 1
+
+            try:
+                result = ArticleModel.bulk_save(None, articles)
+                saved = result.inserted
+                skipped = result.duplicates + result.linked
+                failed += result.failed
+            except Exception as e:
+                ApiLogger(f"[EXTERN API] [ORCHESTRATOR] [STORE] : {provider.api_name}").print_error(str(e))
+                saved = skipped = 0
+                failed += len(articles)
+                stats.add(store_errors=1)
+
+            EXTERNAPI_ARTICLES.labels(provider.api_name, "saved").inc(saved)
+            EXTERNAPI_ARTICLES.labels(provider.api_name, "skipped").inc(skipped)
+            EXTERNAPI_ARTICLES.labels(provider.api_name, "failed").inc(failed)
+            stats.add(saved=saved, skipped=skipped, failed=failed)
+            # time from the start of the cycle to the last stored page of the provider
+            stats.duration = time.perf_counter() - start
+
+    @staticmethod
+    def refresh():
+        """
+        Jobs derived from the stored articles: similar articles, stories and cache warm-up.
+        Each job holds its own lock and skips when already running, the next refresh
+        picks the new articles up.
+        """
+        for name, job in (("similar", ArticleSimilarityJob.run), ("story", ArticleStoryClusterer.run), ("warmup", lambda: warmup_cache(lock=True))):
+            try:
+                job()
+            except Exception as e:
+                ApiLogger(f"[EXTERN API] [ORCHESTRATOR] [REFRESH] : {name}").print_error(str(e))
+
+    @classmethod
+    def refresh_in_background(cls):
+        # not a daemon: a one-shot import still completes its refresh before the process exits
+        thread = Thread(target=cls.refresh)
+        thread.start()
+
+    def run(self) -> dict[str, ProviderThroughput]:
+        """
+        Fetch and store the news of every provider with an api key. Returns the throughput per provider.
+        """
+        providers = [provider for provider in self.providers if provider.api_key]
+        api_logger = ApiLogger(f"[EXTERN API] [ORCHESTRATOR] [RUN] : providers={[provider.api_name for provider in providers]} and storage workers={self.storage_workers}")
+
+        start = time.perf_counter()
+        stats = {provider.api_name: ProviderThroughput(provider.api_name) for provider in providers}
+
+        pages = Queue(maxsize=self.queue_size)
+        storers = [Thread(target=self._store, args=(pages, start), daemon=True) for _ in range(self.storage_workers)]
+        for storer in storers:
+            storer.start()
+
+        if providers:
+            with ThreadPoolExecutor(max_workers=len(providers), thread_name_prefix="externapi") as executor:
+                for provider in providers:
+                    executor.submit(self._fetch, provider, pages, stats[provider.api_name])
+
+        for _ in storers:
+            pages.put(None)
+        for storer in storers:
+            storer.join()
+
+        # every page is stored now: the watermarks can move
+        for provider in providers:
+            if stats[provider.api_name].store_errors:
+                ApiLogger(f"[EXTERN API] [ORCHESTRATOR] [WATERMARK] : {provider.api_name}").print_error(f"{stats[provider.api_name].store_errors} pages not stored, watermark kept")
+                continue
+            try:
+                provider.save_watermark()
+            except Exception as e:
+                ApiLogger(f"[EXTERN API] [ORCHESTRATOR] [WATERMARK] : {provider.api_name}").print_error(str(e))
+
+        for provider_stats in stats.values():
+            EXTERNAPI_THROUGHPUT.labels(provider_stats.provider).set(provider_stats.articles_per_second)
+            ApiLogger(
+                f"[EXTERN API] [ORCHESTRATOR] [THROUGHPUT] {provider_stats.provider} : {provider_stats.pages} pages, "
+                f"{provider_stats.fetched} fetched, {provider_stats.saved} saved, {provider_stats.skipped} skipped and {provider_stats.failed} failed "
+                f"in {provider_stats.duration:.1f}s (fetch {provider_stats.fetch_seconds:.1f}s, {provider_stats.articles_per_second:.1f} articles/s)",
+                color=EnumColor.GREEN
+            )
+
+        saved = sum(provider_stats.saved for provider_stats in stats.values())
+        if saved:
+            self.refresh_in_background()
+
+        api_logger.print_log(extend_message=f"{saved} articles saved in {time.perf_counter() - start:.1f}s")
+        return stats
+
+
+if __name__ == '__main__':
+    ExternApiOrchestrator().run()
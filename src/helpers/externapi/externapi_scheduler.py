@@ -0,0 +1,156 @@
+import time
+from datetime import timedelta
+from threading import Thread, Event
+from typing import Optional
+
+from prometheus_client import start_http_server
+
+from src.helpers.externapi.externapi_base import ExternApiBase
+from src.helpers.externapi.externapi_monitoring_middleware import EXTERNAPI_SCHEDULER_NEXT_RUN, EXTERNAPI_SCHEDULER_LAST_DURATION, EXTERNAPI_SCHEDULER_ARTICLES, EXTERNAPI_SCHEDULER_SKIPPED, EXTERNAPI_QUOTA_USED
+from src.helpers.externapi.externapi_orchestrator import ExternApiOrchestrator, ProviderThroughput
+from src.lib.configuration import configuration
+from src.lib.configuration.configuration import ExternAPIConfig
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.log.api_logger import ApiLogger
+
+
+class ExternApiScheduler:
+    """
+    Runs every provider on its own interval (EXTERNAPI_<PROVIDER>_INTERVAL, in minutes).
+
+    Every `tick` seconds each provider whose next run is due is fetched by its own
+    ingestion orchestrator, in its own thread: a slow provider never delays the others.
+    A provider is skipped when it is disabled (_ENABLE), has no access key, has used its
+    daily quota (_MAX_REQUEST requests, counted in Redis by ExternApiBase for every request
+    sent, so the quota holds across processes and restarts) or is still running.
+
+    The next runs live in Redis and are read under a short tick lock; a running provider
+    holds its own lock, extended every `lock_expire` / 3 while it runs and released once
+    done: several workers (or the API in-process scheduler and a worker) never run the
+    same provider twice, and a crashed worker frees its providers after `lock_expire`.
+
+    Worker: python -m src.helpers.externapi.externapi_scheduler (metrics on EXTERNAPI_SCHEDULER_METRICS_PORT).
+    """
+
+    NEXT_RUN_KEY = "externapi:scheduler:next_run"
+    LOCK_KEY = "externapi:scheduler:lock"
+    PROVIDER_LOCK_KEY = "externapi:scheduler:lock:{name}"
+
+    lock_expire: timedelta = timedelta(minutes=5)
+
+    tick: int = configuration.get_env_var("externapi.scheduler.tick", 30, int)
+    in_process: bool = configuration.get_env_var("externapi.scheduler.in_process", False, bool)
+    metrics_port: int = configuration.get_env_var("externapi.scheduler.metrics_port", 9105, int)
+
+    def __init__(self, providers: Optional[list[type[ExternApiBase]]] = None):
+        self.providers = providers if providers is not None else ExternApiOrchestrator.PROVIDERS
+
+    def _due(self, now: float) -> list[ExternApiBase]:
+        redis = RedisManagerInstance.get_instance()
+        next_runs = redis.hgetall(self.NEXT_RUN_KEY)
+
+        due = []
+        pipeline = redis.pipeline()
+        for provider_class in self.providers:
+            name = provider_class.api_name
+            config = ExternAPIConfig.from_name(provider_class.config_name)
+
+            next_run = float(next_runs.get(name, 0))
+            if next_run > now:
+                EXTERNAPI_SCHEDULER_NEXT_RUN.labels(name).set(next_run)
+                continue
+            # the next slot is taken whether the provider runs now or is skipped
+            next_run = now + config.interval * 60
+            pipeline.hset(self.NEXT_RUN_KEY, name, next_run)
+            EXTERNAPI_SCHEDULER_NEXT_RUN.labels(name).set(next_run)
+
+            if not config.enable:
+                EXTERNAPI_SCHEDULER_SKIPPED.labels(name, "disabled").inc()
+                continue
+            provider = provider_class(api_key=config.access_key or None)
+            if not provider.api_key:
+                EXTERNAPI_SCHEDULER_SKIPPED.labels(name, "no_access_key").inc()
+                continue
+            quota_used = provider.quota_used()
+            EXTERNAPI_QUOTA_USED.labels(name).set(quota_used)
+            if provider.max_request and quota_used >= provider.max_request:
+                EXTERNAPI_SCHEDULER_SKIPPED.labels(name, "quota").inc()
+                ApiLogger(f"[EXTERN API] [SCHEDULER] [QUOTA] : {name} used its {provider.max_request} daily requests").print_log()
+                continue
+            if not redis.set(key=self.PROVIDER_LOCK_KEY.format(name=name), value="1", ex=self.lock_expire, nx=True):
+                EXTERNAPI_SCHEDULER_SKIPPED.labels(name, "running").inc()
+                continue
+            due.append(provider)
+        pipeline.execute()
+
+        return due
+
+    def _run_provider(self, provider: ExternApiBase) -> Optional[ProviderThroughput]:
+        """
+        Run one provider (locked by _due), extending its lock until done.
+        """
+        redis = RedisManagerInstance.get_instance()
+        lock_key = self.PROVIDER_LOCK_KEY.format(name=provider.api_name)
+        done = Event()
+
+        def extend_lock():
+            while not done.wait(self.lock_expire.total_seconds() / 3):
+                redis.expire(lock_key, self.lock_expire)
+
+        heartbeat = Thread(target=extend_lock, daemon=True)
+        heartbeat.start()
+
+        api_logger = ApiLogger(f"[EXTERN API] [SCHEDULER] [RUN] : {provider.api_name}")
+        try:
+            stats = ExternApiOrchestrator([provider]).run().get(provider.api_name)
+            if stats is not None:
+                EXTERNAPI_SCHEDULER_LAST_DURATION.labels(provider.api_name).set(stats.duration)
+                EXTERNAPI_SCHEDULER_ARTICLES.labels(provider.api_name).set(stats.saved)
+            api_logger.print_log()
+            return stats
+        except Exception as e:
+            api_logger.print_error(str(e))
+            return None
+        finally:
+            done.set()
+            heartbeat.join()
+            redis.delete(key=lock_key)
+
+    def run_once(self) -> list[Thread]:
+        """
+        Start the providers that are due, each in its own thread. Returns the started threads.
+        """
+        redis = RedisManagerInstance.get_instance()
+        if not redis.set(key=self.LOCK_KEY, value="1", ex=timedelta(seconds=max(self.tick, 60)), nx=True):
+            return []
+
+        try:
+            providers = self._due(time.time())
+        finally:
+            redis.delete(key=self.LOCK_KEY)
+
+        threads = []
+        for provider in providers:
+            thread = Thread(target=self._run_provider, args=(provider,), name=f"externapi-scheduler-{provider.api_name}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def run_forever(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                ApiLogger("[EXTERN API] [SCHEDULER] [RUN]").print_error(str(e))
+            time.sleep(self.tick)
+
+    @classmethod
+    def start_in_background(cls):
+        thread = Thread(target=cls().run_forever)
+        thread.daemon = True
+        thread.start()
+
+
+if __name__ == '__main__':
+    start_http_server(ExternApiScheduler.metrics_port)
+    ExternApiScheduler().run_forever()
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from src.lib.database.nosql.document.mongodb.mongodb_manager import MongoDBManager, mongodb_client
+from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+
+
+class ExternApiWatermark:
+    """
+    Newest content already stored from each provider, one document per provider:
+    {_id: api name, published_at, extern_id, pages, backfill, updated_at}.
+
+    Every run fetches the newest pages first and moves the watermark to the newest article.
+    `backfill` is set when a run stopped before the previous watermark (first run, page cap,
+    error): {cursor: next page of the provider, published_at, extern_id: previous watermark,
+    None on a first run}. The older articles are fetched from the cursor down to it, a few
+    pages per run, after the new ones.
+    """
+
+    @classmethod
+    def watermarks(cls):
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("externapi_watermark")]
+
+    @staticmethod
+    def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+    @classmethod
+    def get(cls, api_name: str) -> dict:
+        with MONGO_QUERY_TIME.time():
+            watermark = cls.watermarks().find_one({"_id": api_name}) or {}
+        watermark["published_at"] = cls.as_utc(watermark.get("published_at"))
+        if watermark.get("backfill"):
+            watermark["backfill"]["published_at"] = cls.as_utc(watermark["backfill"].get("published_at"))
+        return watermark
+
+    @classmethod
+    def save(cls, api_name: str, published_at: datetime, extern_id: Optional[str], **values) -> dict:
+        values |= {"published_at": cls.as_utc(published_at), "extern_id": extern_id, "updated_at": datetime.now(timezone.utc)}
+        try:
+            with MONGO_QUERY_TIME.time():
+                cls.watermarks().update_one(
+                    {"_id": api_name, "$or": [{"published_at": {"$lte": values["published_at"]}}, {"published_at": None}]},
+                    {"$set": values},
+                    upsert=True
+                )
+        except DuplicateKeyError:
+            # never moves backwards: the stored watermark is newer
+            pass
+        return values
+
+    @classmethod
+    def save_backfill(cls, api_name: str, backfill: Optional[dict]) -> Optional[dict]:
+        if backfill and backfill.get("published_at"):
+            backfill["published_at"] = cls.as_utc(backfill["published_at"])
+        with MONGO_QUERY_TIME.time():
+            cls.watermarks().update_one(
+                {"_id": api_name},
+                {"$set": {"backfill": backfill, "updated_at": datetime.now(timezone.utc)}, "$unset": {"resume": ""}},
+                upsert=True
+            )
+        return backfill
+
+    @classmethod
+    def reset(cls, api_name: str):
+        with MONGO_QUERY_TIME.time():
+            cls.watermarks().delete_one({"_id": api_name})
@@ -62,6 +62,19 @@ class ExternAPIConfig:
     enable: bool = field(default_factory=lambda: get_env_var("enable", False, bool))
     access_key: str = field(default_factory=lambda: get_env_var("access_key", ""))
     max_request: int = field(default_factory=lambda: get_env_var("max_request", 0, int))
+    interval: int = field(default_factory=lambda: get_env_var("interval", 60, int))
+
+    @classmethod
+    def from_name(cls, name: str) -> "ExternAPIConfig":
+        """
+        Settings of one provider: EXTERNAPI_<NAME>_ENABLE, _ACCESS_KEY, _MAX_REQUEST (per day, 0: unlimited) and _INTERVAL (minutes).
+        """
+        return cls(
+            enable=get_env_var(f"externapi.{name}.enable", False, bool),
+            access_key=get_env_var(f"externapi.{name}.access_key", ""),
+            max_request=get_env_var(f"externapi.{name}.max_request", 0, int),
+            interval=get_env_var(f"externapi.{name}.interval", 60, int),
+        )
 
 @dataclass
 class Config:
@@ -9,12 +9,21 @@ from pymongo.errors import DuplicateKeyError
 
 from src.lib.database.nosql.document.mongodb.mongodb_manager import MongoDBManager, mongodb_client
 from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+from src.lib.database.nosql.keyvalue.redis.cache_key import filter_digest, canonical_filter, CacheKeyRegistry
 from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.database.nosql.keyvalue.redis.redis_monitoring_middleware import REDIS_TOMBSTONE_HITS, REDIS_TOMBSTONE_WRITES
 from src.lib.log.api_logger import ApiLogger
 from src.lib.utility.utils import my_json_decoder, MyJSONEncoder
 from src.models.user.auth_model import UserToken
 
 
+# value cached under a document key when the document does not exist
+CACHE_TOMBSTONE = "__not_found__"
+
+# returned by _get when the cache holds a tombstone for the requested id
+NOT_FOUND = object()
+
+
 class MongoDBBaseModel(BaseModel):
 
     created_at: Optional[datetime] = datetime.now(timezone.utc)
@@ -109,12 +118,27 @@ class MongoDBBaseModel(BaseModel):
 
         api_logger.print_log()
 
+    @classmethod
+    def _cache_tombstone(cls, user_token: UserToken, data_id: str, expire: Optional[timedelta] = timedelta(minutes=1)):
+        key = cls._cache_key(user_token, data_id)
+
+        api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [TOMBSTONE] [CACHE] : key={key} and expire={expire}")
+
+        RedisManagerInstance.get_instance().set(key=key, value=CACHE_TOMBSTONE, ex=expire)
+        REDIS_TOMBSTONE_WRITES.labels(model=cls._name()).inc()
+
+        api_logger.print_log()
+
     @classmethod
     def _get(cls, user_token: UserToken, data_id: str):
         key = cls._cache_key(user_token, data_id)
 
         api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [GET] : {key}")
         data_caching = RedisManagerInstance.get_instance().get(key=key)
+        if data_caching == CACHE_TOMBSTONE:
+            REDIS_TOMBSTONE_HITS.labels(model=cls._name()).inc()
+            api_logger.print_log(extend_message="tombstone")
+            return NOT_FOUND
         if data_caching:
             data_json = json.loads(data_caching, object_hook=my_json_decoder)
             data_json['_id'] = ObjectId(data_json[cls._id_name()])
@@ -127,8 +151,13 @@ class MongoDBBaseModel(BaseModel):
 
     @classmethod
     def get(cls, user_token: UserToken, data_id: str):
+        if not ObjectId.is_valid(data_id):
+            return None
+
         try:
             data = cls._get(user_token, data_id)
+            if data is NOT_FOUND:
+                return None
             if data:
                 return data
         except Exception as e:
@@ -141,6 +170,7 @@ class MongoDBBaseModel(BaseModel):
 
         if result is None:
             api_logger.print_error(f"{cls._name()} not found")
+            cls._cache_tombstone(user_token, data_id)
             return None
 
         api_logger.print_log()
@@ -158,6 +188,7 @@ class MongoDBBaseModel(BaseModel):
             if self._data_id() is None:
                 with MONGO_QUERY_TIME.time():
                     result = self.collection().insert_one(self.to_bson())
+                self._scache(user_token, str(result.inserted_id))
             else:
                 self.updated_at = datetime.now(timezone.utc)
                 with MONGO_QUERY_TIME.time():
@@ -181,12 +212,12 @@ class MongoDBBaseModel(BaseModel):
         return result.deleted_count > 0
 
     @classmethod
-    def _cache_all_count_key(cls, user_token: UserToken, after_date: datetime = None, before_date: datetime = None):
-        return f"{cls._name()}:count:{after_date}:{before_date}"
+    def _cache_all_count_key(cls, user_token: UserToken, extra_match: dict = None, after_date: datetime = None, before_date: datetime = None):
+        return f"{cls._name()}:count:{filter_digest({'match': extra_match or {}, 'after': after_date, 'before': before_date})}"
 
     @classmethod
-    def _get_all_count(cls, user_token: UserToken, after_date: datetime = None, before_date: datetime = None):
-        key = cls._cache_all_count_key(user_token, after_date, before_date)
+    def _get_all_count(cls, user_token: UserToken, extra_match: dict = None, after_date: datetime = None, before_date: datetime = None):
+        key = cls._cache_all_count_key(user_token, extra_match, after_date, before_date)
 
         api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [GET LIST COUNT] : {key}")
         data_caching = RedisManagerInstance.get_instance().get(key=key)
@@ -200,11 +231,12 @@ class MongoDBBaseModel(BaseModel):
     def _cache_all_count(cls
                          , user_token: UserToken
                          , total: int
+                         , extra_match: dict = None
                          , after_date: datetime = None
                          , before_date: datetime = None
                          , expire: Optional[timedelta] = timedelta(minutes=10)
                          ):
-        key = cls._cache_all_count_key(user_token, after_date, before_date)
+        key = cls._cache_all_count_key(user_token, extra_match, after_date, before_date)
 
         api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [LIST COUNT] [CACHE] : {key}")
 
@@ -214,8 +246,8 @@ class MongoDBBaseModel(BaseModel):
         api_logger.print_log()
 
     @classmethod
-    def scache_all_count(cls, user_token: UserToken, after_date: datetime = None, before_date: datetime = None):
-        key = cls._cache_all_count_key(user_token, after_date, before_date)
+    def scache_all_count(cls, user_token: UserToken, extra_match: dict = None, after_date: datetime = None, before_date: datetime = None):
+        key = cls._cache_all_count_key(user_token, extra_match, after_date, before_date)
 
         api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [LIST COUNT] [SCACHE] : {key}")
 
@@ -233,7 +265,7 @@ class MongoDBBaseModel(BaseModel):
         if extra_match is None:
             extra_match = {}
 
-        total = cls._get_all_count(user_token, after_date, before_date)
+        total = cls._get_all_count(user_token, extra_match, after_date, before_date)
         if total:
             return total
 
@@ -276,20 +308,16 @@ class MongoDBBaseModel(BaseModel):
 
         api_logger.print_log()
 
-        cls._cache_all_count(user_token, total, after_date, before_date)
+        cls._cache_all_count(user_token, total, extra_match, after_date, before_date)
         return total
 
     @classmethod
-    def _cache_all_key(cls, user_token: UserToken, extra_match: dict = None, page: int = 1, limit: Optional[int] = 10):
-        if extra_match is None or len(extra_match) == 0:
-            return f"{cls._name()}:all:{page}:{limit}"
-        return f"{cls._name()}:all:{extra_match}:{page}:{limit}"
+    def _cache_all_family(cls) -> str:
+        return f"{cls._name()}:all"
 
     @classmethod
-    def _cache_all_key_pattern(cls, user_token: UserToken, extra_match: dict = None):
-        if extra_match is None or len(extra_match) == 0:
-            return f"{cls._name()}:all:*"
-        return f"{cls._name()}:all:{extra_match}:*"
+    def _cache_all_key(cls, user_token: UserToken, extra_match: dict = None, page: int = 1, limit: Optional[int] = 10):
+        return f"{cls._cache_all_family()}:{filter_digest(extra_match)}:{page}:{limit}"
 
     @classmethod
     def _get_all(cls, user_token: UserToken, extra_match: dict = None, page: int = 1, limit: Optional[int] = 10):
@@ -324,16 +352,26 @@ class MongoDBBaseModel(BaseModel):
 
         data_json = json.dumps(data, cls=MyJSONEncoder)
         RedisManagerInstance.get_instance().set(key=key, value=data_json, ex=expire)
+        CacheKeyRegistry.register(
+            family=cls._cache_all_family(),
+            digest=filter_digest(extra_match),
+            key=key,
+            canonical=canonical_filter(extra_match),
+            expire=expire
+        )
 
         api_logger.print_log()
 
     @classmethod
     def scache_get_all(cls, user_token: UserToken, extra_match: dict = None):
-        key_pattern = cls._cache_all_key_pattern(user_token, extra_match)
+        """
+        Invalidate the cached pages of one filter, or of every filter when extra_match is empty.
+        """
+        digest = filter_digest(extra_match) if extra_match else None
 
-        api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [LIST ALL] [SCACHE] : {key_pattern}")
+        api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [LIST ALL] [SCACHE] : family={cls._cache_all_family()} and digest={digest}")
 
-        RedisManagerInstance.get_instance().delete_pattern(pattern=key_pattern)
+        CacheKeyRegistry.invalidate(family=cls._cache_all_family(), digest=digest)
 
         api_logger.print_log()
 
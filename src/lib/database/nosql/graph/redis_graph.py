@@ -0,0 +1,148 @@
+import math
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+
+
+class RedisWeightedGraph:
+    """
+    Weighted graph stored in Redis: the adjacency of every node is a sorted set
+    (neighbour -> weight) and the weight of every node (its number of occurrences)
+    is one member of a nodes sorted set.
+
+    Keys:
+        graph:{name}:nodes          node -> weight
+        graph:{name}:adj:{node}     neighbour -> edge weight
+
+    Adjacency lists are trimmed to the `max_degree` heaviest edges, so memory and the
+    cost of a traversal are bounded whatever the number of edges recorded.
+    """
+
+    def __init__(self, name: str, max_degree: int = 500):
+        self.name = name
+        self.max_degree = max_degree
+        self.nodes_key = f"graph:{name}:nodes"
+
+    def _adjacency_key(self, node: str) -> str:
+        return f"graph:{self.name}:adj:{node}"
+
+    def update(self, nodes: dict[str, float], edges: dict[tuple[str, str], float], symmetric: bool = True):
+        """
+        Add (or subtract, with negative weights) node and edge weights in one round trip.
+        """
+        if not nodes and not edges:
+            return
+
+        touched = set()
+        pipeline = RedisManagerInstance.get_instance().pipeline()
+        for node, weight in nodes.items():
+            pipeline.zincrby(self.nodes_key, weight, node)
+        for (source, target), weight in edges.items():
+            pipeline.zincrby(self._adjacency_key(source), weight, target)
+            touched.add(source)
+            if symmetric:
+                pipeline.zincrby(self._adjacency_key(target), weight, source)
+                touched.add(target)
+        for node in touched:
+            key = self._adjacency_key(node)
+            pipeline.zremrangebyscore(key, "-inf", 0)
+            pipeline.zremrangebyrank(key, 0, -(self.max_degree + 1))
+        pipeline.zremrangebyscore(self.nodes_key, "-inf", 0)
+        pipeline.execute()
+
+    def node_weights(self, nodes: list[str]) -> dict[str, float]:
+        if not nodes:
+            return {}
+        scores = RedisManagerInstance.get_instance().zmscore(self.nodes_key, nodes)
+        return {node: float(score) for node, score in zip(nodes, scores) if score is not None}
+
+    def node_count(self) -> int:
+        return RedisManagerInstance.get_instance().zcard(self.nodes_key)
+
+    def neighbours(self, nodes: list[str], limit: int = 20) -> dict[str, list[tuple[str, float]]]:
+        """
+        The `limit` heaviest neighbours of each node, in one round trip.
+        """
+        pipeline = RedisManagerInstance.get_instance().pipeline()
+        for node in nodes:
+            pipeline.zrevrange(self._adjacency_key(node), 0, limit - 1, withscores=True)
+        return {
+            node: [(member.decode("utf-8") if isinstance(member, bytes) else member, float(weight)) for member, weight in adjacency]
+            for node, adjacency in zip(nodes, pipeline.execute())
+        }
+
+    def related(self, node: str, limit: int = 10, fanout: int = 100) -> list[tuple[str, float]]:
+        """
+        1-hop: neighbours ranked by cosine similarity w(a, b) / sqrt(w(a) * w(b)),
+        so that the most frequent nodes do not come first for every node.
+        """
+        adjacency = self.neighbours([node], limit=fanout)[node]
+        weights = self.node_weights([node] + [neighbour for neighbour, _ in adjacency])
+        node_weight = weights.get(node, 0.0)
+        if node_weight <= 0:
+            return []
+        scored = [
+            (neighbour, weight / math.sqrt(node_weight * weights[neighbour]))
+            for neighbour, weight in adjacency if weights.get(neighbour, 0.0) > 0
+        ]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+    def expand(self, seeds: Iterable[str], limit: int = 10, fanout: int = 20, hops: int = 2, decay: float = 0.5, exclude: Optional[set[str]] = None) -> list[tuple[str, float]]:
+        """
+        Nodes reachable from the seeds in at most `hops` hops, scored by the sum over the paths
+        of the product of the normalized edge weights (the k-th hop weighted by decay^(k-1)).
+        Only the `fanout` heaviest edges of each node are followed, so at most
+        len(seeds) * fanout^hops nodes are visited.
+        """
+        seeds = list(dict.fromkeys(seeds))
+        exclude = set(exclude or set()) | set(seeds)
+
+        scores = defaultdict(float)
+        frontier = {seed: 1.0 for seed in seeds}
+        for hop in range(hops):
+            if not frontier:
+                break
+            adjacency = self.neighbours(list(frontier), limit=fanout)
+            next_frontier = defaultdict(float)
+            for node, edges in adjacency.items():
+                total = sum(weight for _, weight in edges)
+                if total <= 0:
+                    continue
+                for neighbour, weight in edges:
+                    contribution = frontier[node] * weight / total
+                    next_frontier[neighbour] += contribution
+                    if neighbour not in exclude:
+                        scores[neighbour] += contribution * decay ** hop
+            # only the strongest nodes are expanded further
+            frontier = dict(sorted(next_frontier.items(), key=lambda item: item[1], reverse=True)[:fanout])
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def replace(self, other: "RedisWeightedGraph", batch_size: int = 1_000) -> int:
+        """
+        Move the graph `other` over this one key by key (RENAME): each adjacency list is
+        replaced at once and the lists of the nodes missing from `other` are deleted.
+        Returns the number of adjacency lists moved.
+        """
+        redis = RedisManagerInstance.get_instance()
+        prefix, other_prefix = self._adjacency_key(""), other._adjacency_key("")
+
+        moved = {key[len(other_prefix):] for key in redis.scan_keys(other._adjacency_key("*"))}
+        commands = [("rename", other_prefix + node, prefix + node) for node in moved]
+        commands += [("delete", key) for key in redis.scan_keys(self._adjacency_key("*")) if key[len(prefix):] not in moved]
+        commands.append(("rename", other.nodes_key, self.nodes_key) if redis.exists(other.nodes_key) else ("delete", self.nodes_key))
+
+        for start in range(0, len(commands), batch_size):
+            pipeline = redis.pipeline()
+            for command, *keys in commands[start:start + batch_size]:
+                getattr(pipeline, command)(*keys)
+            pipeline.execute()
+        return len(moved)
+
+    def clear(self) -> int:
+        redis = RedisManagerInstance.get_instance()
+        count = redis.delete_pattern(self._adjacency_key("*"))
+        redis.delete(self.nodes_key)
+        return count
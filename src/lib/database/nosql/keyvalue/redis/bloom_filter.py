@@ -0,0 +1,128 @@
+import hashlib
+import math
+from threading import Lock
+from typing import Iterable
+
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.database.nosql.keyvalue.redis.redis_monitoring_middleware import BLOOM_CHECKS, BLOOM_FALSE_POSITIVES, BLOOM_ESTIMATED_FPR
+from src.lib.log.api_logger import ApiLogger
+
+
+class RedisBloomFilter:
+    """
+    Bloom filter stored as a Redis bitmap (SETBIT/GETBIT), shared by every process.
+
+    The filter answers "definitely absent" or "maybe present". It is only trusted once
+    it has been fully built (see mark_ready); the ready marker records the size of the
+    bitmap so that changing the capacity or the error rate forces a rebuild.
+    """
+
+    def __init__(self, name: str, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.name = name
+        self.key = f"bloom:{name}"
+        self.ready_key = f"bloom:{name}:ready"
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        # observed on this process, for stats (the prometheus counters are for scraping)
+        self.negatives = 0
+        self.false_positives = 0
+        self._lock = Lock()
+
+    def _positions(self, item: str) -> list[int]:
+        # double hashing: k positions from two independent 64 bits hashes
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def _signature(self) -> str:
+        return f"{self.size}:{self.hash_count}"
+
+    def add(self, item: str):
+        self.add_many([item])
+
+    def add_many(self, items: Iterable[str]) -> int:
+        pipe = RedisManagerInstance.get_instance().pipeline()
+        count = 0
+        for item in items:
+            for position in self._positions(item):
+                pipe.setbit(self.key, position, 1)
+            count += 1
+        if count:
+            pipe.execute()
+        return count
+
+    def might_contain(self, item: str) -> bool:
+        pipe = RedisManagerInstance.get_instance().pipeline()
+        for position in self._positions(item):
+            pipe.getbit(self.key, position)
+        present = all(pipe.execute())
+        BLOOM_CHECKS.labels(filter=self.name, result="positive" if present else "negative").inc()
+        if not present:
+            with self._lock:
+                self.negatives += 1
+        return present
+
+    def might_contain_many(self, items: list[str]) -> list[bool]:
+        """
+        Membership of many items in one round trip.
+        """
+        if not items:
+            return []
+        pipe = RedisManagerInstance.get_instance().pipeline()
+        for item in items:
+            for position in self._positions(item):
+                pipe.getbit(self.key, position)
+        bits = pipe.execute()
+        present = [all(bits[index * self.hash_count:(index + 1) * self.hash_count]) for index in range(len(items))]
+        positives = sum(present)
+        BLOOM_CHECKS.labels(filter=self.name, result="positive").inc(positives)
+        BLOOM_CHECKS.labels(filter=self.name, result="negative").inc(len(items) - positives)
+        with self._lock:
+            self.negatives += len(items) - positives
+        return present
+
+    def record_false_positive(self):
+        BLOOM_FALSE_POSITIVES.labels(filter=self.name).inc()
+        with self._lock:
+            self.false_positives += 1
+
+    def is_ready(self) -> bool:
+        return RedisManagerInstance.get_instance().get(self.ready_key) == self._signature()
+
+    def mark_ready(self):
+        RedisManagerInstance.get_instance().set(self.ready_key, self._signature())
+
+    def clear(self):
+        pipe = RedisManagerInstance.get_instance().pipeline()
+        pipe.delete(self.ready_key)
+        pipe.delete(self.key)
+        pipe.execute()
+
+    def estimated_false_positive_rate(self) -> float:
+        bits_set = RedisManagerInstance.get_instance().bitcount(self.key)
+        rate = (bits_set / self.size) ** self.hash_count
+        BLOOM_ESTIMATED_FPR.labels(filter=self.name).set(rate)
+        return rate
+
+    def stats(self) -> dict:
+        api_logger = ApiLogger(f"[REDIS] [BLOOM FILTER] [STATS] : {self.key}")
+
+        # observed on this process: absent items are the negatives plus the false positives
+        with self._lock:
+            negatives, false_positives = self.negatives, self.false_positives
+        stats = {
+            "name": self.name,
+            "ready": self.is_ready(),
+            "capacity": self.capacity,
+            "target_false_positive_rate": self.error_rate,
+            "size_bits": self.size,
+            "hash_count": self.hash_count,
+            "estimated_false_positive_rate": self.estimated_false_positive_rate(),
+            "observed_false_positive_rate": (false_positives / (negatives + false_positives)) if (negatives + false_positives) else 0.0,
+        }
+
+        api_logger.print_log()
+        return stats
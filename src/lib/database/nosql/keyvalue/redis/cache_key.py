@@ -0,0 +1,182 @@
+import hashlib
+import json
+import re
+from datetime import datetime, date, timezone, timedelta
+from enum import Enum
+from typing import Any, Optional
+
+from bson import ObjectId
+from pydantic import BaseModel
+
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.log.api_logger import ApiLogger
+
+
+def _canonicalize(value: Any) -> Any:
+    """
+    Convert a filter into plain JSON values with an explicit type for the values
+    that JSON cannot tell apart (ObjectId, datetime, regex, ...).
+    """
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, Enum):
+        return _canonicalize(value.value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        # 1 and 1.0 match the same documents in MongoDB
+        return int(value) if value.is_integer() else value
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return {"$date": value.astimezone(timezone.utc).isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, re.Pattern):
+        return {"$regex": value.pattern, "$flags": value.flags}
+    if isinstance(value, BaseModel):
+        return _canonicalize(value.model_dump())
+    if isinstance(value, dict):
+        return {str(k): _canonicalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonicalize(v) for v in value), key=lambda v: json.dumps(v, sort_keys=True))
+    return {"$type": type(value).__name__, "value": str(value)}
+
+
+def canonical_filter(value: Any) -> str:
+    """
+    Stable serialization of a filter: two logically identical filters give the same string
+    whatever the order of their keys.
+    """
+    return json.dumps(_canonicalize(value if value is not None else {}), sort_keys=True, separators=(",", ":"))
+
+
+def filter_digest(value: Any) -> str:
+    return hashlib.blake2b(canonical_filter(value).encode("utf-8"), digest_size=8).hexdigest()
+
+
+class CacheKeyRegistry:
+    """
+    Keep track of the cache keys written for each filter of a key family, so that
+    invalidation deletes exactly those keys instead of scanning the keyspace.
+
+    Redis layout for a family (e.g. "article:all"):
+        {family}:registry                 set of digests
+        {family}:registry:{digest}        set of cache keys for that digest
+        {family}:registry:filters         hash digest -> canonical filter
+
+    The key set of a digest expires with its keys; the digests whose key set is gone are
+    pruned from the family set and hash (a random sample on every register and invalidate),
+    and these two expire with the longest lived digest, so the registry of a family with
+    ever new filters (per article, per preferences...) stays bounded.
+    """
+
+    prune_sample: int = 16
+
+    @staticmethod
+    def _digests_key(family: str) -> str:
+        return f"{family}:registry"
+
+    @staticmethod
+    def _keys_key(family: str, digest: str) -> str:
+        return f"{family}:registry:{digest}"
+
+    @staticmethod
+    def _filters_key(family: str) -> str:
+        return f"{family}:registry:filters"
+
+    @classmethod
+    def register(cls, family: str, digest: str, key: str | list[str], canonical: Optional[str] = None, expire: Optional[timedelta] = None):
+        keys = [key] if isinstance(key, str) else key
+        family_keys = (cls._digests_key(family), cls._filters_key(family))
+
+        pipe = RedisManagerInstance.get_instance().pipeline()
+        # ttl before the write: -2 new key, -1 kept forever by a digest registered without expire
+        for family_key in family_keys:
+            pipe.ttl(family_key)
+        pipe.sadd(cls._digests_key(family), digest)
+        pipe.sadd(cls._keys_key(family, digest), *keys)
+        if expire is not None:
+            # the registry entry never outlives the keys it points to by more than one write
+            pipe.expire(cls._keys_key(family, digest), expire)
+        if canonical is not None:
+            pipe.hset(cls._filters_key(family), digest, canonical)
+        pipe.srandmember(cls._digests_key(family), cls.prune_sample)
+        digests_ttl, filters_ttl, *_, sample = pipe.execute()
+
+        # the family set and hash live as long as their longest lived digest
+        pipe = RedisManagerInstance.get_instance().pipeline()
+        for family_key, ttl in zip(family_keys, (digests_ttl, filters_ttl)):
+            if expire is None:
+                pipe.persist(family_key)
+            elif ttl == -2 or 0 <= ttl < expire.total_seconds():
+                pipe.expire(family_key, expire)
+        pipe.execute()
+
+        cls._prune(family, [d for d in cls._decode(sample) if d != digest])
+
+    @staticmethod
+    def _decode(members) -> list[str]:
+        return [member.decode("utf-8") if isinstance(member, bytes) else member for member in members or []]
+
+    @classmethod
+    def _prune(cls, family: str, digests: list[str]) -> int:
+        """
+        Forget the digests whose key set expired.
+        """
+        if not digests:
+            return 0
+        redis_manager = RedisManagerInstance.get_instance()
+
+        pipe = redis_manager.pipeline()
+        for d in digests:
+            pipe.exists(cls._keys_key(family, d))
+        expired = [d for d, exists in zip(digests, pipe.execute()) if not exists]
+
+        if expired:
+            pipe = redis_manager.pipeline()
+            pipe.srem(cls._digests_key(family), *expired)
+            pipe.hdel(cls._filters_key(family), *expired)
+            pipe.execute()
+        return len(expired)
+
+    @classmethod
+    def keys(cls, family: str, digest: str) -> list[str]:
+        members = RedisManagerInstance.get_instance().smembers(cls._keys_key(family, digest))
+        return sorted(members)
+
+    @classmethod
+    def invalidate(cls, family: str, digest: Optional[str] = None) -> int:
+        api_logger = ApiLogger(f"[REDIS] [CACHE REGISTRY] [INVALIDATE] : family={family} and digest={digest}")
+
+        redis_manager = RedisManagerInstance.get_instance()
+        if digest:
+            digests = [digest]
+            # some other digests of the family, whose keys may have expired meanwhile
+            pipe = redis_manager.pipeline()
+            pipe.srandmember(cls._digests_key(family), cls.prune_sample)
+            cls._prune(family, [d for d in cls._decode(pipe.execute()[0]) if d != digest])
+        else:
+            digests = redis_manager.smembers(cls._digests_key(family))
+
+        keys = []
+        for d in digests:
+            keys.extend(redis_manager.smembers(cls._keys_key(family, d)))
+            keys.append(cls._keys_key(family, d))
+
+        pipe = redis_manager.pipeline()
+        if keys:
+            pipe.delete(*keys)
+        if digest:
+            pipe.srem(cls._digests_key(family), digest)
+            pipe.hdel(cls._filters_key(family), digest)
+        else:
+            pipe.delete(cls._digests_key(family), cls._filters_key(family))
+        pipe.execute()
+
+        api_logger.print_log(extend_message=f"{len(keys)} keys deleted")
+        return len(keys)
@@ -18,8 +18,16 @@ class RedisManager:
         api_logger.print_log()
 
     @monitor_redis_operations()
-    def set(self, key: str, value: str, ex: Optional[int | timedelta] = None):
-        return self.client.set(key, value, ex=ex)
+    def set(self, key: str, value: str, ex: Optional[int | timedelta] = None, nx: bool = False):
+        return self.client.set(key, value, ex=ex, nx=nx)
+
+    @monitor_redis_operations()
+    def set_many(self, values: dict[str, str], ex: Optional[int | timedelta] = None) -> int:
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.set(key, value, ex=ex)
+        pipe.execute()
+        return len(values)
 
     @monitor_redis_operations()
     def get(self, key: str) -> Optional[str]:
@@ -62,10 +70,88 @@ class RedisManager:
             count += 1
         return count
 
+    @monitor_redis_operations()
+    def scan_keys(self, pattern: str) -> list[str]:
+        """
+        Keys matching the pattern, listed with SCAN (the server is not blocked).
+        """
+        return [key.decode("utf-8") if isinstance(key, bytes) else key for key in self.client.scan_iter(match=pattern, count=1_000)]
+
+    @monitor_redis_operations()
+    def bitcount(self, key: str) -> int:
+        return self.client.bitcount(key)
+
+    @monitor_redis_operations()
+    def smembers(self, key: str) -> set[str]:
+        return {m.decode("utf-8") if isinstance(m, bytes) else m for m in self.client.smembers(key)}
+
+    @monitor_redis_operations()
+    def hget(self, key: str, field: str) -> Optional[str]:
+        value = self.client.hget(key, field)
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return value
+
+    @monitor_redis_operations()
+    def hgetall(self, key: str) -> dict[str, str]:
+        return {
+            (k.decode("utf-8") if isinstance(k, bytes) else k): (v.decode("utf-8") if isinstance(v, bytes) else v)
+            for k, v in self.client.hgetall(key).items()
+        }
+
+    @monitor_redis_operations()
+    def sunion(self, *keys: str) -> set[str]:
+        return {m.decode("utf-8") if isinstance(m, bytes) else m for m in self.client.sunion(list(keys))}
+
+    @monitor_redis_operations()
+    def zmscore(self, key: str, members: list[str]) -> list[Optional[float]]:
+        return self.client.zmscore(key, members)
+
+    @monitor_redis_operations()
+    def zcard(self, key: str) -> int:
+        return self.client.zcard(key)
+
+    def pipeline(self):
+        """
+        Non transactional pipeline: the commands are sent in a single round trip.
+        """
+        return self.client.pipeline(transaction=False)
+
+    def register_script(self, script: str):
+        """
+        Lua script run atomically on the server (EVALSHA, loaded on first use).
+        """
+        return self.client.register_script(script)
+
     @monitor_redis_operations()
     def exists(self, key: str) -> bool:
         return self.client.exists(key) > 0
 
+    @monitor_redis_operations()
+    def expire(self, key: str, ex: int | timedelta) -> bool:
+        return self.client.expire(key, ex)
+
+    @monitor_redis_operations()
+    def pfadd(self, key: str, *values: str, ex: Optional[int | timedelta] = None) -> int:
+        if ex is None:
+            return self.client.pfadd(key, *values)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.pfadd(key, *values)
+        pipe.expire(key, ex)
+        return pipe.execute()[0]
+
+    @monitor_redis_operations()
+    def pfcount(self, *keys: str) -> int:
+        return self.client.pfcount(*keys)
+
+    @monitor_redis_operations()
+    def pfmerge(self, dest: str, *sources: str, ex: Optional[int | timedelta] = None) -> bool:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.pfmerge(dest, *sources)
+        if ex is not None:
+            pipe.expire(dest, ex)
+        return pipe.execute()[0]
+
     @monitor_redis_operations()
     def flush_all(self):
         self.client.flushall()
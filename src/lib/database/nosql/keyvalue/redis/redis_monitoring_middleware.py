@@ -1,10 +1,15 @@
 from time import time
 
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Histogram, Gauge
 
 # Prometheus metrics
 REDIS_REQUESTS = Counter('redis_operations_total', 'Total Redis operations')
 REDIS_LATENCY = Histogram('redis_operation_latency_seconds', 'Redis operation latency')
+REDIS_TOMBSTONE_WRITES = Counter('redis_cache_tombstone_writes_total', 'Not-found lookups cached as tombstones', ['model'])
+REDIS_TOMBSTONE_HITS = Counter('redis_cache_tombstone_hits_total', 'Lookups answered by a cached tombstone', ['model'])
+BLOOM_CHECKS = Counter('redis_bloom_checks_total', 'Bloom filter membership checks', ['filter', 'result'])
+BLOOM_FALSE_POSITIVES = Counter('redis_bloom_false_positives_total', 'Bloom filter positives not confirmed by the database', ['filter'])
+BLOOM_ESTIMATED_FPR = Gauge('redis_bloom_estimated_false_positive_rate', 'Bloom filter false positive rate estimated from its fill ratio', ['filter'])
 
 def monitor_redis_operations():
     def decorator(f):
@@ -0,0 +1,90 @@
+import numpy as np
+from scipy import sparse
+
+
+class ItemCooccurrence:
+    """
+    Weighted item x item co-occurrence accumulated one chunk of users at a time:
+
+        counts[i, j] = sum over users of w(u, i) * w(u, j)      (i != j)
+        norms[i]     = sum over users of w(u, i)^2
+
+    so that counts[i, j] / sqrt(norms[i] * norms[j]) is the cosine similarity between
+    the item columns of the user x item matrix, without ever holding that matrix.
+
+    Memory is bounded by `max_pairs`: when the accumulated matrix holds more pairs,
+    the weakest half is dropped (those pairs can no longer reach the top-K lists). The
+    caller sizes the chunks so that one chunk product stays small next to `max_pairs`.
+
+    A pair dropped and seen again restarts from zero, so pairs are ranked for pruning by
+    an upper bound of their count (lossy counting): a pair first seen after a prune gets
+    `error`, the highest threshold pruned so far, kept in `errors`, and old pairs are not
+    favoured over pairs seen late. The counts stay lower bounds and are the ones returned.
+    """
+
+    def __init__(self, item_count: int, max_pairs: int = 20_000_000):
+        self.item_count = item_count
+        self.max_pairs = max_pairs
+        self.counts = sparse.csr_matrix((item_count, item_count), dtype=np.float32)
+        self.errors = sparse.csr_matrix((item_count, item_count), dtype=np.float32)
+        self.error = 0.0
+        self.norms = np.zeros(item_count, dtype=np.float64)
+        self.users = 0
+        self.prunes = 0
+
+    def add_users(self, users: np.ndarray, items: np.ndarray, weights: np.ndarray):
+        """
+        Add one chunk of (user, item, weight) triples, user indexes local to the chunk.
+        """
+        if len(users) == 0:
+            return
+
+        user_items = sparse.csr_matrix(
+            (weights.astype(np.float32), (users, items)),
+            shape=(int(users.max()) + 1, self.item_count),
+        )
+        user_items.sum_duplicates()
+
+        self.norms += np.bincount(user_items.indices, weights=user_items.data.astype(np.float64) ** 2, minlength=self.item_count)
+        self.users += user_items.shape[0]
+
+        chunk = (user_items.T.tocsr() @ user_items).tocsr()
+        chunk = chunk - sparse.diags(chunk.diagonal()).tocsr()
+        chunk.eliminate_zeros()
+
+        if self.error > 0:
+            unseen = (chunk - chunk.multiply(self._pattern(self.counts))).tocsr()
+            unseen.eliminate_zeros()
+            unseen.data[:] = self.error
+            self.errors = (self.errors + unseen).tocsr()
+
+        self.counts = (self.counts + chunk).tocsr()
+        if self.counts.nnz > self.max_pairs:
+            self._prune()
+
+    @staticmethod
+    def _pattern(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        pattern = matrix.copy()
+        pattern.data[:] = 1
+        return pattern
+
+    def _prune(self):
+        keep = self.max_pairs // 2
+        # errors only has entries where counts has: same pattern
+        upper = (self.counts + self.errors).tocsr()
+        threshold = np.partition(upper.data, len(upper.data) - keep)[len(upper.data) - keep]
+        upper.data[upper.data < threshold] = 0
+        upper.eliminate_zeros()
+
+        kept = self._pattern(upper)
+        self.counts = self.counts.multiply(kept).tocsr()
+        self.errors = self.errors.multiply(kept).tocsr()
+        self.error = max(self.error, float(threshold))
+        self.prunes += 1
+
+    def cosine(self) -> sparse.csr_matrix:
+        inverse_norms = np.zeros(self.item_count, dtype=np.float64)
+        positive = self.norms > 0
+        inverse_norms[positive] = 1.0 / np.sqrt(self.norms[positive])
+        scale = sparse.diags(inverse_norms.astype(np.float32))
+        return (scale @ self.counts @ scale).tocsr()
@@ -0,0 +1,59 @@
+import hashlib
+import zlib
+
+import numpy as np
+
+from src.lib.search import text_analyzer
+
+# Mersenne prime 2^61 - 1: (a * h + b) stays below 2^64 with 32 bits hashes and coefficients
+_PRIME = np.uint64((1 << 61) - 1)
+
+
+def shingles(text: str, size: int = 2) -> set[str]:
+    """
+    Word n-grams of the analyzed text (stemmed, without stopwords), so that the
+    shingles survive small wording, case and punctuation differences.
+    """
+    terms = text_analyzer.analyze(text or "")
+    if len(terms) < size:
+        return set(terms)
+    return {" ".join(terms[i:i + size]) for i in range(len(terms) - size + 1)}
+
+
+class MinHasher:
+    """
+    MinHash signatures with `num_perm` universal hash functions (a * h + b) mod p,
+    computed in one vectorized pass, and LSH banding: two texts whose Jaccard similarity
+    is s share at least one of the `bands` bands with probability 1 - (1 - s^rows)^bands.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 42):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, features: set[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in features), dtype=np.uint64, count=len(features))
+        if len(hashes) == 0:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return permuted.min(axis=0)
+
+    def band_keys(self, signature: np.ndarray) -> list[str]:
+        return [
+            f"{band}:{hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8).hexdigest()}"
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """
+        Estimated Jaccard similarity of the two feature sets.
+        """
+        return float(np.mean(first == second))
@@ -0,0 +1,155 @@
+import bisect
+import heapq
+import math
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+from src.lib.search import text_analyzer
+
+
+class PrefixSuggester:
+    """
+    In-memory search-as-you-type structure over the tokens of short texts (titles).
+
+    Tokens are kept in a sorted list, so the tokens starting with a prefix are one
+    bisect away. Each token has a posting list of (-weight, key) sorted by weight and
+    capped to `max_postings_per_token`. The weight is static:
+
+        weight = ln(1 + popularity) + published_at / recency_scale
+
+    so a text published `recency_scale` later is worth e times more popularity, and
+    postings never need to be re-sorted as time passes.
+
+    With `max_texts`, the oldest texts (publication date) are evicted past that number.
+    """
+
+    def __init__(self
+                 , max_postings_per_token: int = 128
+                 , max_prefix_tokens: int = 512
+                 , recency_scale: timedelta = timedelta(days=1)
+                 , max_texts: Optional[int] = None
+                 ):
+        self.max_postings_per_token = max_postings_per_token
+        self.max_prefix_tokens = max_prefix_tokens
+        self.recency_scale = recency_scale
+        self.max_texts = max_texts
+
+        self._lock = threading.RLock()
+        self._tokens: list[str] = []
+        self._postings: dict[str, list[tuple[float, str]]] = {}
+        self._texts: dict[str, str] = {}
+        # key -> (posting entry, tokens of the text)
+        self._entries: dict[str, tuple[tuple[float, str], frozenset[str]]] = {}
+        # (publication timestamp, key): the oldest text is evicted first
+        self._ages: list[tuple[float, str]] = []
+
+    def __len__(self):
+        return len(self._texts)
+
+    def weight(self, published_at: Optional[datetime], popularity: int = 0) -> float:
+        recency = 0.0
+        if published_at:
+            if published_at.tzinfo is None:
+                published_at = published_at.replace(tzinfo=timezone.utc)
+            recency = published_at.timestamp() / self.recency_scale.total_seconds()
+        return math.log1p(max(popularity, 0)) + recency
+
+    def clear(self):
+        with self._lock:
+            self._tokens = []
+            self._postings = {}
+            self._texts = {}
+            self._entries = {}
+            self._ages = []
+
+    def add(self, key: str, text: str, published_at: Optional[datetime] = None, popularity: int = 0) -> bool:
+        tokens = set(text_analyzer.tokenize(text or ""))
+        if not tokens:
+            return False
+
+        entry = (-self.weight(published_at, popularity), key)
+        age = (published_at.replace(tzinfo=published_at.tzinfo or timezone.utc).timestamp() if published_at else 0.0, key)
+        with self._lock:
+            if key in self._texts:
+                return False
+            self._texts[key] = text
+            self._entries[key] = (entry, frozenset(tokens))
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    bisect.insort(self._tokens, token)
+                    postings = self._postings[token] = []
+                bisect.insort(postings, entry)
+                if len(postings) > self.max_postings_per_token:
+                    postings.pop()
+            if self.max_texts:
+                heapq.heappush(self._ages, age)
+                while len(self._texts) > self.max_texts and self._ages:
+                    self.remove(heapq.heappop(self._ages)[1])
+        return True
+
+    def remove(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._texts:
+                return False
+            del self._texts[key]
+            entry, tokens = self._entries.pop(key)
+            for token in tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                index = bisect.bisect_left(postings, entry)
+                if index < len(postings) and postings[index] == entry:
+                    postings.pop(index)
+                if not postings:
+                    del self._postings[token]
+                    self._tokens.pop(bisect.bisect_left(self._tokens, token))
+        return True
+
+    def suggest(self, query: str, limit: int = 10) -> list[tuple[str, str]]:
+        """
+        (key, text) of the best texts containing every complete word of the query
+        and a word starting with its last (partial) word, best first.
+
+        Candidates come from the postings of the prefix tokens and of the complete words and
+        are checked against the tokens of their own text, so a match is only missed when it
+        is past the `max_postings_per_token` cap of every one of its query tokens.
+        """
+        tokens = text_analyzer.tokenize(query or "")
+        if not tokens:
+            return []
+        prefix, complete = tokens[-1], frozenset(tokens[:-1])
+
+        with self._lock:
+            start = bisect.bisect_left(self._tokens, prefix)
+            end = bisect.bisect_left(self._tokens, prefix + "\uffff", lo=start)
+            prefix_tokens = self._tokens[start:end]
+            if len(prefix_tokens) > self.max_prefix_tokens:
+                # the tokens holding the heaviest texts, not the first ones alphabetically
+                prefix_tokens = heapq.nsmallest(self.max_prefix_tokens, prefix_tokens, key=lambda token: self._postings[token][0])
+
+            sources = [self._postings[token] for token in prefix_tokens]
+            sources.extend(self._postings[token] for token in complete if token in self._postings)
+
+            suggestions = []
+            seen_keys = set()
+            seen_texts = set()
+            # posting lists are sorted by weight: merging them yields the best texts first
+            for _, key in heapq.merge(*sources):
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                key_tokens = self._entries[key][1]
+                if not complete <= key_tokens or not any(token.startswith(prefix) for token in key_tokens):
+                    continue
+                text = self._texts[key]
+                normalized = text_analyzer.normalize(text)
+                if normalized in seen_texts:
+                    continue
+                seen_texts.add(normalized)
+                suggestions.append((key, text))
+                if len(suggestions) >= limit:
+                    break
+
+        return suggestions
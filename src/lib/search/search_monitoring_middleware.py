@@ -0,0 +1,5 @@
+from prometheus_client import Summary, Counter
+
+SEARCH_QUERY_TIME = Summary('search_query_duration_seconds', 'Time spent answering full-text search queries')
+SEARCH_FALLBACKS = Counter('search_fallback_total', 'Search queries answered without the inverted index', ['reason'])
+NEAR_DUPLICATES = Counter('article_near_duplicate_checks_total', 'Near-duplicate lookups at ingestion', ['result'])
@@ -0,0 +1,98 @@
+import re
+import unicodedata
+from collections import Counter
+from typing import Iterable
+
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no nor not now of off on once only or other
+our ours ourselves out over own same she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which while who whom why will
+with would you your yours yourself yourselves
+""".split())
+
+# words ending in -s (or -ies) that are not plurals, or whose stem would merge them with an unrelated word
+STEM_EXCEPTIONS = frozenset("""
+alias always atlas bias canvas chaos crisis economics gas lens mars news perhaps physics politics series species
+texas thanks whereas
+""".split())
+
+
+def normalize(text: str) -> str:
+    # lowercase and strip accents so that "Café" and "cafe" give the same token
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _strip_verb_suffix(token: str, suffix: str) -> str:
+    base = token[:-len(suffix)]
+    if not any(c in "aeiouy" for c in base):
+        return token
+    # running -> run, stopped -> stop
+    if len(base) > 3 and base[-1] == base[-2] and base[-1] not in "lsz":
+        return base[:-1]
+    return base
+
+
+def stem(token: str) -> str:
+    """
+    Light suffix-stripping stemmer (plurals, -ing, -ed). It is deliberately
+    conservative: a wrong merge hurts precision more than a missed one hurts recall.
+    """
+    if len(token) <= 3 or token.isdigit() or token in STEM_EXCEPTIONS:
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith("sses"):
+        return token[:-2]
+    if token.endswith("ing") and len(token) > 5:
+        return _strip_verb_suffix(token, "ing")
+    if token.endswith("ed") and len(token) > 4:
+        return _strip_verb_suffix(token, "ed")
+    if token.endswith("es") and token[-3] in "sxz":
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(normalize(text))
+
+
+def analyze(text: str) -> list[str]:
+    """Tokens of a text as stored in the index: normalized, without stopwords and stemmed."""
+    return [stem(token) for token in tokenize(text) if len(token) > 1 and token not in STOPWORDS]
+
+
+def term_frequencies(fields: Iterable[tuple[str, float]]) -> tuple[dict[str, float], float]:
+    """
+    Weighted term frequencies of a document made of several (text, weight) fields,
+    and its weighted length.
+    """
+    frequencies = Counter()
+    length = 0.0
+    for text, weight in fields:
+        terms = analyze(text)
+        length += weight * len(terms)
+        for term in terms:
+            frequencies[term] += weight
+    return dict(frequencies), length
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Character trigrams of the words of a text, each word padded like pg_trgm
+    ("  word ") so that prefixes weigh more and short words still give trigrams.
+    """
+    grams = set()
+    for token in tokenize(text):
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
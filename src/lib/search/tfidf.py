@@ -0,0 +1,93 @@
+import numpy as np
+from scipy import sparse
+
+
+def tfidf_matrix(documents: list[dict[str, float]], max_df: float = 0.5) -> sparse.csr_matrix:
+    """
+    L2 normalized TF-IDF matrix (one row per document) of documents given as
+    term -> (weighted) term frequency. Term frequencies are sublinear (1 + ln tf) and
+    the terms found in more than `max_df` of the documents are dropped: they would make
+    almost every pair of documents similar and the products dense.
+    """
+    vocabulary: dict[str, int] = {}
+    rows, columns, values = [], [], []
+    for row, frequencies in enumerate(documents):
+        for term, tf in frequencies.items():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(term, len(vocabulary)))
+            values.append(tf)
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float32), (np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64))),
+        shape=(len(documents), len(vocabulary)),
+        dtype=np.float32,
+    )
+    return tfidf_weight(matrix, max_df=max_df)
+
+
+def tfidf_weight(matrix: sparse.csr_matrix, max_df: float = 0.5) -> sparse.csr_matrix:
+    """
+    L2 normalized TF-IDF weighting (see tfidf_matrix) of a matrix of (weighted) term
+    frequencies, one row per document and one column per term. Columns of terms no
+    document uses are allowed: they stay empty.
+    """
+    if matrix.nnz == 0:
+        return matrix
+
+    matrix.data = 1.0 + np.log(np.maximum(matrix.data, 1.0))
+
+    doc_count = matrix.shape[0]
+    document_frequencies = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = np.log((1.0 + doc_count) / (1.0 + document_frequencies)) + 1.0
+    if doc_count > 10:
+        idf[document_frequencies > max_df * doc_count] = 0.0
+    matrix.data *= idf[matrix.indices].astype(np.float32)
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sparse.diags(1.0 / norms).astype(np.float32) @ matrix
+    matrix.eliminate_zeros()
+    return matrix.tocsr()
+
+
+def top_k_cosine(matrix: sparse.csr_matrix, rows: np.ndarray, k: int = 20, block_size: int = 256, min_score: float = 0.05) -> list[list[tuple[int, float]]]:
+    """
+    For each requested row of a L2 normalized matrix, the `k` most similar other rows
+    as (row, cosine similarity), best first.
+
+    Similarities are computed `block_size` query rows at a time (one sparse product
+    against the whole matrix) so memory is bounded by the block and not by rows x rows.
+    """
+    neighbours = []
+    transposed = matrix.T.tocsr()
+    for start in range(0, len(rows), block_size):
+        block_rows = rows[start:start + block_size]
+        similarities = (matrix[block_rows] @ transposed).tocsr()
+        neighbours.extend(top_k_rows(similarities, k=k, min_score=min_score, exclude=block_rows))
+
+    return neighbours
+
+
+def top_k_rows(similarities: sparse.csr_matrix, k: int = 20, min_score: float = 0.0, exclude: np.ndarray | None = None) -> list[list[tuple[int, float]]]:
+    """
+    The `k` highest (column, score) of every row of a sparse similarity matrix, best first.
+    `exclude[row]` is a column to skip for that row (the row itself in a square matrix).
+    """
+    neighbours = []
+    for row in range(similarities.shape[0]):
+        begin, end = similarities.indptr[row], similarities.indptr[row + 1]
+        columns = similarities.indices[begin:end]
+        scores = similarities.data[begin:end]
+
+        keep = scores >= min_score
+        if exclude is not None:
+            keep &= columns != exclude[row]
+        columns, scores = columns[keep], scores[keep]
+
+        if len(scores) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+            columns, scores = columns[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        neighbours.append([(int(columns[i]), float(scores[i])) for i in order])
+
+    return neighbours
@@ -0,0 +1,188 @@
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+from bson import ObjectId
+from flask_restx import Namespace, fields
+
+from src.lib.configuration import configuration
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.log.api_logger import ApiLogger
+from src.lib.search.minhash import MinHasher, shingles
+from src.lib.search.search_monitoring_middleware import NEAR_DUPLICATES
+from src.models import DataBaseModel
+from src.models.article.article_source_model import ArticleSourceModel
+
+
+class ArticleDuplicateModel(DataBaseModel):
+    extern_api: Optional[str] = None
+    extern_id: Optional[str] = None
+    title: Optional[str] = None
+    url: Optional[str] = None
+    source: Optional[ArticleSourceModel] = None
+    published_at: Optional[str | datetime] = None
+    similarity: float = 0.0
+
+    @staticmethod
+    def to_model(name_space: Namespace):
+        return name_space.model('ArticleDuplicateModel', {
+            'extern_api': fields.String(required=False),
+            'extern_id': fields.String(required=False),
+            'title': fields.String(required=False),
+            'url': fields.String(required=False),
+            'source': fields.Nested(ArticleSourceModel.to_model(name_space)),
+            'published_at': fields.String(required=False),
+            'similarity': fields.Float(required=False),
+        })
+
+
+class ArticleNearDuplicateDetector:
+    """
+    Near-duplicate detection at ingestion (the same wire story from several providers).
+
+    Each article gets a MinHash signature over the word shingles of its title and
+    description. LSH buckets live in Redis, one sorted set per band value holding the ids of
+    the recent articles with that band scored by insert time, trimmed to `window` (and to the
+    newest `max_bucket` ids) on every insert, so a lookup only ever sees the recent articles:
+    one pipelined ZRANGEBYSCORE over the bands, then one pipelined GET of the signatures of
+    the `max_candidates` candidates sharing the most bands to estimate their Jaccard similarity.
+    """
+
+    min_shingles: int = 4
+    max_candidates: int = 50
+    max_bucket: int = 1_000
+    window: timedelta = timedelta(days=3)
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 64, bands: int = 16):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm, bands=bands)
+
+    @staticmethod
+    def _bucket_key(band_key: str) -> str:
+        return f"article:lsh:bucket:{band_key}"
+
+    @staticmethod
+    def _signature_key(article_id: str) -> str:
+        return f"article:lsh:signature:{article_id}"
+
+    def signature(self, title: Optional[str], description: Optional[str]) -> Optional[np.ndarray]:
+        features = shingles(f"{title or ''} {description or ''}")
+        if len(features) < self.min_shingles:
+            return None
+        return self.hasher.signature(features)
+
+    def find(self, signature: Optional[np.ndarray]) -> Optional[tuple[ObjectId, float]]:
+        """
+        The most similar recent article above the threshold, with its similarity.
+        """
+        return self.find_many([signature])[0]
+
+    def find_many(self, signatures: list[Optional[np.ndarray]]) -> list[Optional[tuple[ObjectId, float]]]:
+        """
+        find() for a batch of signatures in two round trips: one pipelined ZRANGEBYSCORE over
+        the bands of every signature, then one pipelined GET of all their candidates.
+        """
+        band_keys = [self.hasher.band_keys(signature) if signature is not None else [] for signature in signatures]
+        if not any(band_keys):
+            return [None] * len(signatures)
+
+        redis = RedisManagerInstance.get_instance()
+
+        since = time.time() - self.window.total_seconds()
+        pipeline = redis.pipeline()
+        for keys in band_keys:
+            for band_key in keys:
+                pipeline.zrangebyscore(self._bucket_key(band_key), since, "+inf")
+        members = iter(pipeline.execute())
+
+        candidates = []
+        for keys in band_keys:
+            shared_bands = Counter()
+            for _ in keys:
+                shared_bands.update(member.decode("utf-8") if isinstance(member, bytes) else member for member in next(members))
+            # the most shared bands first (the likeliest duplicates), then the newest ids
+            best = sorted(shared_bands.items(), key=lambda item: (item[1], item[0]), reverse=True)[:self.max_candidates]
+            candidates.append([article_id for article_id, _ in best])
+
+        stored_signatures = {}
+        lookups = sorted({article_id for found in candidates for article_id in found})
+        if lookups:
+            pipeline = redis.pipeline()
+            for article_id in lookups:
+                pipeline.get(self._signature_key(article_id))
+            stored_signatures = {article_id: stored for article_id, stored in zip(lookups, pipeline.execute()) if stored}
+
+        results = []
+        for signature, found in zip(signatures, candidates):
+            if signature is None:
+                results.append(None)
+                continue
+            best = None
+            for article_id in found:
+                stored = stored_signatures.get(article_id)
+                if not stored:
+                    continue
+                similarity = MinHasher.similarity(signature, np.frombuffer(stored, dtype=np.uint64))
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (ObjectId(article_id), similarity)
+            NEAR_DUPLICATES.labels(result="duplicate" if best else "unique").inc()
+            results.append(best)
+        return results
+
+    def find_local(self, signature: Optional[np.ndarray], buckets: dict[str, list[int]], signatures: list[np.ndarray]) -> Optional[tuple[int, float]]:
+        """
+        The same lookup among articles not stored yet (a bulk insert): `buckets` maps band keys to
+        positions in `signatures` (see add_local). Returns the position of the most similar one.
+        """
+        if signature is None:
+            return None
+        best = None
+        positions = {position for band_key in self.hasher.band_keys(signature) for position in buckets.get(band_key, [])}
+        for position in positions:
+            similarity = MinHasher.similarity(signature, signatures[position])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (position, similarity)
+        return best
+
+    def add_local(self, position: int, signature: Optional[np.ndarray], buckets: dict[str, list[int]]):
+        if signature is None:
+            return
+        for band_key in self.hasher.band_keys(signature):
+            buckets.setdefault(band_key, []).append(position)
+
+    def add(self, article_id, signature: Optional[np.ndarray]):
+        self.add_many([(article_id, signature)])
+
+    def add_many(self, articles: list[tuple[object, Optional[np.ndarray]]]):
+        """
+        Add (article id, signature) pairs to the buckets in one round trip.
+        """
+        articles = [(str(article_id), signature) for article_id, signature in articles if signature is not None]
+        if not articles:
+            return
+
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE NEAR DUPLICATE] [ADD] : {len(articles)} articles")
+
+        now = time.time()
+        buckets = set()
+        pipeline = RedisManagerInstance.get_instance().pipeline()
+        for article_id, signature in articles:
+            pipeline.set(self._signature_key(article_id), signature.astype(np.uint64).tobytes(), ex=self.window)
+            for band_key in self.hasher.band_keys(signature):
+                pipeline.zadd(self._bucket_key(band_key), {article_id: now})
+                buckets.add(self._bucket_key(band_key))
+        # a busy bucket never expires: its old ids are trimmed instead
+        for key in buckets:
+            pipeline.zremrangebyscore(key, "-inf", now - self.window.total_seconds())
+            pipeline.zremrangebyrank(key, 0, -(self.max_bucket + 1))
+            pipeline.expire(key, self.window)
+        pipeline.execute()
+
+        api_logger.print_log()
+
+
+ARTICLE_NEAR_DUPLICATE_DETECTOR = ArticleNearDuplicateDetector(
+    threshold=configuration.get_env_var("article.near_duplicate.threshold", 0.7, float),
+)
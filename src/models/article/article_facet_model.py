@@ -0,0 +1,269 @@
+import json
+from collections import Counter
+from datetime import timedelta
+from typing import Optional, Iterable
+
+from flask_restx import Namespace, fields
+from pymongo import UpdateOne
+
+from src.lib.database.nosql.document.mongodb.mongodb_manager import MongoDBManager, mongodb_client
+from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+from src.lib.database.nosql.keyvalue.redis.cache_key import CacheKeyRegistry, filter_digest
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.log.api_logger import ApiLogger
+from src.models import DataBaseModel
+
+
+# facet name -> article field
+FACET_FIELDS = {
+    "extern_api": "extern_api",
+    "source": "source.name",
+    "language": "language",
+    "country": "country",
+}
+
+
+class ArticleFacetFilter(DataBaseModel):
+    extern_api: Optional[str] = None
+    source: Optional[str] = None
+    language: Optional[str] = None
+    country: Optional[str] = None
+    tag: Optional[str] = None
+
+    @classmethod
+    def from_args(cls, args) -> Optional["ArticleFacetFilter"]:
+        facets = cls(**{name: (args.get(name) or "").strip() or None for name in cls.model_fields})
+        return facets if facets else None
+
+    def __bool__(self):
+        return any(value is not None for value in self.model_dump().values())
+
+    def to_query(self) -> dict:
+        query = {FACET_FIELDS[name]: value for name, value in self.model_dump().items() if name in FACET_FIELDS and value is not None}
+        if self.tag is not None:
+            query["tags"] = self.tag
+        return query
+
+
+class ArticleFacetValueModel(DataBaseModel):
+    value: str
+    count: int = 0
+
+    @staticmethod
+    def to_model(name_space: Namespace):
+        return name_space.model('ArticleFacetValueModel', {
+            'value': fields.String(required=True),
+            'count': fields.Integer(required=True),
+        })
+
+
+class ArticleFacetsModel(DataBaseModel):
+    extern_api: list[ArticleFacetValueModel] = []
+    source: list[ArticleFacetValueModel] = []
+    language: list[ArticleFacetValueModel] = []
+    country: list[ArticleFacetValueModel] = []
+    tag: list[ArticleFacetValueModel] = []
+
+    @staticmethod
+    def to_model(name_space: Namespace):
+        facet_value_model = ArticleFacetValueModel.to_model(name_space)
+        return name_space.model('ArticleFacetsModel', {
+            name: fields.List(fields.Nested(facet_value_model))
+            for name in ["extern_api", "source", "language", "country", "tag"]
+        })
+
+
+class ArticleFacetCounter:
+    """
+    Number of articles per facet value (provider, source, language, country),
+    incremented at ingest time so that facet counts never need a group-by per request.
+
+    One document per facet value: {_id: "<facet>:<value>", facet, value, count}.
+
+    A rebuild writes a temporary collection renamed over the counters once complete, so the
+    counts never read 0. While the rebuild flag is set, the increments only go to a Redis
+    hash (the flag check and the increment are one script): the counters do not move during
+    the rebuild, then the flag is deleted and the hash applied once to the new counters (to
+    the old ones on abort). An article saved during the aggregation itself may be counted twice.
+    """
+
+    cache_expire: timedelta = timedelta(minutes=1)
+    cache_family: str = "article:facets"
+
+    REBUILD_KEY = "article:facet:counters:rebuild"
+    DELTA_KEY = "article:facet:counters:rebuild:delta"
+
+    # KEYS: rebuild flag, delta hash. ARGV: field, count, field, count... 1 when kept in the delta
+    RECORD_DELTA_SCRIPT = """
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return 0
+    end
+    for i = 1, #ARGV, 2 do
+        redis.call('HINCRBY', KEYS[2], ARGV[i], ARGV[i + 1])
+    end
+    redis.call('EXPIRE', KEYS[2], 86400)
+    return 1
+    """
+
+    # KEYS: delta hash. Its fields and counts, the hash deleted
+    TAKE_DELTA_SCRIPT = """
+    local delta = redis.call('HGETALL', KEYS[1])
+    redis.call('DEL', KEYS[1])
+    return delta
+    """
+
+    _record_delta_script = None
+    _take_delta_script = None
+
+    @classmethod
+    def counters(cls):
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("article_facet")]
+
+    @classmethod
+    def init(cls):
+        try:
+            cls.counters().create_index([("facet", 1), ("count", -1)])
+        except Exception as e:
+            print(e)
+
+    @staticmethod
+    def _facet_values(article: dict) -> dict[str, str]:
+        values = {}
+        for name, field in FACET_FIELDS.items():
+            value = article
+            for part in field.split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            if isinstance(value, str) and value.strip():
+                values[name] = value.strip()
+        return values
+
+    @classmethod
+    def _update(cls, articles: Iterable[dict], step: int) -> int:
+        counts = Counter()
+        for article in articles:
+            for name, value in cls._facet_values(article).items():
+                counts[(name, value)] += step
+        if not counts:
+            return 0
+
+        args = [item for (name, value), count in counts.items() for item in (f"{name}:{value}", count)]
+        if cls._scripts()[0](keys=[cls.REBUILD_KEY, cls.DELTA_KEY], args=args):
+            # rebuilding: applied to the new counters once swapped
+            return len(counts)
+
+        operations = [
+            UpdateOne({"_id": f"{name}:{value}"}, {"$inc": {"count": count}, "$setOnInsert": {"facet": name, "value": value}}, upsert=True)
+            for (name, value), count in counts.items()
+        ]
+        with MONGO_QUERY_TIME.time():
+            cls.counters().bulk_write(operations, ordered=False)
+        return len(operations)
+
+    @classmethod
+    def _scripts(cls):
+        if cls._record_delta_script is None:
+            redis = RedisManagerInstance.get_instance()
+            cls._take_delta_script = redis.register_script(cls.TAKE_DELTA_SCRIPT)
+            cls._record_delta_script = redis.register_script(cls.RECORD_DELTA_SCRIPT)
+        return cls._record_delta_script, cls._take_delta_script
+
+    @classmethod
+    def _apply_delta(cls) -> int:
+        """
+        Apply (once) the increments kept during the rebuild to the counters.
+        """
+        delta = cls._scripts()[1](keys=[cls.DELTA_KEY])
+        operations = []
+        for index in range(0, len(delta), 2):
+            field = delta[index].decode("utf-8") if isinstance(delta[index], bytes) else delta[index]
+            count = int(delta[index + 1])
+            if count:
+                name, value = field.split(":", 1)
+                operations.append(UpdateOne({"_id": field}, {"$inc": {"count": count}, "$setOnInsert": {"facet": name, "value": value}}, upsert=True))
+        if operations:
+            with MONGO_QUERY_TIME.time():
+                cls.counters().bulk_write(operations, ordered=False)
+        return len(operations)
+
+    @classmethod
+    def record(cls, articles: Iterable[dict]) -> int:
+        return cls._update(articles, 1)
+
+    @classmethod
+    def remove(cls, articles: Iterable[dict]) -> int:
+        return cls._update(articles, -1)
+
+    @classmethod
+    def start_rebuild(cls):
+        """
+        Keep the increments from now on, until replace_all (or abort_rebuild).
+        """
+        pipe = RedisManagerInstance.get_instance().pipeline()
+        pipe.delete(cls.DELTA_KEY)
+        pipe.set(cls.REBUILD_KEY, "1", ex=timedelta(hours=1))
+        pipe.execute()
+
+    @classmethod
+    def abort_rebuild(cls):
+        # the increments kept meanwhile go to the old counters
+        RedisManagerInstance.get_instance().delete(key=cls.REBUILD_KEY)
+        cls._apply_delta()
+
+    @classmethod
+    def replace_all(cls, counts: dict[tuple[str, str], int]) -> int:
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE FACET] [REPLACE ALL] : {len(counts)} values")
+
+        counters = cls.counters()
+        rebuild = counters.database[f"{counters.name}-rebuild"]
+        with MONGO_QUERY_TIME.time():
+            rebuild.drop()
+            if counts:
+                rebuild.insert_many([
+                    {"_id": f"{name}:{value}", "facet": name, "value": value, "count": count}
+                    for (name, value), count in counts.items()
+                ], ordered=False)
+            rebuild.create_index([("facet", 1), ("count", -1)])
+
+            if counts:
+                rebuild.rename(counters.name, dropTarget=True)
+            else:
+                counters.delete_many({})
+
+        # from now on the increments go to the new counters, the ones kept meanwhile are added once
+        RedisManagerInstance.get_instance().delete(key=cls.REBUILD_KEY)
+        updated = cls._apply_delta()
+
+        CacheKeyRegistry.invalidate(family=cls.cache_family)
+
+        api_logger.print_log(extend_message=f"{updated} values updated during the rebuild")
+        return len(counts)
+
+    @classmethod
+    def top_values(cls, limit: int = 10) -> dict[str, list[dict]]:
+        """
+        The `limit` most frequent values of every facet.
+        """
+        digest = filter_digest({"limit": limit})
+        key = f"{cls.cache_family}:{digest}"
+        data_caching = RedisManagerInstance.get_instance().get(key=key)
+        if data_caching:
+            return json.loads(data_caching)
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE FACET] [TOP VALUES] : limit={limit}")
+
+        values = {}
+        with MONGO_QUERY_TIME.time():
+            for name in FACET_FIELDS:
+                cursor = cls.counters().find({"facet": name, "count": {"$gt": 0}}, projection={"_id": 0, "value": 1, "count": 1}).sort("count", -1).limit(limit)
+                values[name] = list(cursor)
+
+        RedisManagerInstance.get_instance().set(key=key, value=json.dumps(values), ex=cls.cache_expire)
+        CacheKeyRegistry.register(family=cls.cache_family, digest=digest, key=key, expire=cls.cache_expire)
+
+        api_logger.print_log()
+        return values
+
+    @classmethod
+    def count(cls) -> int:
+        with MONGO_QUERY_TIME.time():
+            return cls.counters().estimated_document_count()
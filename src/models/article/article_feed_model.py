@@ -0,0 +1,166 @@
+import json
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+import numpy as np
+from bson import ObjectId
+
+from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.log.api_logger import ApiLogger
+from src.lib.utility.utils import convert_str_to_datetime
+from src.models.article.article_model import ArticleModel
+from src.models.article.user_article_interaction_models import UserArticleInteractionModel
+from src.models.user.user_tag_affinity_model import UserTagAffinity
+
+
+class ArticleFeedRanker:
+    """
+    Personalized feed: candidates are the latest articles of each preferred tag (one
+    indexed (tags, published_at) query per tag), scored in one vectorized pass:
+
+        score = w_overlap * tag overlap + w_recency * exp(-age / recency_scale) + w_popularity * popularity
+                + w_affinity * implicit tag affinity of the user
+
+    then re-ranked so that the k-th article of the same source is damped by diversity_decay^k.
+    The ranked ids are cached per user for `cache_expire` and pages are slices of that list.
+    """
+
+    candidates_per_tag: int = 200
+    max_tags: int = 20
+    max_ranked: int = 500
+
+    weight_overlap: float = 1.0
+    weight_recency: float = 1.0
+    weight_popularity: float = 0.5
+    weight_affinity: float = 0.5
+    recency_scale: timedelta = timedelta(hours=36)
+    diversity_decay: float = 0.85
+
+    cache_expire: timedelta = timedelta(minutes=5)
+
+    @classmethod
+    def _cache_key(cls, user_id: str) -> str:
+        return f"feed:ranked:{user_id}"
+
+    @classmethod
+    def _get_ranked(cls, user_id: str) -> Optional[list[str]]:
+        key = cls._cache_key(user_id)
+
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE FEED] [GET] : {key}")
+        data_caching = RedisManagerInstance.get_instance().get(key=key)
+        if data_caching:
+            api_logger.print_log()
+            return json.loads(data_caching)
+        api_logger.print_error(message_error="Cache missing")
+        return None
+
+    @classmethod
+    def _cache_ranked(cls, user_id: str, article_ids: list[str]):
+        key = cls._cache_key(user_id)
+
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE FEED] [CACHE] : {key}")
+
+        RedisManagerInstance.get_instance().set(key=key, value=json.dumps(article_ids), ex=cls.cache_expire)
+
+        api_logger.print_log()
+
+    @classmethod
+    def scache_ranked(cls, user_id: str):
+        RedisManagerInstance.get_instance().delete(key=cls._cache_key(user_id))
+
+    @classmethod
+    def _candidates(cls, preferences: list[str]) -> list[dict]:
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE FEED] [CANDIDATES] : preferences={preferences}")
+
+        candidates = {}
+        projection = {'tags': 1, 'source.name': 1, 'published_at': 1}
+        with MONGO_QUERY_TIME.time():
+            for tag in preferences[:cls.max_tags]:
+                cursor = ArticleModel.collection().find({'tags': tag}, projection=projection).sort('published_at', -1).limit(cls.candidates_per_tag)
+                for article in cursor:
+                    candidates[article['_id']] = article
+
+        api_logger.print_log(extend_message=f"{len(candidates)} candidates")
+        return list(candidates.values())
+
+    @classmethod
+    def score(cls, candidates: list[dict], preferences: list[str], popularity: dict[str, int], now: Optional[datetime] = None, affinities: Optional[dict[str, float]] = None) -> np.ndarray:
+        """
+        Indexes of the candidates, best first.
+        """
+        now = now or datetime.now(timezone.utc)
+        preferences = set(preferences)
+
+        overlap = np.fromiter((len(preferences.intersection(article.get('tags') or [])) for article in candidates), dtype=np.float64, count=len(candidates))
+        overlap /= max(len(preferences), 1)
+
+        published = [convert_str_to_datetime(article.get('published_at')) for article in candidates]
+        age = np.fromiter(
+            ((now - (p if p.tzinfo else p.replace(tzinfo=timezone.utc))).total_seconds() if p else np.inf for p in published),
+            dtype=np.float64, count=len(candidates)
+        )
+        recency = np.exp(-np.clip(age, 0, None) / cls.recency_scale.total_seconds())
+
+        interactions = np.fromiter((popularity.get(str(article['_id']), 0) for article in candidates), dtype=np.float64, count=len(candidates))
+        popular = np.log1p(interactions)
+        if popular.max(initial=0) > 0:
+            popular /= popular.max()
+
+        scores = cls.weight_overlap * overlap + cls.weight_recency * recency + cls.weight_popularity * popular
+
+        if affinities:
+            affinity = np.fromiter((sum(affinities.get(tag, 0.0) for tag in set(article.get('tags') or [])) for article in candidates), dtype=np.float64, count=len(candidates))
+            if affinity.max(initial=0) > 0:
+                scores += cls.weight_affinity * affinity / affinity.max()
+
+        # source diversity: rank of each article among the articles of its source, by score
+        order = np.argsort(-scores, kind="stable")
+        _, sources = np.unique([((candidates[i].get('source') or {}).get('name') or '') for i in order], return_inverse=True)
+        by_source = np.argsort(sources, kind="stable")
+        starts = np.flatnonzero(np.r_[True, np.diff(sources[by_source]) != 0])
+        group_sizes = np.diff(np.r_[starts, len(sources)])
+        occurrence = np.empty(len(sources), dtype=np.int64)
+        occurrence[by_source] = np.arange(len(sources)) - np.repeat(starts, group_sizes)
+
+        damped = scores[order] * np.power(cls.diversity_decay, occurrence)
+        return order[np.argsort(-damped, kind="stable")]
+
+    @classmethod
+    def rank(cls, user_id: str, preferences: list[str], refresh: bool = False) -> list[str]:
+        if not refresh:
+            ranked = cls._get_ranked(user_id)
+            if ranked is not None:
+                return ranked
+
+        candidates = cls._candidates(preferences)
+        if not candidates:
+            cls._cache_ranked(user_id, [])
+            return []
+
+        api_logger = ApiLogger(f"[NUMPY] [ARTICLE FEED] [RANK] : user={user_id} and {len(candidates)} candidates")
+
+        popularity = UserArticleInteractionModel.count_by_article([str(article['_id']) for article in candidates])
+        order = cls.score(candidates, preferences, popularity, affinities=UserTagAffinity.affinities(user_id))
+        ranked = [str(candidates[i]['_id']) for i in order[:cls.max_ranked]]
+
+        api_logger.print_log()
+
+        cls._cache_ranked(user_id, ranked)
+        return ranked
+
+    @classmethod
+    def feed(cls, user_id: str, preferences: list[str], page: int = 1, limit: int = 10) -> tuple[list[ArticleModel], int]:
+        ranked = cls.rank(user_id, preferences)
+
+        article_ids = [ObjectId(article_id) for article_id in ranked[(page - 1) * limit:page * limit]]
+        if not article_ids:
+            return [], len(ranked)
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE FEED] [GET] : user={user_id}, page={page} and limit={limit}")
+
+        with MONGO_QUERY_TIME.time():
+            results = {article['_id']: article for article in ArticleModel.collection().find({'_id': {'$in': article_ids}})}
+
+        api_logger.print_log()
+        return [ArticleModel(**results[article_id]) for article_id in article_ids if article_id in results], len(ranked)
@@ -0,0 +1,162 @@
+from datetime import datetime, timezone, timedelta
+from typing import Iterable, Optional
+
+from src.lib.configuration import configuration
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.log.api_logger import ApiLogger
+
+
+class ArticleInbox:
+    """
+    Fan-out-on-write preference feeds (optional, ARTICLE_FANOUT_ENABLED).
+
+    A reverse index tag -> users (Redis sets, users with enabled preferences only) is kept
+    in sync with the preferences. When an article is inserted, its id is pushed, scored by
+    publication time, into the bounded inbox (sorted set) of every user following one of
+    its tags. Tags followed by more than `broad_threshold` users are not fanned out: the
+    articles of those tags are read at request time (fan-out-on-read) and merged with the inbox.
+
+    Inboxes of inactive users expire and are rebuilt from the database on their next read.
+    """
+
+    enabled: bool = configuration.get_env_var("article.fanout.enabled", False, bool)
+    broad_threshold: int = configuration.get_env_var("article.fanout.broad_threshold", 10_000, int)
+    max_inbox: int = 500
+    inbox_expire: timedelta = timedelta(days=7)
+
+    READY_KEY = "feed:fanout:ready"
+
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"feed:tag:{tag}:users"
+
+    @staticmethod
+    def _inbox_key(user_id: str) -> str:
+        return f"feed:inbox:{user_id}"
+
+    @staticmethod
+    def timestamp(published_at: Optional[datetime]) -> float:
+        if published_at is None:
+            return datetime.now(timezone.utc).timestamp()
+        if published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=timezone.utc)
+        return published_at.timestamp()
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return RedisManagerInstance.get_instance().exists(cls.READY_KEY)
+
+    @classmethod
+    def set_preferences(cls, user_id: str, old_tags: Iterable[str], new_tags: Iterable[str], preferences_enable: bool = True):
+        old_tags = set(old_tags or [])
+        new_tags = set(new_tags or []) if preferences_enable else set()
+
+        pipeline = RedisManagerInstance.get_instance().pipeline()
+        for tag in old_tags - new_tags:
+            pipeline.srem(cls._tag_key(tag), user_id)
+        for tag in new_tags - old_tags:
+            pipeline.sadd(cls._tag_key(tag), user_id)
+        # rebuilt from the new preferences on the next read
+        pipeline.delete(cls._inbox_key(user_id))
+        pipeline.execute()
+
+    @classmethod
+    def rebuild_tag_index(cls, users: Iterable[tuple[str, list[str]]]) -> int:
+        """
+        Rebuild the reverse index from (user id, enabled preferences) pairs.
+        """
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE INBOX] [REBUILD TAG INDEX]")
+
+        redis = RedisManagerInstance.get_instance()
+        redis.delete_pattern(cls._tag_key("*"))
+
+        count = 0
+        pipeline = redis.pipeline()
+        for user_id, tags in users:
+            for tag in set(tags or []):
+                pipeline.sadd(cls._tag_key(tag), user_id)
+            count += 1
+            if count % 1_000 == 0:
+                pipeline.execute()
+        pipeline.set(cls.READY_KEY, "1")
+        pipeline.execute()
+
+        api_logger.print_log(extend_message=f"{count} users")
+        return count
+
+    @classmethod
+    def broad_tags(cls, tags: Iterable[str]) -> set[str]:
+        tags = list(dict.fromkeys(tags or []))
+        if not tags:
+            return set()
+        pipeline = RedisManagerInstance.get_instance().pipeline()
+        for tag in tags:
+            pipeline.scard(cls._tag_key(tag))
+        return {tag for tag, size in zip(tags, pipeline.execute()) if size > cls.broad_threshold}
+
+    @classmethod
+    def fan_out(cls, article_id, tags: Iterable[str], published_at: Optional[datetime]) -> int:
+        """
+        Push an inserted article into the inboxes of the users following its (non broad) tags.
+        Returns the number of inboxes updated.
+        """
+        tags = list(dict.fromkeys(tags or []))
+        if not tags:
+            return 0
+
+        redis = RedisManagerInstance.get_instance()
+        broad = cls.broad_tags(tags)
+        narrow = [tag for tag in tags if tag not in broad]
+        if not narrow:
+            return 0
+
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE INBOX] [FAN OUT] : article={article_id}, tags={narrow} and broad tags={sorted(broad)}")
+
+        users = list(redis.sunion(*(cls._tag_key(tag) for tag in narrow)))
+
+        # only the live inboxes: the others are rebuilt from the database when read
+        pipeline = redis.pipeline()
+        for user_id in users:
+            pipeline.exists(cls._inbox_key(user_id))
+        live = [user_id for user_id, exists in zip(users, pipeline.execute()) if exists]
+
+        score = cls.timestamp(published_at)
+        pipeline = redis.pipeline()
+        for user_id in live:
+            key = cls._inbox_key(user_id)
+            pipeline.zadd(key, {str(article_id): score})
+            pipeline.zremrangebyrank(key, 0, -(cls.max_inbox + 1))
+        pipeline.execute()
+
+        api_logger.print_log(extend_message=f"{len(live)} inboxes out of {len(users)} followers")
+        return len(live)
+
+    @classmethod
+    def entries(cls, user_id: str) -> Optional[list[tuple[str, float]]]:
+        """
+        (article id, publication timestamp) of the inbox, most recent first, or None when the inbox must be rebuilt.
+        """
+        key = cls._inbox_key(user_id)
+        redis = RedisManagerInstance.get_instance()
+
+        pipeline = redis.pipeline()
+        pipeline.exists(key)
+        pipeline.zrevrange(key, 0, cls.max_inbox - 1, withscores=True)
+        pipeline.expire(key, cls.inbox_expire)
+        exists, entries, _ = pipeline.execute()
+        if not exists:
+            return None
+        entries = [(member.decode("utf-8") if isinstance(member, bytes) else member, score) for member, score in entries]
+        return [(article_id, score) for article_id, score in entries if article_id]
+
+    @classmethod
+    def seed(cls, user_id: str, entries: list[tuple[str, Optional[datetime]]]):
+        key = cls._inbox_key(user_id)
+
+        pipeline = RedisManagerInstance.get_instance().pipeline()
+        pipeline.delete(key)
+        # an empty member keeps the (empty) inbox alive, it is never an article id
+        pipeline.zadd(key, {"": 0} | {str(article_id): cls.timestamp(published_at) for article_id, published_at in entries[:cls.max_inbox]})
+        pipeline.zremrangebyrank(key, 0, -(cls.max_inbox + 2))
+        pipeline.expire(key, cls.inbox_expire)
+        pipeline.execute()
@@ -1,26 +1,48 @@
+import hashlib
 import json
 import re
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from threading import Thread
-from typing import Optional, List
+from typing import Optional, List, ClassVar
 
 from bson import ObjectId
 from flask_restx import fields, Namespace
 from pydantic import Field, field_serializer, BaseModel
+from pymongo.errors import BulkWriteError
 
+from src.lib.configuration import configuration
 from src.lib.database.nosql.document.mongodb.base import MongoDBBaseModel
 from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
 from src.lib.database.nosql.document.mongodb.objectid import PydanticObjectId
+from src.lib.database.nosql.keyvalue.redis.bloom_filter import RedisBloomFilter
+from src.lib.database.nosql.keyvalue.redis.cache_key import filter_digest, canonical_filter, CacheKeyRegistry
 from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
 from src.lib.log.api_logger import ApiLogger
-from src.lib.utility.utils import my_json_decoder, MyJSONEncoder
+from src.lib.utility.utils import my_json_decoder, MyJSONEncoder, convert_str_to_datetime
 from src.models import DataBaseModel
+from src.lib.search import text_analyzer
+from src.lib.search.search_monitoring_middleware import SEARCH_FALLBACKS
+from src.models.article.article_duplicate_model import ArticleDuplicateModel, ARTICLE_NEAR_DUPLICATE_DETECTOR
+from src.models.article.article_facet_model import ArticleFacetFilter, ArticleFacetCounter, ArticleFacetsModel, FACET_FIELDS
+from src.models.article.article_inbox_model import ArticleInbox
+from src.models.article.article_search_index_model import ArticleSearchIndex, ArticleTitleTrigramIndex
 from src.models.article.article_source_model import ArticleSourceModel
+from src.models.article.article_suggest_model import ARTICLE_TITLE_SUGGESTER
 from src.models.article.comment_model import CommentModel
+from src.models.article.tag_graph_model import TagGraph
+from src.models.article.tag_model import TagModel, normalize_tag
 from src.models.article.user_article_interaction_models import ArticleInteractionStatus, ArticleInteractionStats
 from src.models.user.auth_model import UserToken
 
 
+# articles already stored, keyed by provider, provider id and title hash
+ARTICLE_DEDUP_FILTER = RedisBloomFilter(
+    name="article:dedup",
+    capacity=configuration.get_env_var("article.dedup.capacity", 2_000_000, int),
+    error_rate=configuration.get_env_var("article.dedup.error_rate", 0.001, float),
+)
+
+
 class ArticleSummaryModel(MongoDBBaseModel):
     article_id: Optional[PydanticObjectId] = Field(None, alias="_id")
     extern_id: Optional[str] = None
@@ -54,10 +76,11 @@ class ArticleSummaryModel(MongoDBBaseModel):
     @classmethod
     def init(cls):
         try:
-            # cls.collection().create_index([("extern_api", 1), ("extern_id", 1), ("title", 1)], unique=True)
-            pass
+            # natural key of an article: a concurrent or bulk insert of an article already stored fails with a duplicate key error
+            cls.collection().create_index([("extern_api", 1), ("extern_id", 1), ("title", 1)], unique=True)
         except Exception as e:
-            print(e)
+            # bulk_save relies on it: without it, concurrent inserts of the same article both succeed
+            ApiLogger("[MONGODB] [ARTICLE] [INIT] unique (extern_api, extern_id, title) index not created, remove the duplicated articles").print_error(str(e))
         try:
             cls.collection().create_index({"tags": 1})
         except Exception as e:
@@ -102,6 +125,38 @@ class ArticleSummaryModel(MongoDBBaseModel):
             cls.collection().create_index([("title", 1), ("description", 1)])
         except Exception as e:
             print(e)
+        for field in FACET_FIELDS.values():
+            try:
+                cls.collection().create_index([(field, 1), ("published_at", -1)])
+            except Exception as e:
+                print(e)
+        try:
+            ArticleFacetCounter.init()
+            if ArticleFacetCounter.count() == 0:
+                cls.rebuild_facet_counters_in_background()
+        except Exception as e:
+            print(e)
+        try:
+            ArticleSearchIndex.init()
+            ArticleTitleTrigramIndex.init()
+        except Exception as e:
+            print(e)
+        try:
+            TagModel.init()
+            if TagModel.count() == 0:
+                cls.rebuild_tag_dictionary_in_background()
+        except Exception as e:
+            print(e)
+        try:
+            if not TagGraph.is_built():
+                TagGraph.rebuild_in_background()
+        except Exception as e:
+            print(e)
+        try:
+            if not ARTICLE_DEDUP_FILTER.is_ready():
+                cls.rebuild_dedup_filter_in_background()
+        except Exception as e:
+            print(e)
 
     @staticmethod
     def to_model(name_space: Namespace):
@@ -128,14 +183,32 @@ class ArticleSummaryModel(MongoDBBaseModel):
             'page': fields.Integer,
             'limit': fields.Integer,
             'pageCount': fields.Integer,
+            'facets': fields.Nested(ArticleFacetsModel.to_model(name_space), required=False),
         })
 
 
+class ArticleBulkSaveResult(BaseModel):
+    inserted: int = 0
+    duplicates: int = 0
+    linked: int = 0
+    failed: int = 0
+    inserted_ids: list[str] = []
+
+
 class ArticleModel(ArticleSummaryModel):
     content: Optional[str] = None
     url: Optional[str] = None
     language: Optional[str] = None
     country: Optional[str] = None
+    duplicates: Optional[List[ArticleDuplicateModel]] = None
+    story_id: Optional[str] = None
+
+    search_cache_window: ClassVar[int] = 100
+    search_fuzzy_threshold: ClassVar[int] = 5
+    search_facet_window: ClassVar[int] = 1000
+    search_cache_expire: ClassVar[timedelta] = timedelta(minutes=2)
+
+    bulk_chunk_size: ClassVar[int] = configuration.get_env_var("article.bulk.chunk_size", 1_000, int)
 
     @staticmethod
     def to_model(name_space: Namespace):
@@ -154,6 +227,8 @@ class ArticleModel(ArticleSummaryModel):
             'language': fields.String(required=False),
             'country': fields.String(required=False),
             'tags': fields.List(fields.String, description="List of tags"),
+            'duplicates': fields.List(fields.Nested(ArticleDuplicateModel.to_model(name_space)), required=False),
+            'story_id': fields.String(required=False),
         })
 
     @staticmethod
@@ -176,103 +251,531 @@ class ArticleModel(ArticleSummaryModel):
     def _cache(self, user_token: UserToken, expire: Optional[timedelta] = timedelta(hours=1), **kwargs):
         super()._cache(user_token, expire=expire, **kwargs)
 
+    @staticmethod
+    def _dedup_key(extern_api: Optional[str], extern_id: Optional[str], title: Optional[str]) -> str:
+        title_hash = hashlib.sha1((title or "").encode("utf-8")).hexdigest()
+        return f"{extern_api}|{extern_id}|{title_hash}"
+
     def save(self, user_token: UserToken):
-        article_check = {
-                'extern_api': self.extern_api,
-                'extern_id': self.extern_id,
-                'title': self.title
-            }
+        dedup_key = self._dedup_key(self.extern_api, self.extern_id, self.title)
+
+        # the bloom filter is only trusted once fully built: until then every save checks the database
+        dedup_ready = ARTICLE_DEDUP_FILTER.is_ready()
+        if not dedup_ready or ARTICLE_DEDUP_FILTER.might_contain(dedup_key):
+            article_check = {
+                    'extern_api': self.extern_api,
+                    'extern_id': self.extern_id,
+                    'title': self.title
+                }
 
-        api_logger = ApiLogger(f"[MONGODB] [ARTICLE] [CHECK ALREADY EXISTS] : {article_check}")
+            api_logger = ApiLogger(f"[MONGODB] [ARTICLE] [CHECK ALREADY EXISTS] : {article_check}")
 
-        article = self.collection().find_one(article_check)
-        if article:
-            api_logger.print_error("Article already exists")
-            return None
+            with MONGO_QUERY_TIME.time():
+                article = self.collection().find_one(article_check, projection={'_id': 1})
+            if article:
+                api_logger.print_error("Article already exists")
+                return None
+            if dedup_ready:
+                ARTICLE_DEDUP_FILTER.record_false_positive()
+            api_logger.print_log()
+
+        # same story from another provider: linked to the canonical article instead of inserted
+        signature = None
+        try:
+            signature = ARTICLE_NEAR_DUPLICATE_DETECTOR.signature(self.title, self.description)
+            near_duplicate = ARTICLE_NEAR_DUPLICATE_DETECTOR.find(signature)
+            if near_duplicate and self._link_duplicate(user_token, *near_duplicate):
+                return None
+        except Exception as e:
+            ApiLogger(f"[REDIS] [ARTICLE NEAR DUPLICATE] [FIND] : {self.title}").print_error(str(e))
 
         self.article_id = super().save(user_token)
+        if self.article_id:
+            self._after_insert([self], [signature])
         return self.article_id
 
     @classmethod
-    def _cache_all_tags_key(cls):
-        return f"article:tags"
+    def _after_insert(cls, articles: list["ArticleModel"], signatures: list):
+        """
+        Keep the dedup filter, the near-duplicate buckets, the search indexes, the tag and
+        facet counters, the title suggester and the inboxes in sync with inserted articles.
+        """
+        article_ids = ", ".join(str(article.article_id) for article in articles)
+
+        ARTICLE_DEDUP_FILTER.add_many([cls._dedup_key(article.extern_api, article.extern_id, article.title) for article in articles])
+        try:
+            ARTICLE_NEAR_DUPLICATE_DETECTOR.add_many([(article.article_id, signature) for article, signature in zip(articles, signatures)])
+        except Exception as e:
+            ApiLogger(f"[REDIS] [ARTICLE NEAR DUPLICATE] [ADD] : {article_ids}").print_error(str(e))
+        try:
+            cls._index_for_search([article._search_document() for article in articles])
+        except Exception as e:
+            ApiLogger(f"[MONGODB] [ARTICLE SEARCH INDEX] [INDEX] : {article_ids}").print_error(str(e))
+        try:
+            TagModel.record_tags([article.tags for article in articles])
+        except Exception as e:
+            ApiLogger(f"[MONGODB] [TAG] [RECORD] : {article_ids}").print_error(str(e))
+        try:
+            TagGraph.record_articles([article.tags for article in articles])
+        except Exception as e:
+            ApiLogger(f"[REDIS] [TAG GRAPH] [RECORD] : {article_ids}").print_error(str(e))
+        try:
+            ArticleFacetCounter.record([article._facet_document() for article in articles])
+        except Exception as e:
+            ApiLogger(f"[MONGODB] [ARTICLE FACET] [RECORD] : {article_ids}").print_error(str(e))
+        for article in articles:
+            ARTICLE_TITLE_SUGGESTER.add_article(article.article_id, article.title, article.published_at)
+            if ArticleInbox.enabled:
+                try:
+                    ArticleInbox.fan_out(article.article_id, article.tags, convert_str_to_datetime(article.published_at))
+                except Exception as e:
+                    ApiLogger(f"[REDIS] [ARTICLE INBOX] [FAN OUT] : {article.article_id}").print_error(str(e))
+
+    @classmethod
+    def bulk_save(cls, user_token: UserToken, articles: list["ArticleModel"], chunk_size: Optional[int] = None) -> ArticleBulkSaveResult:
+        """
+        Insert new articles in chunks: per chunk, one bloom filter round trip, one existence
+        query for the possible duplicates, two near-duplicate round trips and one unordered
+        insert_many. Articles already stored (or inserted concurrently: unique natural key)
+        are counted as duplicates and near-duplicates are linked to their canonical article,
+        as in save, including the copies of a story inside the same chunk.
+        """
+        chunk_size = chunk_size or cls.bulk_chunk_size
+        result = ArticleBulkSaveResult()
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE] [BULK SAVE] : {len(articles)} articles and chunk size={chunk_size}")
+
+        seen = set()
+        for start in range(0, len(articles), chunk_size):
+            cls._bulk_save_chunk(user_token, articles[start:start + chunk_size], seen, result)
+
+        api_logger.print_log(extend_message=f"{result.inserted} inserted, {result.duplicates} duplicates, {result.linked} linked and {result.failed} failed")
+        return result
+
+    @classmethod
+    def _bulk_save_chunk(cls, user_token: UserToken, articles: list["ArticleModel"], seen: set[str], result: ArticleBulkSaveResult):
+        keys = [cls._dedup_key(article.extern_api, article.extern_id, article.title) for article in articles]
+
+        # duplicates inside the batch itself
+        candidates = []
+        for article, key in zip(articles, keys):
+            if key in seen:
+                result.duplicates += 1
+                continue
+            seen.add(key)
+            candidates.append((article, key))
+
+        # only the keys the bloom filter may contain are looked up in the database
+        dedup_ready = ARTICLE_DEDUP_FILTER.is_ready()
+        maybe_present = ARTICLE_DEDUP_FILTER.might_contain_many([key for _, key in candidates]) if dedup_ready else [True] * len(candidates)
+        lookups = [article for (article, _), present in zip(candidates, maybe_present) if present]
+        existing = set()
+        if lookups:
+            with MONGO_QUERY_TIME.time():
+                cursor = cls.collection().find(
+                    {'$or': [{'extern_api': article.extern_api, 'extern_id': article.extern_id, 'title': article.title} for article in lookups]},
+                    projection={'_id': 0, 'extern_api': 1, 'extern_id': 1, 'title': 1}
+                )
+                existing = {cls._dedup_key(article.get('extern_api'), article.get('extern_id'), article.get('title')) for article in cursor}
+            if dedup_ready:
+                for _ in range(len(lookups) - len(existing)):
+                    ARTICLE_DEDUP_FILTER.record_false_positive()
+
+        remaining = [article for article, key in candidates if key not in existing]
+        result.duplicates += len(candidates) - len(remaining)
+
+        signatures = [ARTICLE_NEAR_DUPLICATE_DETECTOR.signature(article.title, article.description) for article in remaining]
+        try:
+            near_duplicates = ARTICLE_NEAR_DUPLICATE_DETECTOR.find_many(signatures)
+        except Exception as e:
+            ApiLogger(f"[REDIS] [ARTICLE NEAR DUPLICATE] [FIND] : {len(remaining)} articles").print_error(str(e))
+            near_duplicates = [None] * len(remaining)
+
+        new_articles = []
+        new_signatures = []
+        # copies of a story inside the chunk: linked to the first copy once it is inserted
+        local_buckets = {}
+        local_links = []
+        for article, signature, near_duplicate in zip(remaining, signatures, near_duplicates):
+            try:
+                if near_duplicate and article._link_duplicate(user_token, *near_duplicate):
+                    result.linked += 1
+                    continue
+            except Exception as e:
+                ApiLogger(f"[MONGODB] [ARTICLE] [LINK DUPLICATE] : {article.title}").print_error(str(e))
+            local = ARTICLE_NEAR_DUPLICATE_DETECTOR.find_local(signature, local_buckets, new_signatures)
+            if local:
+                local_links.append((article, *local))
+                continue
+            ARTICLE_NEAR_DUPLICATE_DETECTOR.add_local(len(new_articles), signature, local_buckets)
+            new_articles.append(article)
+            new_signatures.append(signature)
+
+        if not new_articles:
+            return
+
+        documents = [article.to_bson() for article in new_articles]
+        failed_indexes = set()
+        try:
+            with MONGO_QUERY_TIME.time():
+                cls.collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                failed_indexes.add(error['index'])
+                if error.get('code') == 11000:
+                    result.duplicates += 1
+                else:
+                    result.failed += 1
+                    ApiLogger(f"[MONGODB] [ARTICLE] [BULK SAVE] : {error.get('errmsg')}").print_error(str(error.get('code')))
+
+        inserted = []
+        inserted_signatures = []
+        for index, (article, document, signature) in enumerate(zip(new_articles, documents, new_signatures)):
+            if index in failed_indexes:
+                continue
+            # insert_many sets the _id of the inserted documents
+            article.article_id = document['_id']
+            inserted.append(article)
+            inserted_signatures.append(signature)
+
+        result.inserted += len(inserted)
+        result.inserted_ids.extend(str(article.article_id) for article in inserted)
+        if inserted:
+            cls._after_insert(inserted, inserted_signatures)
+
+        for article, position, similarity in local_links:
+            canonical = new_articles[position]
+            if position not in failed_indexes and article._link_duplicate(user_token, canonical.article_id, similarity):
+                result.linked += 1
+            elif article.save(user_token):
+                # first copy not inserted: this one goes through the single save path
+                result.inserted += 1
+                result.inserted_ids.append(str(article.article_id))
+            else:
+                result.duplicates += 1
+
+    def _link_duplicate(self, user_token: UserToken, canonical_id: ObjectId, similarity: float) -> bool:
+        duplicate = ArticleDuplicateModel(
+            extern_api=self.extern_api,
+            extern_id=self.extern_id,
+            title=self.title,
+            url=self.url,
+            source=self.source,
+            published_at=self.published_at,
+            similarity=round(similarity, 4),
+        )
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE] [LINK DUPLICATE] : {self.extern_api}/{self.extern_id} -> {canonical_id} ({similarity:.2f})")
+
+        with MONGO_QUERY_TIME.time():
+            result = self.collection().update_one(
+                {'_id': canonical_id, 'duplicates': {'$not': {'$elemMatch': {'extern_api': self.extern_api, 'extern_id': self.extern_id}}}},
+                {'$push': {'duplicates': duplicate.to_json()}},
+            )
+        if result.matched_count == 0:
+            # canonical article deleted since, or this copy is already linked
+            with MONGO_QUERY_TIME.time():
+                linked = self.collection().count_documents({'_id': canonical_id}, limit=1) > 0
+            api_logger.print_error("Already linked" if linked else "Canonical article not found")
+            return linked
+
+        self._scache(user_token, str(canonical_id))
+        api_logger.print_log()
+        return True
+
+    def delete(self, user_token: UserToken):
+        deleted = super().delete(user_token)
+        if deleted:
+            ArticleSearchIndex.remove_article(self.article_id)
+            ArticleTitleTrigramIndex.remove_article(self.article_id)
+            TagModel.remove_tags(self.tags)
+            TagGraph.remove_article(self.tags)
+            ArticleFacetCounter.remove([self._facet_document()])
+        return deleted
+
+    def _facet_document(self) -> dict:
+        return self.model_dump(include={'extern_api', 'source', 'language', 'country'})
+
+    def _search_document(self) -> dict:
+        return {
+            '_id': self.article_id,
+            'title': self.title,
+            'description': self.description,
+            'tags': self.tags,
+            'published_at': self.published_at,
+        }
+
+    @classmethod
+    def rebuild_dedup_filter(cls, batch_size: int = 10_000) -> int:
+        """
+        Rebuild the deduplication bloom filter from the articles collection.
+
+        The filter is cleared (so saves fall back to the database check) and refilled while
+        concurrent saves keep adding their own keys; it is trusted again once complete.
+        """
+        if not RedisManagerInstance.get_instance().set(key=f"{ARTICLE_DEDUP_FILTER.key}:rebuild:lock", value="1", ex=timedelta(hours=1), nx=True):
+            ApiLogger(f"[REDIS] [ARTICLE] [DEDUP FILTER] [REBUILD] already running")
+            return 0
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE] [DEDUP FILTER] [REBUILD] : capacity={ARTICLE_DEDUP_FILTER.capacity} and error rate={ARTICLE_DEDUP_FILTER.error_rate}")
+
+        # the filter stays unready (saves check the database) until fully rebuilt
+        total = 0
+        try:
+            ARTICLE_DEDUP_FILTER.clear()
+
+            batch = []
+            with MONGO_QUERY_TIME.time():
+                cursor = cls.collection().find({}, projection={'extern_api': 1, 'extern_id': 1, 'title': 1}, batch_size=batch_size)
+                for article in cursor:
+                    batch.append(cls._dedup_key(article.get('extern_api'), article.get('extern_id'), article.get('title')))
+                    if len(batch) >= batch_size:
+                        total += ARTICLE_DEDUP_FILTER.add_many(batch)
+                        batch = []
+            total += ARTICLE_DEDUP_FILTER.add_many(batch)
+
+            ARTICLE_DEDUP_FILTER.mark_ready()
+        except Exception as e:
+            api_logger.print_error(message_error=f"{e} after {total} articles")
+            raise
+        finally:
+            RedisManagerInstance.get_instance().delete(key=f"{ARTICLE_DEDUP_FILTER.key}:rebuild:lock")
+
+        api_logger.print_log(extend_message=f"{total} articles")
+        return total
+
+    @classmethod
+    def _index_for_search(cls, documents: list[dict]):
+        ArticleSearchIndex.index_articles(documents)
+        ArticleTitleTrigramIndex.index_articles(documents)
+
+    @classmethod
+    def rebuild_search_index(cls, batch_size: int = 1_000) -> int:
+        if not RedisManagerInstance.get_instance().set(key="article:search:index:rebuild:lock", value="1", ex=timedelta(hours=1), nx=True):
+            ApiLogger(f"[MONGODB] [ARTICLE SEARCH INDEX] [REBUILD] already running")
+            return 0
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE SEARCH INDEX] [REBUILD] : batch size={batch_size}")
+
+        # the saves keep indexing meanwhile: the postings are upserted, an article indexed
+        # by both is only counted once
+        total = 0
+        try:
+            ArticleSearchIndex.clear()
+            ArticleTitleTrigramIndex.clear()
+
+            batch = []
+            cursor = cls.collection().find({}, projection={'title': 1, 'description': 1, 'tags': 1, 'published_at': 1}, batch_size=batch_size)
+            for article in cursor:
+                batch.append(article)
+                if len(batch) >= batch_size:
+                    cls._index_for_search(batch)
+                    total += len(batch)
+                    batch = []
+            cls._index_for_search(batch)
+            total += len(batch)
+        except Exception as e:
+            api_logger.print_error(message_error=f"{e} after {total} articles")
+            raise
+        finally:
+            RedisManagerInstance.get_instance().delete(key="article:search:index:rebuild:lock")
+
+        api_logger.print_log(extend_message=f"{total} articles")
+        return total
+
+    @classmethod
+    def rebuild_search_index_in_background(cls):
+        thread = Thread(target=cls.rebuild_search_index)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def rebuild_dedup_filter_in_background(cls):
+        thread = Thread(target=cls.rebuild_dedup_filter)
+        thread.daemon = True
+        thread.start()
 
     @classmethod
-    def _cache_all_tags(cls, tags: list[str], expire: Optional[timedelta] = timedelta(hours=1)):
-        key = cls._cache_all_tags_key()
+    def dedup_filter_stats(cls) -> dict:
+        return ARTICLE_DEDUP_FILTER.stats()
+
+    @classmethod
+    def _cache_all_tags_family(cls) -> str:
+        return "article:tags"
+
+    @classmethod
+    def _cache_all_tags_key(cls, search: Optional[str] = None, limit: Optional[int] = None):
+        digest = filter_digest({'q': normalize_tag(search) if search else "", 'limit': limit})
+        return f"{cls._cache_all_tags_family()}:{digest}"
+
+    @classmethod
+    def _cache_all_tags(cls, tags: list[TagModel], search: Optional[str] = None, limit: Optional[int] = None, expire: Optional[timedelta] = timedelta(minutes=10)):
+        key = cls._cache_all_tags_key(search, limit)
 
         api_logger = ApiLogger(f"[REDIS] [ARTICLE TAGS] [CACHE] : key={key} and expire={expire}")
 
-        data_json = json.dumps(tags, cls=MyJSONEncoder)
+        data_json = json.dumps([tag.model_dump(by_alias=True) for tag in tags], cls=MyJSONEncoder)
         RedisManagerInstance.get_instance().set(key=key, value=data_json, ex=expire)
+        CacheKeyRegistry.register(family=cls._cache_all_tags_family(), digest="all", key=key, expire=expire)
 
         api_logger.print_log()
 
     @classmethod
-    def _scache_all_tags(cls):
-        key = cls._cache_all_tags_key()
-
-        api_logger = ApiLogger(f"[REDIS] [ARTICLE TAGS] [SCACHE] : {key}")
+    def scache_all_tags(cls):
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE TAGS] [SCACHE] : family={cls._cache_all_tags_family()}")
 
-        RedisManagerInstance.get_instance().delete(key=key)
+        CacheKeyRegistry.invalidate(family=cls._cache_all_tags_family())
 
         api_logger.print_log()
 
     @classmethod
-    def _get_all_tags(cls):
-        key = cls._cache_all_tags_key()
+    def _get_all_tags(cls, search: Optional[str] = None, limit: Optional[int] = None):
+        key = cls._cache_all_tags_key(search, limit)
 
         api_logger = ApiLogger(f"[REDIS] [ARTICLE TAGS] [GET] : {key}")
         data_caching = RedisManagerInstance.get_instance().get(key=key)
         if data_caching:
-            data_json = json.loads(data_caching, object_hook=my_json_decoder)
             api_logger.print_log()
-            return data_json
+            return [TagModel(**tag) for tag in json.loads(data_caching)]
         api_logger.print_error(message_error="Cache missing")
         return None
 
     @classmethod
-    def get_all_tags(cls, user_token, search: str = None):
-        tags = cls._get_all_tags()
-        if tags:
-            return tags
+    def search_tags(cls, user_token, search: str = None, limit: Optional[int] = None, refresh: bool = False) -> list[TagModel]:
+        """
+        Tags of the tag dictionary starting with `search` (every tag without search), most used first.
+        """
+        if not refresh:
+            tags = cls._get_all_tags(search, limit)
+            if tags is not None:
+                return tags
 
-        api_logger = ApiLogger(f"[MONGODB] [ARTICLE TAGS] [GET ALL] : search = {search}")
-        if search:
-            pipeline = [
-                {"$unwind": "$tags"},
-                {"$match": {"tags": {"$regex": f"^{search}", "$options": "i"}}},
-                {"$group": {"_id": None, "matchedTags": {"$addToSet": "$tags"}}},
-                {"$project": {"_id": 0, "matchedTags": 1}}
-            ]
-        else:
-            pipeline = [
-                {"$unwind": "$tags"},
-                {"$group": {"_id": None, "matchedTags": {"$addToSet": "$tags"}}},
-                {"$project": {"_id": 0, "matchedTags": 1}}
-            ]
+        tags = TagModel.search(prefix=search, limit=limit)
 
-        with MONGO_QUERY_TIME.time():
-            data = cls.collection().aggregate(pipeline)
+        cls._cache_all_tags(tags, search, limit)
 
-        result = list(data)
-        tags = result[0]['matchedTags'] if result else []
+        return tags
 
-        api_logger.print_log()
+    @classmethod
+    def get_all_tags(cls, user_token=None, search: str = None, limit: Optional[int] = None, refresh: bool = False) -> list[str]:
+        return [tag.tag for tag in cls.search_tags(user_token, search=search, limit=limit, refresh=refresh)]
+
+    @classmethod
+    def rebuild_facet_counters(cls) -> int:
+        if not RedisManagerInstance.get_instance().set(key="article:facet:counters:rebuild:lock", value="1", ex=timedelta(hours=1), nx=True):
+            ApiLogger(f"[MONGODB] [ARTICLE FACET] [REBUILD] already running")
+            return 0
 
-        cls._cache_all_tags(tags)
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE FACET] [REBUILD]")
 
-        return tags
+        try:
+            ArticleFacetCounter.start_rebuild()
+
+            counts = {}
+            with MONGO_QUERY_TIME.time():
+                for name, field in FACET_FIELDS.items():
+                    pipeline = [
+                        {"$match": {field: {"$type": "string", "$ne": ""}}},
+                        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+                    ]
+                    for result in cls.collection().aggregate(pipeline, allowDiskUse=True):
+                        value = result['_id'].strip()
+                        if value:
+                            counts[(name, value)] = counts.get((name, value), 0) + result['count']
+
+            total = ArticleFacetCounter.replace_all(counts)
+        except Exception as e:
+            ArticleFacetCounter.abort_rebuild()
+            api_logger.print_error(message_error=str(e))
+            raise
+        finally:
+            RedisManagerInstance.get_instance().delete(key="article:facet:counters:rebuild:lock")
+
+        api_logger.print_log(extend_message=f"{total} facet values")
+        return total
+
+    @classmethod
+    def rebuild_facet_counters_in_background(cls):
+        thread = Thread(target=cls.rebuild_facet_counters)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def get_facets(cls, user_token, limit: int = 10) -> ArticleFacetsModel:
+        """
+        Most frequent values of every facet, read from the counters maintained at ingest time.
+        """
+        return ArticleFacetsModel(
+            **ArticleFacetCounter.top_values(limit=limit),
+            tag=[{'value': tag.tag, 'count': tag.article_count} for tag in cls.search_tags(user_token, limit=limit)]
+        )
+
+    @classmethod
+    def rebuild_tag_dictionary(cls) -> int:
+        if not RedisManagerInstance.get_instance().set(key="tag:dictionary:rebuild:lock", value="1", ex=timedelta(hours=1), nx=True):
+            ApiLogger(f"[MONGODB] [ARTICLE TAGS] [REBUILD] already running")
+            return 0
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE TAGS] [REBUILD]")
+
+        pipeline = [
+            {"$unwind": "$tags"},
+            {"$group": {"_id": "$tags", "count": {"$sum": 1}, "last_seen": {"$max": "$created_at"}}},
+        ]
+
+        try:
+            started_at = datetime.now(timezone.utc)
+            tag_counts = {}
+            with MONGO_QUERY_TIME.time():
+                for result in cls.collection().aggregate(pipeline, allowDiskUse=True):
+                    if not result['_id'] or not str(result['_id']).strip():
+                        continue
+                    normalized = normalize_tag(result['_id'])
+                    tag, count, last_seen = tag_counts.get(normalized, (result['_id'].strip(), 0, None))
+                    if last_seen is None or (result['last_seen'] and result['last_seen'] > last_seen):
+                        last_seen = result['last_seen']
+                    tag_counts[normalized] = (tag, count + result['count'], last_seen)
+
+            total = TagModel.replace_all(tag_counts, started_at)
+            cls.scache_all_tags()
+        except Exception as e:
+            api_logger.print_error(message_error=str(e))
+            raise
+        finally:
+            RedisManagerInstance.get_instance().delete(key="tag:dictionary:rebuild:lock")
+
+        api_logger.print_log(extend_message=f"{total} tags")
+        return total
+
+    @classmethod
+    def rebuild_tag_dictionary_in_background(cls):
+        thread = Thread(target=cls.rebuild_tag_dictionary)
+        thread.daemon = True
+        thread.start()
+
+    @staticmethod
+    def _last_articles_filter(preferences: list[str] = None, facets: Optional[ArticleFacetFilter] = None) -> dict:
+        # users sharing the same preference set (and facet filters) share the same feed cache entries
+        filter_search = facets.to_query() if facets else {}
+        if preferences:
+            preferences_match = {'$in': sorted(set(preferences))}
+            if 'tags' in filter_search:
+                filter_search['$and'] = [{'tags': filter_search.pop('tags')}, {'tags': preferences_match}]
+            else:
+                filter_search['tags'] = preferences_match
+        return filter_search
+
+    @classmethod
+    def _cache_last_articles_family(cls) -> str:
+        return "article:last"
 
     @classmethod
-    def _cache_last_articles_count_key(cls, user_token: UserToken, preferences: list[str] = None):
-        if preferences is None or len(preferences) == 0:
-            return f"article:last:count"
-        return f"article:last:{user_token.user_id}:count"
+    def _cache_last_articles_count_key(cls, user_token: UserToken, preferences: list[str] = None, facets: Optional[ArticleFacetFilter] = None):
+        return f"{cls._cache_last_articles_family()}:{filter_digest(cls._last_articles_filter(preferences, facets))}:count"
 
     @classmethod
-    def _last_articles_count(cls, user_token: UserToken, preferences: list[str] = None):
-        key = cls._cache_last_articles_count_key(user_token, preferences)
+    def _last_articles_count(cls, user_token: UserToken, preferences: list[str] = None, facets: Optional[ArticleFacetFilter] = None):
+        key = cls._cache_last_articles_count_key(user_token, preferences, facets=facets)
 
         api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [GET LAST COUNT] : {key}")
         data_caching = RedisManagerInstance.get_instance().get(key=key)
@@ -287,20 +790,22 @@ class ArticleModel(ArticleSummaryModel):
                                    , user_token: UserToken
                                    , total: int
                                    , preferences: list[str] = None
+                                   , facets: Optional[ArticleFacetFilter] = None
                                    , expire: Optional[timedelta] = timedelta(hours=1)
                                    ):
-        key = cls._cache_last_articles_count_key(user_token, preferences)
+        key = cls._cache_last_articles_count_key(user_token, preferences, facets=facets)
 
         api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [LAST COUNT] [CACHE] : {key}")
 
         total_str = str(total)
         RedisManagerInstance.get_instance().set(key=key, value=total_str, ex=expire)
+        cls._register_last_articles_key(key, preferences, expire, facets=facets)
 
         api_logger.print_log()
 
     @classmethod
-    def scache_last_articles_count(cls, user_token: UserToken, preferences: list[str] = None):
-        key = cls._cache_last_articles_count_key(user_token, preferences)
+    def scache_last_articles_count(cls, user_token: UserToken, preferences: list[str] = None, facets: Optional[ArticleFacetFilter] = None):
+        key = cls._cache_last_articles_count_key(user_token, preferences, facets=facets)
 
         api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [LAST COUNT] [SCACHE] : {key}")
 
@@ -309,47 +814,83 @@ class ArticleModel(ArticleSummaryModel):
         api_logger.print_log()
 
     @classmethod
-    def last_articles_count(cls, user_token: UserToken, preferences: list[str] = None):
-        total = cls._last_articles_count(user_token, preferences)
+    def last_articles_count(cls, user_token: UserToken, preferences: list[str] = None, facets: Optional[ArticleFacetFilter] = None):
+        total = cls._last_articles_count(user_token, preferences, facets=facets)
         if total:
             return total
 
-        api_logger = ApiLogger(f"[MONGODB] [ARTICLE LASTEST COUNT] [GET] : preferences={preferences}")
-        if preferences:
-            filter_search = {
-                'tags': {
-                    '$in': preferences
-                }
-            }
-        else:
-            filter_search = {}
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE LASTEST COUNT] [GET] : preferences={preferences} and facets={facets}")
+        filter_search = cls._last_articles_filter(preferences, facets)
         with MONGO_QUERY_TIME.time():
             total = cls.collection().count_documents(filter_search)
         api_logger.print_log()
 
         total = total if (total and total > 0) else 0
 
-        cls._cache_last_articles_count(user_token, total, preferences)
+        cls._cache_last_articles_count(user_token, total, preferences, facets=facets)
 
         return total
 
     @classmethod
-    def _cache_last_articles_key(cls, user_token: UserToken, preferences: list[str] = None, page: int = 1, limit: int = 10):
-        if preferences is None or len(preferences) == 0:
-            return f"article:last:{page}:{limit}"
-        return f"article:last:{user_token.user_id}:{page}:{limit}"
+    def inbox_articles(cls, user_token: UserToken, preferences: list[str], page: int = 1, limit: int = 10) -> tuple[list["ArticleModel"], int]:
+        """
+        Preference feed in fan-out mode: the user inbox (rebuilt from the database when missing)
+        merged with the latest articles of the broad tags, which are not fanned out.
+        """
+        broad = ArticleInbox.broad_tags(preferences)
+        narrow = sorted(set(preferences) - broad)
+        projection = {'published_at': 1}
+
+        entries = ArticleInbox.entries(user_token.user_id)
+        if entries is None:
+            api_logger = ApiLogger(f"[MONGODB] [ARTICLE INBOX] [SEED] : user={user_token.user_id} and tags={narrow}")
+            seed = []
+            if narrow:
+                with MONGO_QUERY_TIME.time():
+                    cursor = cls.collection().find({'tags': {'$in': narrow}}, projection=projection).sort('published_at', -1).limit(ArticleInbox.max_inbox)
+                    seed = [(str(article['_id']), convert_str_to_datetime(article.get('published_at'))) for article in cursor]
+            ArticleInbox.seed(user_token.user_id, seed)
+            entries = [(article_id, ArticleInbox.timestamp(published_at)) for article_id, published_at in seed]
+            api_logger.print_log(extend_message=f"{len(seed)} articles")
+
+        timestamps = dict(entries)
+        if broad:
+            api_logger = ApiLogger(f"[MONGODB] [ARTICLE INBOX] [BROAD TAGS] : user={user_token.user_id}, tags={sorted(broad)}, page={page} and limit={limit}")
+            with MONGO_QUERY_TIME.time():
+                cursor = cls.collection().find({'tags': {'$in': sorted(broad)}}, projection=projection).sort('published_at', -1).limit(page * limit)
+                for article in cursor:
+                    timestamps.setdefault(str(article['_id']), ArticleInbox.timestamp(convert_str_to_datetime(article.get('published_at'))))
+            api_logger.print_log()
+
+        ranked = sorted(timestamps, key=timestamps.get, reverse=True)
+        article_ids = [ObjectId(article_id) for article_id in ranked[(page - 1) * limit:page * limit]]
+        if not article_ids:
+            return [], len(ranked)
+
+        with MONGO_QUERY_TIME.time():
+            results = {article['_id']: article for article in cls.collection().find({'_id': {'$in': article_ids}})}
+        return [cls(**results[article_id]) for article_id in article_ids if article_id in results], len(ranked)
+
+    @classmethod
+    def _cache_last_articles_key(cls, user_token: UserToken, preferences: list[str] = None, page: int = 1, limit: int = 10, facets: Optional[ArticleFacetFilter] = None):
+        return f"{cls._cache_last_articles_family()}:{filter_digest(cls._last_articles_filter(preferences, facets))}:{page}:{limit}"
 
     @classmethod
-    def _cache_last_articles_key_pattern(cls, user_token: UserToken, preferences: list[str] = None):
-        if preferences is None or len(preferences) == 0:
-            return f"article:last:*"
-        return f"article:last:{user_token.user_id}:*"
+    def _register_last_articles_key(cls, key: str | list[str], preferences: list[str] = None, expire: Optional[timedelta] = None, facets: Optional[ArticleFacetFilter] = None):
+        filter_search = cls._last_articles_filter(preferences, facets)
+        CacheKeyRegistry.register(
+            family=cls._cache_last_articles_family(),
+            digest=filter_digest(filter_search),
+            key=key,
+            canonical=canonical_filter(filter_search),
+            expire=expire
+        )
 
     @classmethod
-    def _last_articles(cls, user_token: UserToken, preferences: list[str] = None, page: int = 1, limit: int = 10):
-        key = cls._cache_last_articles_key(user_token, preferences, page, limit)
+    def _last_articles(cls, user_token: UserToken, preferences: list[str] = None, page: int = 1, limit: int = 10, facets: Optional[ArticleFacetFilter] = None):
+        key = cls._cache_last_articles_key(user_token, preferences, page, limit, facets=facets)
 
-        api_logger = ApiLogger(f"[REDIS] [ARTICLE LATEST] [GET] : page={page}, limit={limit} and preferences={preferences}")
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE LATEST] [GET] : page={page}, limit={limit} and preferences={preferences} and facets={facets}")
         data_caching = RedisManagerInstance.get_instance().get(key=key)
         if data_caching:
             api_logger.print_log()
@@ -370,42 +911,40 @@ class ArticleModel(ArticleSummaryModel):
                              , data: list
                              , preferences: list[str] = None
                              , page: int = 1, limit: int = 10
+                             , facets: Optional[ArticleFacetFilter] = None
                              , expire: Optional[timedelta] = timedelta(hours=1)
                              ):
-        key = cls._cache_last_articles_key(user_token, preferences, page, limit)
+        key = cls._cache_last_articles_key(user_token, preferences, page, limit, facets=facets)
 
         api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [LATEST] [CACHE] : {key}")
 
         data_json = json.dumps(data, cls=MyJSONEncoder)
         RedisManagerInstance.get_instance().set(key=key, value=data_json, ex=expire)
+        cls._register_last_articles_key(key, preferences, expire, facets=facets)
 
         api_logger.print_log()
 
     @classmethod
-    def scache_last_articles(cls, user_token: UserToken, preferences: list[str] = None):
-        key_pattern = cls._cache_last_articles_key_pattern(user_token, preferences)
+    def scache_last_articles(cls, user_token: UserToken, preferences: list[str] = None, facets: Optional[ArticleFacetFilter] = None):
+        """
+        Invalidate the cached feed of one preference set (and facet filters), or every feed when both are empty.
+        """
+        digest = filter_digest(cls._last_articles_filter(preferences, facets)) if (preferences or facets) else None
 
-        api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [LATEST] [SCACHE] : {key_pattern}")
+        api_logger = ApiLogger(f"[REDIS] [{cls._name().upper()}] [LATEST] [SCACHE] : family={cls._cache_last_articles_family()} and digest={digest}")
 
-        RedisManagerInstance.get_instance().delete_pattern(pattern=key_pattern)
+        CacheKeyRegistry.invalidate(family=cls._cache_last_articles_family(), digest=digest)
 
         api_logger.print_log()
 
     @classmethod
-    def last_articles(cls, user_token: UserToken, preferences: list[str] = None, page: int = 1, limit: int = 10):
-        data_last_cache = cls._last_articles(user_token, preferences, page, limit)
+    def last_articles(cls, user_token: UserToken, preferences: list[str] = None, page: int = 1, limit: int = 10, facets: Optional[ArticleFacetFilter] = None):
+        data_last_cache = cls._last_articles(user_token, preferences, page, limit, facets=facets)
         if data_last_cache:
             return data_last_cache
 
-        api_logger = ApiLogger(f"[MONGODB] [ARTICLE LATEST] [GET] : page={page}, limit={limit} and preferences={preferences}")
-        if preferences:
-            filter_search = {
-                'tags': {
-                    '$in': preferences
-                }
-            }
-        else:
-            filter_search = {}
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE LATEST] [GET] : page={page}, limit={limit} and preferences={preferences} and facets={facets}")
+        filter_search = cls._last_articles_filter(preferences, facets)
         sort = list({
                         'published_at': -1
                     }.items())
@@ -422,10 +961,46 @@ class ArticleModel(ArticleSummaryModel):
 
         last_all = [cls(**result) for result in results]
 
-        cls._cache_last_articles(user_token, last_all, preferences, page, limit)
+        cls._cache_last_articles(user_token, last_all, preferences, page, limit, facets=facets)
 
         return last_all
 
+    @classmethod
+    def prefetch_last_articles(cls
+                               , preferences: list[str] = None
+                               , pages: int = 5
+                               , limit: int = 10
+                               , facets: Optional[ArticleFacetFilter] = None
+                               , expire: Optional[timedelta] = timedelta(hours=1)
+                               ):
+        """
+        Materialize the first `pages` pages of the latest feed (and its count) with a single
+        query and a single pipelined write, using the same keys as last_articles.
+        """
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE LATEST] [PREFETCH] : pages={pages}, limit={limit} and preferences={preferences} and facets={facets}")
+
+        filter_search = cls._last_articles_filter(preferences, facets)
+        with MONGO_QUERY_TIME.time():
+            results = cls.collection().find(
+                filter=filter_search,
+                sort=[('published_at', -1)],
+                limit=pages * limit
+            )
+            total = cls.collection().count_documents(filter_search)
+        last_all = [cls(**result) for result in results]
+
+        values = {cls._cache_last_articles_count_key(None, preferences, facets=facets): str(total)}
+        for page in range(1, pages + 1):
+            data = last_all[(page - 1) * limit:page * limit]
+            if not data:
+                break
+            values[cls._cache_last_articles_key(None, preferences, page, limit, facets=facets)] = json.dumps(data, cls=MyJSONEncoder)
+        RedisManagerInstance.get_instance().set_many(values, ex=expire)
+        cls._register_last_articles_key(list(values.keys()), preferences, expire, facets=facets)
+
+        api_logger.print_log(extend_message=f"{len(values)} keys")
+        return len(values)
+
     @classmethod
     def _create_search_query(cls, query):
         # Create case-insensitive regex pattern
@@ -439,30 +1014,144 @@ class ArticleModel(ArticleSummaryModel):
             ]
         }
 
+    @staticmethod
+    def _normalize_search_query(query: str) -> str:
+        # "  Stock-Markets " and "stock markets" are the same search
+        return " ".join(text_analyzer.tokenize(query))
+
+    @classmethod
+    def _cache_search_ranking_key(cls, query: str, facets: Optional[ArticleFacetFilter] = None) -> str:
+        return f"article:search:{filter_digest({'q': query, 'facets': facets})}"
+
+    @classmethod
+    def _get_search_ranking(cls, query: str, facets: Optional[ArticleFacetFilter] = None) -> Optional[tuple[list[ObjectId], int]]:
+        key = cls._cache_search_ranking_key(query, facets)
+
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE SEARCH] [GET] : query={query} and facets={facets}")
+        data_caching = RedisManagerInstance.get_instance().get(key=key)
+        if data_caching:
+            data_json = json.loads(data_caching)
+            api_logger.print_log()
+            return [ObjectId(article_id) for article_id in data_json['ids']], data_json['total']
+        api_logger.print_error(message_error="Cache missing")
+        return None
+
+    @classmethod
+    def _cache_search_ranking(cls, query: str, article_ids: list[ObjectId], total: int, facets: Optional[ArticleFacetFilter] = None):
+        key = cls._cache_search_ranking_key(query, facets)
+
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE SEARCH] [CACHE] : {key}")
+
+        data_json = json.dumps({'ids': [str(article_id) for article_id in article_ids], 'total': total})
+        RedisManagerInstance.get_instance().set(key=key, value=data_json, ex=cls.search_cache_expire)
+
+        api_logger.print_log()
+
     @classmethod
-    def search_articles_count(cls, user_token: UserToken, query: str):
-        api_logger = ApiLogger(f"[MONGODB] [ARTICLE COUNT] [GET] : query={query}")
+    def _regex_search_ranking(cls, query: str, size: int, facets: Optional[ArticleFacetFilter] = None) -> tuple[list[ObjectId], int]:
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE SEARCH] [REGEX] : query={query}, size={size} and facets={facets}")
+
+        SEARCH_FALLBACKS.labels(reason="index_not_built").inc()
+
+        match = cls._create_search_query(query=query)
+        if facets:
+            match = {'$and': [match, facets.to_query()]}
+
+        pipeline = [
+            {"$match": match},
+            {
+                "$facet": {
+                    "ids": [
+                        {"$sort": {"published_at": -1}},
+                        {"$limit": size},
+                        {"$project": {"_id": 1}},
+                    ],
+                    "total": [{"$count": "count"}],
+                }
+            },
+        ]
 
         with MONGO_QUERY_TIME.time():
-            total = cls.collection().count_documents(cls._create_search_query(query=query))
+            result = next(cls.collection().aggregate(pipeline), {})
+
         api_logger.print_log()
-        return total if (total and total > 0) else 0
+        total = result.get("total") or [{"count": 0}]
+        return [article['_id'] for article in result.get("ids", [])], total[0]["count"]
 
     @classmethod
-    def search_articles(cls, user_token: UserToken, query: str, page: int = 1, limit: int = 10):
+    def _filter_ranking(cls, article_ids: list[ObjectId], facets: Optional[ArticleFacetFilter]) -> list[ObjectId]:
+        """
+        Keep the ranked ids matching the facet filters, in ranking order.
+        """
+        if not facets or not article_ids:
+            return article_ids
+
+        with MONGO_QUERY_TIME.time():
+            matching = {article['_id'] for article in cls.collection().find({'_id': {'$in': article_ids}, **facets.to_query()}, projection={'_id': 1})}
+        return [article_id for article_id in article_ids if article_id in matching]
+
+    @classmethod
+    def _search_ranking(cls, query: str, size: int, facets: Optional[ArticleFacetFilter] = None) -> tuple[list[ObjectId], int]:
+        if not ArticleSearchIndex.is_built():
+            return cls._regex_search_ranking(query, size, facets)
+
+        # facet filters are applied on a wider window of the relevance ranking
+        article_ids, total = ArticleSearchIndex.search(query, page=1, limit=max(size, cls.search_facet_window) if facets else size)
+        if facets:
+            article_ids = cls._filter_ranking(article_ids, facets)
+            total = len(article_ids)
+        if total >= cls.search_fuzzy_threshold:
+            return article_ids[:size], total
+
+        # few exact matches (typos, partial words): complete with the titles closest by trigrams
+        SEARCH_FALLBACKS.labels(reason="fuzzy").inc()
+        found = set(article_ids)
+        similar_ids = cls._filter_ranking([
+            article_id
+            for article_id, _ in ArticleTitleTrigramIndex.search(query, limit=size)
+            if article_id not in found
+        ], facets)
+        return (article_ids + similar_ids)[:size], total + len(similar_ids)
+
+    @classmethod
+    def search_articles(cls, user_token: UserToken, query: str, page: int = 1, limit: int = 10, facets: Optional[ArticleFacetFilter] = None):
+        """
+        Articles matching the query, ranked by the inverted index (BM25 + recency), and the total
+        number of matches. The regex scan is only used while the index has not been built.
+
+        The ranking of the first `search_cache_window` results is cached per normalized query,
+        so paginating and identical queries from other users do not search again. The search
+        itself runs on the query as typed (accents and punctuation matter to the regex scan).
+        """
         if not query:
-            return cls.last_articles(user_token, page=page, limit=limit)
+            return cls.last_articles(user_token, page=page, limit=limit, facets=facets), cls.last_articles_count(user_token, facets=facets)
+
+        cache_query = cls._normalize_search_query(query)
+        if not cache_query:
+            return [], 0
+        query = query.strip()
+
+        end = page * limit
+        cacheable = end <= cls.search_cache_window
+
+        ranking = cls._get_search_ranking(cache_query, facets) if cacheable else None
+        if ranking is None:
+            ranking = cls._search_ranking(query, size=max(end, cls.search_cache_window), facets=facets)
+            if cacheable:
+                cls._cache_search_ranking(cache_query, *ranking, facets=facets)
+
+        ranked_ids, total = ranking
+        article_ids = ranked_ids[(page - 1) * limit:end]
+        if not article_ids:
+            return [], total
 
-        api_logger = ApiLogger(f"[MONGODB] [ARTICLE SEARCH] [GET] : query={query}, page={page} and limit={limit}")
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE SEARCH] [GET] : query={query}, page={page}, limit={limit} and facets={facets}")
 
         with MONGO_QUERY_TIME.time():
-            results = cls.collection().find(cls._create_search_query(query=query)).sort('published_at', -1).skip((page - 1) * limit).limit(limit)
+            results = {result['_id']: result for result in cls.collection().find({'_id': {'$in': article_ids}})}
 
         api_logger.print_log()
-
-        if results:
-            return [cls(**result) for result in results]
-        return []
+        return [cls(**results[article_id]) for article_id in article_ids if article_id in results], total
 
     @classmethod
     def _cache_articles(cls, user_token: UserToken, articles: list):
@@ -510,7 +1199,19 @@ class ArticleSearchModel(DataBaseModel):
 
     @classmethod
     def _cache_search_articles_key(cls, user_token: UserToken, query: str, page: int = 1, limit: int = 10):
-        return f"article:search:{query}:{page}:{limit}"
+        return f"article:search:text:{filter_digest({'q': query})}:{page}:{limit}"
+
+    @classmethod
+    def _get_search_articles(cls, user_token: UserToken, query: str, page: int = 1, limit: int = 10):
+        key = cls._cache_search_articles_key(user_token, query, page, limit)
+
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE] [SEARCH] [GET] : {key}")
+        data_caching = RedisManagerInstance.get_instance().get(key=key)
+        if data_caching:
+            api_logger.print_log()
+            return [cls(**data_json) for data_json in json.loads(data_caching)]
+        api_logger.print_error(message_error="Cache missing")
+        return None
 
     @classmethod
     def _cache_search_articles(cls, user_token: UserToken, articles: list, query: str, page: int = 1, limit: int = 10):
@@ -518,11 +1219,23 @@ class ArticleSearchModel(DataBaseModel):
 
         api_logger = ApiLogger(f"[REDIS] [ARTICLE] [SEARCH] [CACHE] : {key}")
 
+        data_json = json.dumps([article.model_dump() for article in articles], cls=MyJSONEncoder)
+        RedisManagerInstance.get_instance().set(key=key, value=data_json, ex=ArticleModel.search_cache_expire)
+
+        api_logger.print_log()
+
     @classmethod
     def search_articles(cls, user_token: UserToken, query: str, page: int = 1, limit: int = 10):
         if not query:
             return ArticleModel.last_articles(user_token, page=page, limit=limit)
 
+        # the query as typed: $text keeps the quoted phrases and the -negations, which the
+        # normalized query (ArticleModel._normalize_search_query) drops
+        query = query.strip()
+        data_cache = cls._get_search_articles(user_token, query, page, limit)
+        if data_cache is not None:
+            return data_cache
+
         api_logger = ApiLogger(f"[MONGODB] [ARTICLE] [SEARCH] [GET] : query={query}, page={page} and limit={limit}")
 
         pipeline = [
@@ -565,8 +1278,11 @@ class ArticleSearchModel(DataBaseModel):
             api_logger.print_error("Error occurred during article search")
             return []
 
+        articles = [cls(**result) for result in list(results)]
+        cls._cache_search_articles(user_token, articles, query, page, limit)
+
         api_logger.print_log()
-        return [cls(**result) for result in list(results)]
+        return articles
 
 
 class ArticleWithInteractionModel(ArticleModel):
@@ -591,6 +1307,8 @@ class ArticleWithInteractionModel(ArticleModel):
             'url': fields.String(required=False),
             'language': fields.String(required=False),
             'country': fields.String(required=False),
+            'duplicates': fields.List(fields.Nested(ArticleDuplicateModel.to_model(name_space)), required=False),
+            'story_id': fields.String(required=False),
             'current_user_interaction': fields.Nested(ArticleInteractionStatus.to_model(name_space)),
             'total_user_interaction': fields.Nested(ArticleInteractionStats.to_model(name_space)),
         })
@@ -606,15 +1324,43 @@ class ArticleWithInteractionModel(ArticleModel):
         })
 
 
+class ArticleTagCountModel(DataBaseModel):
+    tag: str
+    article_count: int = 0
+
+    @staticmethod
+    def to_model(name_space: Namespace):
+        return name_space.model('ArticleTagCountModel', {
+            'tag': fields.String(required=True),
+            'article_count': fields.Integer(required=False),
+        })
+
+
 class ArticleTagsModel(DataBaseModel):
     tags: list[str] = []
+    counts: list[ArticleTagCountModel] = []
 
     @staticmethod
     def to_model(name_space: Namespace):
         return name_space.model('ArticleTagsModel', {
             'tags': fields.List(fields.String, description="List of tags"),
+            'counts': fields.List(fields.Nested(ArticleTagCountModel.to_model(name_space)), description="Tags with their number of articles, most used first"),
         })
 
+    @classmethod
+    def from_tags(cls, tags: list[TagModel]):
+        return cls(
+            tags=[tag.tag for tag in tags],
+            counts=[ArticleTagCountModel(tag=tag.tag, article_count=tag.article_count) for tag in tags]
+        )
+
+    @classmethod
+    def from_counts(cls, counts: list[tuple[str, int]]):
+        return cls(
+            tags=[tag for tag, _ in counts],
+            counts=[ArticleTagCountModel(tag=tag, article_count=count) for tag, count in counts]
+        )
+
 
 
 class ArticleCommentStats(DataBaseModel):
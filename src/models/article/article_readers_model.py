@@ -0,0 +1,98 @@
+from datetime import datetime, timezone, timedelta, date
+from typing import Optional, ClassVar
+
+from flask_restx import Namespace, fields
+
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.log.api_logger import ApiLogger
+from src.models import DataBaseModel
+
+
+class ArticleReadersModel(DataBaseModel):
+    """
+    Unique readers of an article (or of the whole site when article_id is None),
+    estimated with one Redis HyperLogLog per day.
+
+    Every sketch is at most 12KB and daily sketches expire after `retention_days`,
+    so the memory used per article is bounded whatever the number of readers.
+    Windows of several days are answered by merging the daily sketches (PFMERGE).
+    """
+    article_id: Optional[str] = None
+    unique_readers_today: int = 0
+    unique_readers_week: int = 0
+
+    retention_days: ClassVar[int] = 31
+    window_expire: ClassVar[timedelta] = timedelta(minutes=10)
+
+    @staticmethod
+    def to_model(name_space: Namespace):
+        return name_space.model('ArticleReadersModel', {
+            'article_id': fields.String(required=False),
+            'unique_readers_today': fields.Integer(required=False),
+            'unique_readers_week': fields.Integer(required=False),
+        })
+
+    @staticmethod
+    def _today() -> date:
+        return datetime.now(timezone.utc).date()
+
+    @classmethod
+    def _day_key(cls, article_id: Optional[str], day: date) -> str:
+        if article_id is None:
+            return f"article:readers:{day.strftime('%Y%m%d')}"
+        return f"article:{article_id}:readers:{day.strftime('%Y%m%d')}"
+
+    @classmethod
+    def _window_key(cls, article_id: Optional[str], start: date, end: date) -> str:
+        if article_id is None:
+            return f"article:readers:window:{start.strftime('%Y%m%d')}:{end.strftime('%Y%m%d')}"
+        return f"article:{article_id}:readers:window:{start.strftime('%Y%m%d')}:{end.strftime('%Y%m%d')}"
+
+    @classmethod
+    def add_reader(cls, article_id: str, user_id: str, read_at: Optional[datetime] = None):
+        day = read_at.date() if read_at else cls._today()
+        expire = timedelta(days=cls.retention_days + 1)
+
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE READERS] [PFADD] : article={article_id} and user={user_id}")
+
+        RedisManagerInstance.get_instance().pfadd(cls._day_key(article_id, day), user_id, ex=expire)
+        RedisManagerInstance.get_instance().pfadd(cls._day_key(None, day), user_id, ex=expire)
+
+        api_logger.print_log()
+
+    @classmethod
+    def count_unique_readers(cls, article_id: Optional[str] = None, start: Optional[date] = None, end: Optional[date] = None) -> int:
+        """
+        Unique readers between start and end (both included). The window is clamped
+        to the retention period since older daily sketches have expired.
+        """
+        today = cls._today()
+
+        end = min(end, today) if end else today
+        start = max(start, today - timedelta(days=cls.retention_days - 1)) if start else end
+        if start > end:
+            return 0
+
+        day_keys = [cls._day_key(article_id, start + timedelta(days=i)) for i in range((end - start).days + 1)]
+
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE READERS] [PFCOUNT] : article={article_id}, start={start} and end={end}")
+
+        if len(day_keys) == 1:
+            total = RedisManagerInstance.get_instance().pfcount(day_keys[0])
+        else:
+            window_key = cls._window_key(article_id, start, end)
+            if not RedisManagerInstance.get_instance().exists(window_key):
+                RedisManagerInstance.get_instance().pfmerge(window_key, *day_keys, ex=cls.window_expire)
+            total = RedisManagerInstance.get_instance().pfcount(window_key)
+
+        api_logger.print_log()
+        return total
+
+    @classmethod
+    def get_stats(cls, article_id: Optional[str] = None):
+        today = cls._today()
+        return cls(
+            article_id=article_id,
+            unique_readers_today=cls.count_unique_readers(article_id, start=today, end=today),
+            unique_readers_week=cls.count_unique_readers(article_id, start=today - timedelta(days=6), end=today),
+        )
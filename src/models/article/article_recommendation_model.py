@@ -0,0 +1,265 @@
+import heapq
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone, timedelta
+from itertools import islice
+from threading import Thread
+from typing import Optional
+
+import numpy as np
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from src.lib.database.nosql.document.mongodb.mongodb_manager import MongoDBManager, mongodb_client
+from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.log.api_logger import ApiLogger
+from src.lib.search.cooccurrence import ItemCooccurrence
+from src.lib.search.tfidf import top_k_rows
+from src.models.article.article_model import ArticleModel
+from src.models.server.job_state_model import JobState
+
+
+class ArticleCollaborativeFilter:
+    """
+    Item-item collaborative filtering over the article interactions.
+
+    The offline job streams the interactions sorted by user (index (user_id, read_at)),
+    keeps the `max_items_per_user` most recent articles of every user, and accumulates
+    the weighted co-occurrences into a sparse item x item matrix bounded to `max_pairs`
+    pairs, in chunks of users whose products hold about `chunk_pairs` pairs (n * (n - 1)
+    for a user with n articles). Only the `max_items` most interacted articles
+    are columns, so memory does not depend on the number of interactions.
+
+    The `top_k` cosine neighbours of every article are stored, one document per article:
+    {_id: article id, neighbours: [{article_id, score}], run_id, updated_at}.
+
+    Recommendations sum the neighbours of the `recent_reads` last articles of the user,
+    the k-th most recent read weighted by recent_decay^k.
+    """
+
+    JOB_NAME = "article_collaborative_filter"
+
+    weight_read: float = 1.0
+    weight_liked: float = 2.0
+    weight_saved: float = 2.0
+    weight_shared: float = 3.0
+
+    max_items: int = 200_000
+    min_item_users: int = 2
+    max_items_per_user: int = 50
+    chunk_pairs: int = 2_000_000
+    read_batch_size: int = 10_000
+    max_pairs: int = 20_000_000
+    top_k: int = 30
+    min_score: float = 0.01
+
+    recent_reads: int = 20
+    recent_decay: float = 0.9
+    max_recommended: int = 200
+    cache_expire: timedelta = timedelta(minutes=10)
+
+    @classmethod
+    def neighbours(cls):
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("article_cf_neighbour")]
+
+    @staticmethod
+    def _interactions():
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("interaction")]
+
+    @classmethod
+    def init(cls):
+        try:
+            cls.neighbours().create_index({"run_id": 1})
+        except Exception as e:
+            print(e)
+
+    @classmethod
+    def _weight(cls, interaction: dict) -> float:
+        return (
+            cls.weight_read
+            + (cls.weight_liked if interaction.get("liked") else 0.0)
+            + (cls.weight_saved if interaction.get("saved") else 0.0)
+            + (cls.weight_shared if interaction.get("shared") else 0.0)
+        )
+
+    @classmethod
+    def _items(cls) -> list[str]:
+        """
+        The `max_items` articles with the most users, grouped by the database.
+        """
+        pipeline = [
+            {"$match": {"comment_id": None, "report": {"$ne": True}}},
+            {"$group": {"_id": "$article_id", "users": {"$sum": 1}}},
+            {"$match": {"users": {"$gte": cls.min_item_users}}},
+            {"$sort": {"users": -1}},
+            {"$limit": cls.max_items},
+        ]
+        with MONGO_QUERY_TIME.time():
+            return [item["_id"] for item in cls._interactions().aggregate(pipeline, allowDiskUse=True)]
+
+    @classmethod
+    def _accumulate(cls, item_indexes: dict[str, int]) -> ItemCooccurrence:
+        cooccurrence = ItemCooccurrence(len(item_indexes), max_pairs=cls.max_pairs)
+
+        users, items, weights = [], [], []
+        current_user = None
+        user_index = -1
+        user_items = 0
+        pairs = 0
+
+        cursor = cls._interactions().find(
+            {"comment_id": None, "report": {"$ne": True}},
+            projection={"_id": 0, "user_id": 1, "article_id": 1, "liked": 1, "saved": 1, "shared": 1},
+            batch_size=cls.read_batch_size,
+        ).sort([("user_id", 1), ("read_at", -1)])
+
+        while True:
+            with MONGO_QUERY_TIME.time():
+                batch = list(islice(cursor, cls.read_batch_size))
+            if not batch:
+                break
+
+            for interaction in batch:
+                if interaction["user_id"] != current_user:
+                    if pairs >= cls.chunk_pairs:
+                        cooccurrence.add_users(np.array(users, dtype=np.int64), np.array(items, dtype=np.int64), np.array(weights, dtype=np.float32))
+                        users, items, weights = [], [], []
+                        user_index = -1
+                        pairs = 0
+                    current_user = interaction["user_id"]
+                    user_index += 1
+                    user_items = 0
+
+                item = item_indexes.get(interaction["article_id"])
+                if item is None or user_items >= cls.max_items_per_user:
+                    continue
+                users.append(user_index)
+                items.append(item)
+                weights.append(cls._weight(interaction))
+                # the new article pairs with each previous article of the user, both ways
+                pairs += 2 * user_items
+                user_items += 1
+
+        cooccurrence.add_users(np.array(users, dtype=np.int64), np.array(items, dtype=np.int64), np.array(weights, dtype=np.float32))
+        return cooccurrence
+
+    @classmethod
+    def run(cls) -> int:
+        """
+        Recompute the neighbours of every article. Returns the number of neighbour lists written.
+        """
+        redis = RedisManagerInstance.get_instance()
+        lock_key = "article:recommended:job:lock"
+        if not redis.set(key=lock_key, value="1", ex=timedelta(hours=2), nx=True):
+            ApiLogger(f"[REDIS] [ARTICLE RECOMMENDATION] [JOB] already running")
+            return 0
+
+        try:
+            api_logger = ApiLogger(f"[SCIPY] [ARTICLE RECOMMENDATION] [JOB] : max items={cls.max_items}, max pairs={cls.max_pairs} and top k={cls.top_k}")
+
+            item_ids = cls._items()
+            if not item_ids:
+                api_logger.print_log(extend_message="no interaction")
+                return 0
+
+            cooccurrence = cls._accumulate({article_id: index for index, article_id in enumerate(item_ids)})
+            neighbours = top_k_rows(cooccurrence.cosine(), k=cls.top_k, min_score=cls.min_score)
+
+            run_id = uuid.uuid4().hex
+            now = datetime.now(timezone.utc)
+            operations = [
+                UpdateOne(
+                    {"_id": item_ids[row]},
+                    {"$set": {"neighbours": [{"article_id": item_ids[column], "score": score} for column, score in row_neighbours], "run_id": run_id, "updated_at": now}},
+                    upsert=True,
+                )
+                for row, row_neighbours in enumerate(neighbours) if row_neighbours
+            ]
+            with MONGO_QUERY_TIME.time():
+                for start in range(0, len(operations), 1_000):
+                    cls.neighbours().bulk_write(operations[start:start + 1_000], ordered=False)
+                # lists of the previous run that were not rewritten
+                cls.neighbours().delete_many({"run_id": {"$ne": run_id}})
+
+            JobState.save(cls.JOB_NAME, run_id=run_id, items=len(item_ids), users=cooccurrence.users, pairs=cooccurrence.counts.nnz, prunes=cooccurrence.prunes, written=len(operations))
+
+            api_logger.print_log(extend_message=f"{cooccurrence.users} users, {len(item_ids)} articles, {cooccurrence.counts.nnz} pairs and {len(operations)} neighbour lists")
+            return len(operations)
+        finally:
+            redis.delete(key=lock_key)
+
+    @classmethod
+    def run_in_background(cls):
+        thread = Thread(target=cls.run)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def _cache_key(cls, user_id: str) -> str:
+        return f"article:recommended:{user_id}"
+
+    @classmethod
+    def _get_recommended(cls, user_id: str) -> Optional[list[str]]:
+        key = cls._cache_key(user_id)
+
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE RECOMMENDATION] [GET] : {key}")
+        data_caching = RedisManagerInstance.get_instance().get(key=key)
+        if data_caching:
+            api_logger.print_log()
+            return json.loads(data_caching)
+        api_logger.print_error(message_error="Cache missing")
+        return None
+
+    @classmethod
+    def recommended_ids(cls, user_id: str, refresh: bool = False) -> list[str]:
+        if not refresh:
+            recommended = cls._get_recommended(user_id)
+            if recommended is not None:
+                return recommended
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE RECOMMENDATION] [RECOMMEND] : user={user_id}")
+
+        with MONGO_QUERY_TIME.time():
+            recent = [
+                interaction["article_id"]
+                for interaction in cls._interactions().find(
+                    {"user_id": user_id, "comment_id": None, "report": {"$ne": True}},
+                    projection={"_id": 0, "article_id": 1},
+                ).sort("read_at", -1).limit(cls.recent_reads)
+            ]
+            neighbours = {document["_id"]: document.get("neighbours") or [] for document in cls.neighbours().find({"_id": {"$in": recent}})}
+
+        seen = set(recent)
+        scores = defaultdict(float)
+        for position, article_id in enumerate(recent):
+            weight = cls.recent_decay ** position
+            for neighbour in neighbours.get(article_id, []):
+                if neighbour["article_id"] not in seen:
+                    scores[neighbour["article_id"]] += weight * neighbour["score"]
+
+        recommended = [article_id for article_id, _ in heapq.nlargest(cls.max_recommended, scores.items(), key=lambda item: item[1])]
+
+        RedisManagerInstance.get_instance().set(key=cls._cache_key(user_id), value=json.dumps(recommended), ex=cls.cache_expire)
+
+        api_logger.print_log(extend_message=f"{len(recent)} recent reads and {len(recommended)} recommendations")
+        return recommended
+
+    @classmethod
+    def recommend(cls, user_id: str, page: int = 1, limit: int = 10) -> tuple[list[ArticleModel], int]:
+        recommended = cls.recommended_ids(user_id)
+
+        article_ids = [ObjectId(article_id) for article_id in recommended[(page - 1) * limit:page * limit] if ObjectId.is_valid(article_id)]
+        if not article_ids:
+            return [], len(recommended)
+
+        with MONGO_QUERY_TIME.time():
+            results = {article['_id']: article for article in ArticleModel.collection().find({'_id': {'$in': article_ids}})}
+
+        return [ArticleModel(**results[article_id]) for article_id in article_ids if article_id in results], len(recommended)
+
+
+if __name__ == '__main__':
+    ArticleCollaborativeFilter.init()
+    ArticleCollaborativeFilter.run()
@@ -0,0 +1,379 @@
+import heapq
+import math
+from collections import defaultdict
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from src.lib.database.nosql.document.mongodb.mongodb_manager import MongoDBManager, mongodb_client
+from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+from src.lib.log.api_logger import ApiLogger
+from src.lib.search import text_analyzer
+from src.lib.search.search_monitoring_middleware import SEARCH_QUERY_TIME
+from src.lib.utility.utils import convert_str_to_datetime
+
+
+class ArticleSearchIndex:
+    """
+    Inverted index over the title, description and tags of the articles, stored in MongoDB.
+
+    Collections:
+        postings    one document per (term, article): weighted tf, document length,
+                    publication date and a precomputed impact, indexed on (term, impact desc)
+        terms       document frequency of every term, plus one corpus document holding
+                    the number of indexed articles and their total length
+
+    Queries are scored with BM25 (field weighted term frequencies) and boosted by recency.
+    Only the `max_postings_per_term` highest impact postings of each term are read, so the
+    cost of a query does not grow with the size of the collection.
+
+    Postings are unique per (term, article) and upserted: indexing an article twice (a save
+    during a rebuild) does not count it twice in the frequencies.
+    """
+
+    CORPUS_ID = "__corpus__"
+
+    k1: float = 1.2
+    b: float = 0.75
+    field_weights: dict[str, float] = {"title": 3.0, "tags": 2.0, "description": 1.0}
+    recency_weight: float = 0.3
+    recency_half_life: timedelta = timedelta(days=7)
+    max_postings_per_term: int = 5000
+    max_query_terms: int = 8
+
+    @classmethod
+    def postings(cls):
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("article_search_posting")]
+
+    @classmethod
+    def terms(cls):
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("article_search_term")]
+
+    @classmethod
+    def init(cls):
+        try:
+            cls.postings().create_index([("term", 1), ("impact", -1)])
+        except Exception as e:
+            print(e)
+        try:
+            cls.postings().create_index([("term", 1), ("article_id", 1)], unique=True)
+        except Exception as e:
+            ApiLogger("[MONGODB] [ARTICLE SEARCH INDEX] [INIT] unique (term, article_id) index").print_error(str(e))
+        try:
+            cls.postings().create_index({"article_id": 1})
+        except Exception as e:
+            print(e)
+
+    @classmethod
+    def _corpus(cls) -> tuple[int, float]:
+        corpus = cls.terms().find_one({"_id": cls.CORPUS_ID}) or {}
+        doc_count = corpus.get("doc_count", 0)
+        total_length = corpus.get("total_length", 0.0)
+        return doc_count, (total_length / doc_count) if doc_count else 0.0
+
+    @classmethod
+    def _term_score(cls, tf: float, length: float, avg_length: float) -> float:
+        norm = cls.k1 * (1 - cls.b + cls.b * (length / avg_length if avg_length else 1.0))
+        return tf * (cls.k1 + 1) / (tf + norm)
+
+    @classmethod
+    def _recency_boost(cls, published_at: Optional[datetime], now: datetime) -> float:
+        if not published_at:
+            return 1.0
+        if published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=timezone.utc)
+        age = max((now - published_at).total_seconds(), 0.0)
+        return 1.0 + cls.recency_weight * 0.5 ** (age / cls.recency_half_life.total_seconds())
+
+    @classmethod
+    def index_articles(cls, articles: list[dict]) -> int:
+        """
+        Add articles to the index. Each article is a dict with `_id`, `title`,
+        `description`, `tags` and `published_at`. Returns the number of postings written.
+        """
+        if not articles:
+            return 0
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE SEARCH INDEX] [INDEX] : {len(articles)} articles")
+
+        analyzed = []
+        for article in articles:
+            frequencies, length = text_analyzer.term_frequencies([
+                (article.get("title") or "", cls.field_weights["title"]),
+                (" ".join(article.get("tags") or []), cls.field_weights["tags"]),
+                (article.get("description") or "", cls.field_weights["description"]),
+            ])
+            if frequencies:
+                analyzed.append((article, frequencies, length))
+
+        if not analyzed:
+            api_logger.print_log(extend_message="nothing to index")
+            return 0
+
+        doc_count, avg_length = cls._corpus()
+        batch_length = sum(length for _, _, length in analyzed)
+        avg_length = (avg_length * doc_count + batch_length) / (doc_count + len(analyzed))
+
+        postings = []
+        # (term, article length) of every posting, in the order of the operations
+        positions = []
+        for index, (article, frequencies, length) in enumerate(analyzed):
+            article_id = ObjectId(article["_id"])
+            published_at = convert_str_to_datetime(article.get("published_at"))
+            for term, tf in frequencies.items():
+                positions.append((term, index))
+                postings.append(UpdateOne(
+                    {"term": term, "article_id": article_id},
+                    {"$set": {
+                        "tf": tf,
+                        "length": length,
+                        "published_at": published_at,
+                        # impact only orders the postings of a term, the score is recomputed at query time
+                        "impact": cls._term_score(tf, length, avg_length),
+                    }},
+                    upsert=True
+                ))
+
+        with MONGO_QUERY_TIME.time():
+            try:
+                upserted = set(cls.postings().bulk_write(postings, ordered=False).upserted_ids)
+            except BulkWriteError as e:
+                # concurrent indexing of the same article: the other writer counted the posting
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+                upserted = {item["index"] for item in e.details.get("upserted", [])}
+
+        # only the new postings count in the frequencies
+        document_frequencies = defaultdict(int)
+        new_articles = set()
+        for index in upserted:
+            term, article_index = positions[index]
+            document_frequencies[term] += 1
+            new_articles.add(article_index)
+
+        if document_frequencies:
+            term_updates = [UpdateOne({"_id": term}, {"$inc": {"df": df}}, upsert=True) for term, df in document_frequencies.items()]
+            term_updates.append(UpdateOne(
+                {"_id": cls.CORPUS_ID},
+                {"$inc": {"doc_count": len(new_articles), "total_length": sum(analyzed[index][2] for index in new_articles)}},
+                upsert=True
+            ))
+            with MONGO_QUERY_TIME.time():
+                cls.terms().bulk_write(term_updates, ordered=False)
+
+        api_logger.print_log(extend_message=f"{len(postings)} postings, {len(upserted)} new")
+        return len(upserted)
+
+    @classmethod
+    def remove_article(cls, article_id: str | ObjectId) -> int:
+        article_id = ObjectId(article_id)
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE SEARCH INDEX] [REMOVE] : {article_id}")
+
+        with MONGO_QUERY_TIME.time():
+            postings = list(cls.postings().find({"article_id": article_id}, projection={"term": 1, "length": 1}))
+            if postings:
+                term_updates = [UpdateOne({"_id": posting["term"]}, {"$inc": {"df": -1}}) for posting in postings]
+                term_updates.append(UpdateOne({"_id": cls.CORPUS_ID}, {"$inc": {"doc_count": -1, "total_length": -postings[0]["length"]}}))
+                cls.terms().bulk_write(term_updates, ordered=False)
+                cls.postings().delete_many({"article_id": article_id})
+
+        api_logger.print_log(extend_message=f"{len(postings)} postings")
+        return len(postings)
+
+    @classmethod
+    def clear(cls):
+        # delete instead of drop: the unique index stays in place for the concurrent saves.
+        # Terms first: a posting written in between is either deleted too or counted once.
+        with MONGO_QUERY_TIME.time():
+            cls.terms().delete_many({})
+            cls.postings().delete_many({})
+        cls.init()
+
+    @classmethod
+    def is_built(cls) -> bool:
+        doc_count, _ = cls._corpus()
+        return doc_count > 0
+
+    @classmethod
+    def search(cls, query: str, page: int = 1, limit: int = 10) -> tuple[list[ObjectId], int]:
+        """
+        Ids of the articles of the requested page, best first, and the number of matching articles.
+
+        The number is exact unless a term has more than `max_postings_per_term` postings; it is
+        then a lower bound (the largest document frequency of the query terms at least).
+        """
+        terms = list(dict.fromkeys(text_analyzer.analyze(query)))[:cls.max_query_terms]
+        if not terms:
+            return [], 0
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE SEARCH INDEX] [SEARCH] : terms={terms}, page={page} and limit={limit}")
+
+        with SEARCH_QUERY_TIME.time():
+            doc_count, avg_length = cls._corpus()
+
+            with MONGO_QUERY_TIME.time():
+                document_frequencies = {term["_id"]: term["df"] for term in cls.terms().find({"_id": {"$in": terms}})}
+
+            scores = defaultdict(float)
+            published = {}
+            for term in terms:
+                df = document_frequencies.get(term, 0)
+                if df <= 0:
+                    continue
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+
+                with MONGO_QUERY_TIME.time():
+                    cursor = cls.postings().find(
+                        {"term": term},
+                        projection={"_id": 0, "article_id": 1, "tf": 1, "length": 1, "published_at": 1},
+                    ).sort("impact", -1).limit(cls.max_postings_per_term)
+
+                    for posting in cursor:
+                        article_id = posting["article_id"]
+                        scores[article_id] += idf * cls._term_score(posting["tf"], posting["length"], avg_length)
+                        published[article_id] = posting.get("published_at")
+
+            now = datetime.now(timezone.utc)
+            top = heapq.nlargest(
+                page * limit,
+                ((score * cls._recency_boost(published[article_id], now), article_id) for article_id, score in scores.items()),
+                key=lambda item: item[0],
+            )
+
+        total = max([len(scores), *document_frequencies.values()])
+
+        api_logger.print_log(extend_message=f"{total} matching articles")
+        return [article_id for _, article_id in top[(page - 1) * limit:]], total
+
+
+class ArticleTitleTrigramIndex:
+    """
+    Character trigram index over the normalized article titles, for typo tolerant
+    and partial word search.
+
+    One document per article holds the set of trigrams of its title (multikey index).
+    Candidates share at least `min_overlap` of the query trigrams and are ranked by
+    Jaccard similarity between the two trigram sets.
+
+    A candidate sharing m of the n query trigrams holds at least one of the n - m + 1
+    rarest ones, so only those are looked up: the common trigrams (padded word starts like
+    "  t") never drive the scan. The newest `max_scanned` matches at most are scored.
+
+    The document frequency of every trigram is kept in a second collection ({_id: trigram,
+    df}), counted for the newly indexed articles only: a title edited in place is not
+    recounted. It only picks the grams looked up, any choice of them finds the same matches.
+    """
+
+    min_overlap: float = 0.3
+    min_similarity: float = 0.2
+    max_candidates: int = 1000
+    max_scanned: int = 20_000
+
+    @classmethod
+    def trigrams_collection(cls):
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("article_title_trigram")]
+
+    @classmethod
+    def frequencies_collection(cls):
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("article_title_trigram_df")]
+
+    @classmethod
+    def init(cls):
+        try:
+            cls.trigrams_collection().create_index([("grams", 1), ("published_at", -1)])
+        except Exception as e:
+            print(e)
+
+    @classmethod
+    def index_articles(cls, articles: list[dict]) -> int:
+        documents = []
+        for article in articles:
+            grams = text_analyzer.trigrams(article.get("title") or "")
+            if grams:
+                documents.append({
+                    "_id": ObjectId(article["_id"]),
+                    "grams": sorted(grams),
+                    "size": len(grams),
+                    "published_at": convert_str_to_datetime(article.get("published_at")),
+                })
+        if not documents:
+            return 0
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE TRIGRAM INDEX] [INDEX] : {len(documents)} articles")
+
+        # upserts: an article indexed again (rebuild running beside the saves) is replaced
+        with MONGO_QUERY_TIME.time():
+            upserted = cls.trigrams_collection().bulk_write([ReplaceOne({"_id": document["_id"]}, document, upsert=True) for document in documents], ordered=False).upserted_ids
+
+            document_frequencies = defaultdict(int)
+            for index in upserted:
+                for gram in documents[index]["grams"]:
+                    document_frequencies[gram] += 1
+            if document_frequencies:
+                cls.frequencies_collection().bulk_write([UpdateOne({"_id": gram}, {"$inc": {"df": df}}, upsert=True) for gram, df in document_frequencies.items()], ordered=False)
+
+        api_logger.print_log(extend_message=f"{len(upserted)} new")
+        return len(documents)
+
+    @classmethod
+    def remove_article(cls, article_id: str | ObjectId) -> bool:
+        with MONGO_QUERY_TIME.time():
+            document = cls.trigrams_collection().find_one_and_delete({"_id": ObjectId(article_id)}, projection={"grams": 1})
+            if document and document.get("grams"):
+                cls.frequencies_collection().bulk_write([UpdateOne({"_id": gram}, {"$inc": {"df": -1}}) for gram in document["grams"]], ordered=False)
+        return document is not None
+
+    @classmethod
+    def clear(cls):
+        with MONGO_QUERY_TIME.time():
+            cls.frequencies_collection().delete_many({})
+            cls.trigrams_collection().drop()
+        cls.init()
+
+    @classmethod
+    def _rarest(cls, grams: list[str], count: int) -> list[str]:
+        """
+        The `count` least frequent trigrams, in one query. Unknown trigrams come first: they match nothing.
+        """
+        with MONGO_QUERY_TIME.time():
+            frequencies = {gram["_id"]: gram["df"] for gram in cls.frequencies_collection().find({"_id": {"$in": grams}})}
+        return sorted(grams, key=lambda gram: frequencies.get(gram, 0))[:count]
+
+    @classmethod
+    def search(cls, query: str, limit: int = 10) -> list[tuple[ObjectId, float]]:
+        """
+        Articles whose title is the most similar to the query, with their similarity.
+        """
+        grams = sorted(text_analyzer.trigrams(query))
+        if not grams:
+            return []
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE TRIGRAM INDEX] [SEARCH] : query={query} and limit={limit}")
+
+        min_overlap = max(1, math.ceil(len(grams) * cls.min_overlap))
+
+        with SEARCH_QUERY_TIME.time():
+            rarest = cls._rarest(grams, len(grams) - min_overlap + 1)
+            pipeline = [
+                {"$match": {"grams": {"$in": rarest}}},
+                {"$sort": {"published_at": -1}},
+                {"$limit": cls.max_scanned},
+                {"$project": {"size": 1, "published_at": 1, "overlap": {"$size": {"$setIntersection": ["$grams", grams]}}}},
+                {"$match": {"overlap": {"$gte": min_overlap}}},
+                {"$sort": {"overlap": -1, "published_at": -1}},
+                {"$limit": cls.max_candidates},
+                {"$project": {"similarity": {"$divide": ["$overlap", {"$subtract": [{"$add": ["$size", len(grams)]}, "$overlap"]}]}, "published_at": 1}},
+                {"$match": {"similarity": {"$gte": cls.min_similarity}}},
+                {"$sort": {"similarity": -1, "published_at": -1}},
+                {"$limit": limit},
+            ]
+
+            with MONGO_QUERY_TIME.time():
+                results = [(result["_id"], result["similarity"]) for result in cls.trigrams_collection().aggregate(pipeline)]
+
+        api_logger.print_log(extend_message=f"{len(results)} articles")
+        return results
@@ -0,0 +1,259 @@
+import json
+from collections import defaultdict
+from datetime import datetime, timezone, timedelta
+from threading import Thread
+from typing import Optional
+
+import numpy as np
+from bson import ObjectId
+from flask_restx import Namespace, fields
+from pymongo import UpdateOne
+from scipy import sparse
+
+from src.lib.database.nosql.document.mongodb.mongodb_manager import MongoDBManager, mongodb_client
+from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.log.api_logger import ApiLogger
+from src.lib.search import text_analyzer
+from src.lib.search.tfidf import tfidf_matrix, tfidf_weight, top_k_cosine
+from src.lib.utility.utils import MyJSONEncoder
+from src.models import DataBaseModel
+from src.models.article.article_model import ArticleSummaryModel
+from src.models.server.job_state_model import JobState
+
+
+class ArticleSimilarModel(DataBaseModel):
+    score: float
+    article: dict
+
+    @staticmethod
+    def to_model(name_space: Namespace):
+        return name_space.model('ArticleSimilarModel', {
+            'score': fields.Float(required=True),
+            'article': fields.Nested(ArticleSummaryModel.to_model(name_space)),
+        })
+
+    @staticmethod
+    def to_model_list(name_space: Namespace):
+        return name_space.model('ArticleSimilarModelList', {
+            'article_id': fields.String(required=True),
+            'similar': fields.List(fields.Nested(ArticleSimilarModel.to_model(name_space))),
+        })
+
+
+class ArticleSimilarityJob:
+    """
+    Related articles by content: title, description and tags are vectorized into a
+    sparse TF-IDF matrix and the top-K cosine neighbours of every article are stored,
+    one document per article: {_id: article id, neighbours: [{article_id, score}], updated_at}.
+
+    The job is incremental: only the articles inserted since the last run (job state
+    `last_article_id`) are compared, in blocks, to the `max_corpus` most recent articles.
+    Their lists are replaced and they are merged into the lists of their own neighbours,
+    so that older articles also point to the newer ones.
+
+    The term frequencies of the corpus are kept in memory between runs (column ids of a
+    process wide vocabulary): a run only loads the ids of the corpus and analyzes the
+    articles it has not seen yet, the TF-IDF weighting is then recomputed from the cache.
+    A rebuild empties the cache and writes a temporary collection renamed over the
+    neighbours once complete.
+    """
+
+    JOB_NAME = "article_similar"
+
+    top_k: int = 20
+    max_corpus: int = 50_000
+    block_size: int = 256
+    min_score: float = 0.05
+    field_weights: dict[str, float] = {"title": 2.0, "tags": 1.5, "description": 1.0}
+    max_vocabulary: int = 1_000_000
+    load_batch_size: int = 1_000
+
+    cache_expire: timedelta = timedelta(hours=1)
+
+    _vocabulary: dict[str, int] = {}
+    _terms: dict[ObjectId, tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def neighbours(cls):
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("article_similar")]
+
+    @staticmethod
+    def _articles():
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("article")]
+
+    @classmethod
+    def _cache_key(cls, article_id: str) -> str:
+        return f"article:similar:{article_id}"
+
+    @classmethod
+    def _load_corpus(cls) -> list[ObjectId]:
+        """
+        Ids of the `max_corpus` most recent articles, most recent first.
+        """
+        with MONGO_QUERY_TIME.time():
+            return [article["_id"] for article in cls._articles().find({}, projection={"_id": 1}).sort("_id", -1).limit(cls.max_corpus)]
+
+    @classmethod
+    def _term_frequencies(cls, article: dict) -> dict[str, float]:
+        return text_analyzer.term_frequencies([
+            (article.get("title") or "", cls.field_weights["title"]),
+            (" ".join(article.get("tags") or []), cls.field_weights["tags"]),
+            (article.get("description") or "", cls.field_weights["description"]),
+        ])[0]
+
+    @classmethod
+    def vectorize(cls, articles: list[dict]):
+        return tfidf_matrix([cls._term_frequencies(article) for article in articles])
+
+    @classmethod
+    def _clear_terms(cls):
+        cls._terms.clear()
+        cls._vocabulary.clear()
+
+    @classmethod
+    def _corpus_matrix(cls, article_ids: list[ObjectId]) -> sparse.csr_matrix:
+        """
+        TF-IDF matrix of the corpus (one row per id), analyzing only the articles missing from the cache.
+        """
+        if len(cls._vocabulary) > cls.max_vocabulary:
+            cls._clear_terms()
+
+        missing = [article_id for article_id in article_ids if article_id not in cls._terms]
+        for start in range(0, len(missing), cls.load_batch_size):
+            with MONGO_QUERY_TIME.time():
+                articles = list(cls._articles().find({"_id": {"$in": missing[start:start + cls.load_batch_size]}}, projection={"title": 1, "description": 1, "tags": 1}))
+            for article in articles:
+                frequencies = cls._term_frequencies(article)
+                columns = np.fromiter((cls._vocabulary.setdefault(term, len(cls._vocabulary)) for term in frequencies), dtype=np.int32, count=len(frequencies))
+                cls._terms[article["_id"]] = (columns, np.fromiter(frequencies.values(), dtype=np.float32, count=len(frequencies)))
+
+        corpus = set(article_ids)
+        for article_id in [article_id for article_id in cls._terms if article_id not in corpus]:
+            del cls._terms[article_id]
+
+        # an article deleted since the ids were read is an empty row
+        empty = (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32))
+        rows = [cls._terms.get(article_id, empty) for article_id in article_ids]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(columns) for columns, _ in rows])
+        matrix = sparse.csr_matrix(
+            (np.concatenate([values for _, values in rows]), np.concatenate([columns for columns, _ in rows]), indptr),
+            shape=(len(rows), len(cls._vocabulary)),
+            dtype=np.float32,
+        )
+        return tfidf_weight(matrix)
+
+    @classmethod
+    def _merge(cls, current: list[dict], additions: list[tuple[ObjectId, float]]) -> list[dict]:
+        scores = {neighbour["article_id"]: neighbour["score"] for neighbour in current}
+        for article_id, score in additions:
+            scores[article_id] = max(score, scores.get(article_id, 0.0))
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:cls.top_k]
+        return [{"article_id": article_id, "score": score} for article_id, score in best]
+
+    @classmethod
+    def run(cls, rebuild: bool = False) -> int:
+        """
+        Compute the neighbours of the articles inserted since the last run (of the whole
+        corpus when `rebuild`). Returns the number of neighbour lists written.
+        """
+        redis = RedisManagerInstance.get_instance()
+        lock_key = f"{cls._cache_key('job')}:lock"
+        if not redis.set(key=lock_key, value="1", ex=timedelta(hours=1), nx=True):
+            ApiLogger(f"[REDIS] [ARTICLE SIMILAR] [JOB] already running")
+            return 0
+
+        try:
+            last_article_id: Optional[ObjectId] = None if rebuild else JobState.get(cls.JOB_NAME).get("last_article_id")
+
+            api_logger = ApiLogger(f"[SCIPY] [ARTICLE SIMILAR] [JOB] : last article={last_article_id}, max corpus={cls.max_corpus} and top k={cls.top_k}")
+
+            if rebuild:
+                cls._clear_terms()
+
+            corpus = cls._load_corpus()
+            new_rows = np.array([row for row, article_id in enumerate(corpus) if last_article_id is None or article_id > last_article_id], dtype=np.int64)
+            if len(new_rows) == 0:
+                api_logger.print_log(extend_message="no new article")
+                return 0
+
+            matrix = cls._corpus_matrix(corpus)
+            neighbours = top_k_cosine(matrix, new_rows, k=cls.top_k, block_size=cls.block_size, min_score=cls.min_score)
+
+            now = datetime.now(timezone.utc)
+            is_new = np.zeros(len(corpus), dtype=bool)
+            is_new[new_rows] = True
+
+            lists = {}
+            reverse = defaultdict(list)
+            for row, row_neighbours in zip(new_rows, neighbours):
+                article_id = corpus[row]
+                lists[article_id] = [{"article_id": corpus[column], "score": score} for column, score in row_neighbours]
+                for column, score in row_neighbours:
+                    if not is_new[column]:
+                        reverse[corpus[column]].append((article_id, score))
+
+            # a rebuild is written aside and renamed over the neighbours: they are never empty
+            neighbours_collection = cls.neighbours()
+            target = neighbours_collection.database[f"{neighbours_collection.name}-rebuild"] if rebuild else neighbours_collection
+            with MONGO_QUERY_TIME.time():
+                if rebuild:
+                    target.drop()
+                if reverse:
+                    current = {document["_id"]: document.get("neighbours") or [] for document in target.find({"_id": {"$in": list(reverse)}})}
+                    for article_id, additions in reverse.items():
+                        lists[article_id] = cls._merge(current.get(article_id, []), additions)
+
+                operations = [UpdateOne({"_id": article_id}, {"$set": {"neighbours": neighbour_list, "updated_at": now}}, upsert=True) for article_id, neighbour_list in lists.items()]
+                for start in range(0, len(operations), 1_000):
+                    target.bulk_write(operations[start:start + 1_000], ordered=False)
+
+                if rebuild:
+                    target.rename(neighbours_collection.name, dropTarget=True)
+
+            pipeline = redis.pipeline()
+            for article_id in lists:
+                pipeline.delete(cls._cache_key(str(article_id)))
+            pipeline.execute()
+
+            JobState.save(cls.JOB_NAME, last_article_id=corpus[0], articles=len(corpus), processed=len(new_rows), written=len(lists))
+
+            api_logger.print_log(extend_message=f"{len(new_rows)} new articles and {len(lists)} neighbour lists")
+            return len(lists)
+        finally:
+            redis.delete(key=lock_key)
+
+    @classmethod
+    def run_in_background(cls, rebuild: bool = False):
+        thread = Thread(target=cls.run, args=(rebuild,))
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def get_similar(cls, article_id: str, limit: int = 10) -> list[ArticleSimilarModel]:
+        key = cls._cache_key(article_id)
+
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE SIMILAR] [GET] : {key}")
+        data_caching = RedisManagerInstance.get_instance().get(key=key)
+        if data_caching:
+            api_logger.print_log()
+            return [ArticleSimilarModel(**similar) for similar in json.loads(data_caching)[:limit]]
+        api_logger.print_error(message_error="Cache missing")
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE SIMILAR] [GET] : {article_id}")
+
+        with MONGO_QUERY_TIME.time():
+            document = cls.neighbours().find_one({"_id": ObjectId(article_id)}) or {}
+            neighbours = document.get("neighbours") or []
+            articles = {article["_id"]: article for article in cls._articles().find({"_id": {"$in": [neighbour["article_id"] for neighbour in neighbours]}})}
+
+        similar = [
+            ArticleSimilarModel(score=round(neighbour["score"], 4), article=ArticleSummaryModel(**articles[neighbour["article_id"]]).model_dump(by_alias=False, exclude_none=True))
+            for neighbour in neighbours if neighbour["article_id"] in articles
+        ]
+
+        RedisManagerInstance.get_instance().set(key=key, value=json.dumps([item.to_json() for item in similar], cls=MyJSONEncoder), ex=cls.cache_expire)
+
+        api_logger.print_log(extend_message=f"{len(similar)} articles")
+        return similar[:limit]
@@ -0,0 +1,264 @@
+import json
+from collections import defaultdict
+from datetime import datetime, timezone, timedelta
+from threading import Thread
+from typing import Optional
+
+import numpy as np
+from bson import ObjectId
+from flask_restx import Namespace, fields
+from pymongo import UpdateOne, UpdateMany
+
+from src.lib.database.nosql.document.mongodb.mongodb_manager import MongoDBManager, mongodb_client
+from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.log.api_logger import ApiLogger
+from src.lib.search.tfidf import top_k_cosine
+from src.lib.utility.utils import convert_str_to_datetime, MyJSONEncoder
+from src.models import DataBaseModel
+from src.models.article.article_model import ArticleSummaryModel, ArticleModel
+from src.models.article.article_similar_model import ArticleSimilarityJob
+from src.models.server.job_state_model import JobState
+
+
+class ArticleStoryModel(DataBaseModel):
+    story_id: str
+    title: Optional[str] = None
+    article_count: int = 0
+    source_count: int = 0
+    sources: list[str] = []
+    first_published_at: Optional[str | datetime] = None
+    last_published_at: Optional[str | datetime] = None
+    representative: Optional[dict] = None
+
+    @staticmethod
+    def to_model(name_space: Namespace):
+        return name_space.model('ArticleStoryModel', {
+            'story_id': fields.String(required=True),
+            'title': fields.String(required=False),
+            'article_count': fields.Integer(required=True),
+            'source_count': fields.Integer(required=True),
+            'sources': fields.List(fields.String),
+            'first_published_at': fields.String(required=False),
+            'last_published_at': fields.String(required=False),
+            'representative': fields.Nested(ArticleSummaryModel.to_model(name_space), required=False),
+        })
+
+    @staticmethod
+    def to_model_list(name_space: Namespace):
+        return name_space.model('ArticleStoryModelList', {
+            'stories': fields.List(fields.Nested(ArticleStoryModel.to_model(name_space))),
+        })
+
+    @staticmethod
+    def to_model_details(name_space: Namespace):
+        return name_space.model('ArticleStoryDetailsModel', {
+            'story': fields.Nested(ArticleStoryModel.to_model(name_space)),
+            'articles': fields.List(fields.Nested(ArticleSummaryModel.to_model(name_space))),
+            'total': fields.Integer,
+            'page': fields.Integer,
+            'limit': fields.Integer,
+            'pageCount': fields.Integer,
+        })
+
+
+class ArticleStoryClusterer:
+    """
+    Groups the articles covering the same event into stories.
+
+    Online single-link clustering, run on each ingestion batch: the new articles (job state
+    `last_article_id`) are compared to the articles ingested in the last `window` with the
+    TF-IDF vectors of the similar articles job, in insertion order. A new article joins the
+    story of its most similar already clustered article when the cosine similarity reaches
+    `threshold`, and starts its own story otherwise (story id = id of its first article).
+
+    Articles get a `story_id` field and each story has one document in the story table:
+    {_id: story id, representative_id, title, article_count, sources, source_count,
+    first_published_at, last_published_at, updated_at}, so requests never compute similarities.
+    """
+
+    JOB_NAME = "article_story"
+
+    threshold: float = 0.35
+    window: timedelta = timedelta(days=2)
+    max_window: int = 20_000
+    neighbours_per_article: int = 10
+
+    top_window: timedelta = timedelta(hours=48)
+    cache_expire: timedelta = timedelta(minutes=2)
+
+    @classmethod
+    def stories(cls):
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("article_story")]
+
+    @classmethod
+    def init(cls):
+        try:
+            cls.stories().create_index([("last_published_at", -1), ("source_count", -1)])
+        except Exception as e:
+            print(e)
+        try:
+            ArticleModel.collection().create_index([("story_id", 1), ("published_at", -1)])
+        except Exception as e:
+            print(e)
+
+    @classmethod
+    def _load_window(cls) -> list[dict]:
+        since = ObjectId.from_datetime(datetime.now(timezone.utc) - cls.window)
+        projection = {"title": 1, "description": 1, "tags": 1, "source.name": 1, "published_at": 1, "story_id": 1}
+        with MONGO_QUERY_TIME.time():
+            articles = list(ArticleModel.collection().find({"_id": {"$gte": since}}, projection=projection).sort("_id", -1).limit(cls.max_window))
+        articles.reverse()
+        return articles
+
+    @classmethod
+    def run(cls) -> int:
+        """
+        Assign a story to the articles inserted since the last run. Returns the number of articles assigned.
+        """
+        redis = RedisManagerInstance.get_instance()
+        lock_key = "article:story:job:lock"
+        if not redis.set(key=lock_key, value="1", ex=timedelta(hours=1), nx=True):
+            ApiLogger(f"[REDIS] [ARTICLE STORY] [JOB] already running")
+            return 0
+
+        try:
+            last_article_id: Optional[ObjectId] = JobState.get(cls.JOB_NAME).get("last_article_id")
+
+            api_logger = ApiLogger(f"[SCIPY] [ARTICLE STORY] [JOB] : last article={last_article_id}, window={cls.window} and threshold={cls.threshold}")
+
+            window = cls._load_window()
+            new_rows = np.array([
+                row for row, article in enumerate(window)
+                if not article.get("story_id") and (last_article_id is None or article["_id"] > last_article_id)
+            ], dtype=np.int64)
+            if len(new_rows) == 0:
+                api_logger.print_log(extend_message="no new article")
+                return 0
+
+            matrix = ArticleSimilarityJob.vectorize(window)
+            neighbours = top_k_cosine(matrix, new_rows, k=cls.neighbours_per_article, min_score=cls.threshold)
+
+            story_ids = [article.get("story_id") for article in window]
+            members = defaultdict(list)
+            created = set()
+            # insertion order: an article can join a story started earlier in the same batch
+            for row, row_neighbours in zip(new_rows, neighbours):
+                story_id = next((story_ids[column] for column, _ in row_neighbours if story_ids[column]), None)
+                if story_id is None:
+                    story_id = str(window[row]["_id"])
+                    created.add(story_id)
+                story_ids[row] = story_id
+                members[story_id].append(window[row])
+
+            now = datetime.now(timezone.utc)
+            article_updates = []
+            story_updates = []
+            for story_id, articles in members.items():
+                article_updates.append(UpdateMany({"_id": {"$in": [article["_id"] for article in articles]}}, {"$set": {"story_id": story_id}}))
+
+                published = [p for p in (convert_str_to_datetime(article.get("published_at")) for article in articles) if p]
+                sources = sorted({(article.get("source") or {}).get("name") for article in articles} - {None, ""})
+
+                update = {
+                    "$inc": {"article_count": len(articles)},
+                    "$addToSet": {"sources": {"$each": sources}},
+                    "$set": {"updated_at": now},
+                }
+                if published:
+                    update["$min"] = {"first_published_at": min(published)}
+                    update["$max"] = {"last_published_at": max(published)}
+                if story_id in created:
+                    update["$setOnInsert"] = {"representative_id": articles[0]["_id"], "title": articles[0].get("title")}
+                story_updates.append(UpdateOne({"_id": story_id}, update, upsert=True))
+
+            with MONGO_QUERY_TIME.time():
+                for start in range(0, len(article_updates), 1_000):
+                    ArticleModel.collection().bulk_write(article_updates[start:start + 1_000], ordered=False)
+                for start in range(0, len(story_updates), 1_000):
+                    cls.stories().bulk_write(story_updates[start:start + 1_000], ordered=False)
+                cls.stories().update_many({"_id": {"$in": list(members)}}, [{"$set": {"source_count": {"$size": "$sources"}}}])
+
+            redis.delete_pattern("article:stories:*")
+
+            JobState.save(cls.JOB_NAME, last_article_id=window[-1]["_id"], processed=len(new_rows), stories=len(members), created=len(created))
+
+            api_logger.print_log(extend_message=f"{len(new_rows)} articles in {len(members)} stories ({len(created)} new)")
+            return len(new_rows)
+        finally:
+            redis.delete(key=lock_key)
+
+    @classmethod
+    def run_in_background(cls):
+        thread = Thread(target=cls.run)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def _representatives(cls, stories: list[dict]) -> dict:
+        representative_ids = [story["representative_id"] for story in stories if story.get("representative_id")]
+        with MONGO_QUERY_TIME.time():
+            return {article["_id"]: article for article in ArticleModel.collection().find({"_id": {"$in": representative_ids}})}
+
+    @classmethod
+    def _to_story(cls, story: dict, representatives: dict) -> ArticleStoryModel:
+        representative = representatives.get(story.get("representative_id"))
+        return ArticleStoryModel(
+            story_id=story["_id"],
+            title=story.get("title"),
+            article_count=story.get("article_count", 0),
+            source_count=story.get("source_count", 0),
+            sources=story.get("sources") or [],
+            first_published_at=story.get("first_published_at"),
+            last_published_at=story.get("last_published_at"),
+            representative=ArticleModel(**representative).to_summary() if representative else None,
+        )
+
+    @classmethod
+    def top_stories(cls, limit: int = 10) -> list[ArticleStoryModel]:
+        """
+        One representative per story of the last `top_window`, the most covered first.
+        """
+        key = f"article:stories:top:{limit}"
+
+        api_logger = ApiLogger(f"[REDIS] [ARTICLE STORY] [TOP] [GET] : {key}")
+        data_caching = RedisManagerInstance.get_instance().get(key=key)
+        if data_caching:
+            api_logger.print_log()
+            return [ArticleStoryModel(**story) for story in json.loads(data_caching)]
+        api_logger.print_error(message_error="Cache missing")
+
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE STORY] [TOP] : limit={limit}")
+
+        since = datetime.now(timezone.utc) - cls.top_window
+        with MONGO_QUERY_TIME.time():
+            stories = list(cls.stories().find({"last_published_at": {"$gte": since}}).sort([("source_count", -1), ("article_count", -1), ("last_published_at", -1)]).limit(limit))
+
+        representatives = cls._representatives(stories)
+        result = [cls._to_story(story, representatives) for story in stories]
+
+        RedisManagerInstance.get_instance().set(key=key, value=json.dumps([story.to_json() for story in result], cls=MyJSONEncoder), ex=cls.cache_expire)
+
+        api_logger.print_log(extend_message=f"{len(result)} stories")
+        return result
+
+    @classmethod
+    def get_story(cls, story_id: str, page: int = 1, limit: int = 10) -> Optional[tuple[ArticleStoryModel, list[ArticleModel]]]:
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE STORY] [GET] : story={story_id}, page={page} and limit={limit}")
+
+        with MONGO_QUERY_TIME.time():
+            story = cls.stories().find_one({"_id": story_id})
+        if story is None:
+            api_logger.print_error("Story not found")
+            return None
+
+        with MONGO_QUERY_TIME.time():
+            articles = [ArticleModel(**article) for article in ArticleModel.collection().find({"story_id": story_id}).sort("published_at", -1).skip((page - 1) * limit).limit(limit)]
+
+        api_logger.print_log()
+        return cls._to_story(story, cls._representatives([story])), articles
+
+
+if __name__ == '__main__':
+    ArticleStoryClusterer.init()
+    ArticleStoryClusterer.run()
@@ -0,0 +1,141 @@
+import time
+from datetime import datetime, timedelta
+from threading import Thread, Lock
+from typing import Optional
+
+from bson import ObjectId
+from flask_restx import Namespace, fields
+
+from src.lib.database.nosql.document.mongodb.mongodb_manager import MongoDBManager, mongodb_client
+from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+from src.lib.log.api_logger import ApiLogger
+from src.lib.search.prefix_suggester import PrefixSuggester
+from src.lib.utility.utils import convert_str_to_datetime
+from src.models import DataBaseModel
+from src.models.article.user_article_interaction_models import UserArticleInteractionModel
+
+
+class ArticleSuggestionModel(DataBaseModel):
+    article_id: str
+    title: str
+
+    @staticmethod
+    def to_model(name_space: Namespace):
+        return name_space.model('ArticleSuggestionModel', {
+            'article_id': fields.String(required=True),
+            'title': fields.String(required=True),
+        })
+
+    @staticmethod
+    def to_model_list(name_space: Namespace):
+        return name_space.model('ArticleSuggestionModelList', {
+            'suggestions': fields.List(fields.Nested(ArticleSuggestionModel.to_model(name_space))),
+        })
+
+
+class ArticleTitleSuggester(PrefixSuggester):
+    """
+    Title suggester of this process, built from the `max_articles` most recent articles
+    (popularity = number of interactions) and kept up to date by the articles saved in
+    this process and by a lazy refresh of the articles inserted by other processes. The
+    oldest titles are evicted past `max_articles`.
+    """
+
+    def __init__(self, max_articles: int = 200_000, refresh_interval: timedelta = timedelta(seconds=30), **kwargs):
+        super().__init__(max_texts=max_articles, **kwargs)
+        self.max_articles = max_articles
+        self.refresh_interval = refresh_interval
+        self.built = False
+        self._last_id: Optional[ObjectId] = None
+        self._last_refresh = 0.0
+        self._refresh_lock = Lock()
+
+    @staticmethod
+    def _articles():
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("article")]
+
+    def _load(self, articles: list[dict]) -> int:
+        popularity = UserArticleInteractionModel.count_by_article([str(article["_id"]) for article in articles])
+        added = 0
+        for article in articles:
+            article_id = str(article["_id"])
+            if self.add(article_id, article.get("title"), convert_str_to_datetime(article.get("published_at")), popularity.get(article_id, 0)):
+                added += 1
+            if self._last_id is None or article["_id"] > self._last_id:
+                self._last_id = article["_id"]
+        return added
+
+    def build(self, batch_size: int = 5_000) -> int:
+        api_logger = ApiLogger(f"[MONGODB] [ARTICLE SUGGEST] [BUILD] : max articles={self.max_articles}")
+
+        self.clear()
+        self._last_id = None
+
+        total = 0
+        batch = []
+        with MONGO_QUERY_TIME.time():
+            cursor = self._articles().find({}, projection={"title": 1, "published_at": 1}).sort("_id", -1).limit(self.max_articles).batch_size(batch_size)
+            for article in cursor:
+                batch.append(article)
+                if len(batch) >= batch_size:
+                    total += self._load(batch)
+                    batch = []
+        total += self._load(batch)
+
+        self.built = True
+        self._last_refresh = time.monotonic()
+
+        api_logger.print_log(extend_message=f"{total} titles")
+        return total
+
+    def build_in_background(self):
+        thread = Thread(target=self.build)
+        thread.daemon = True
+        thread.start()
+
+    def refresh(self, batch_size: int = 5_000) -> int:
+        """
+        Add the articles inserted since the last build or refresh, `batch_size` at a time.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return 0
+        try:
+            total = 0
+            batch = []
+            query = {"_id": {"$gt": self._last_id}} if self._last_id else {}
+            with MONGO_QUERY_TIME.time():
+                cursor = self._articles().find(query, projection={"title": 1, "published_at": 1}).sort("_id", 1).limit(self.max_articles).batch_size(batch_size)
+                for article in cursor:
+                    batch.append(article)
+                    if len(batch) >= batch_size:
+                        total += self._load(batch)
+                        batch = []
+            total += self._load(batch)
+            self._last_refresh = time.monotonic()
+            return total
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh_if_due(self):
+        if self.built and time.monotonic() - self._last_refresh >= self.refresh_interval.total_seconds():
+            self._last_refresh = time.monotonic()
+            thread = Thread(target=self.refresh)
+            thread.daemon = True
+            thread.start()
+
+    def add_article(self, article_id, title: str, published_at: str | datetime | None):
+        if self.built:
+            self.add(str(article_id), title, convert_str_to_datetime(published_at))
+
+    def suggest_articles(self, query: str, limit: int = 10) -> list[ArticleSuggestionModel]:
+        self._refresh_if_due()
+
+        api_logger = ApiLogger(f"[MEMORY] [ARTICLE SUGGEST] : query={query} and limit={limit}")
+
+        suggestions = [ArticleSuggestionModel(article_id=key, title=title) for key, title in self.suggest(query, limit=limit)]
+
+        api_logger.print_log()
+        return suggestions
+
+
+ARTICLE_TITLE_SUGGESTER = ArticleTitleSuggester()
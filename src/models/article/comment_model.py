@@ -92,6 +92,8 @@ class CommentModel(MongoDBBaseModel):
 
     def save(self, user_token: UserToken):
         self.comment_id = super().save(user_token)
+        if self.comment_id:
+            self.scache_get_all(user_token, extra_match={'article_id': self.article_id})
 
     def update_author(self, author: Optional[UserAuthor]):
         api_logger = ApiLogger(f"[MONGODB] [COMMENT] [UPDATE] [AUTHOR] : {self.user_id} ({author.to_json()})")
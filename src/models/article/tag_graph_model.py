@@ -0,0 +1,143 @@
+from collections import Counter
+from datetime import timedelta
+from itertools import combinations
+from threading import Thread
+from typing import Iterable
+
+from src.lib.database.nosql.document.mongodb.mongodb_manager import MongoDBManager, mongodb_client
+from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+from src.lib.database.nosql.graph.redis_graph import RedisWeightedGraph
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+from src.lib.log.api_logger import ApiLogger
+
+
+class TagGraph:
+    """
+    Tag co-occurrence graph: the weight of a tag node is its number of articles
+    (article-tag edges) and the weight of a tag-tag edge is the number of articles
+    carrying both tags. Updated on every insert and delete, so related tags and
+    suggestions are bounded graph traversals and never scan the articles.
+
+    A rebuild fills a temporary graph with the articles up to the last id at its start,
+    while the updates of concurrent saves go to both graphs, then renames it over the
+    graph: no article is counted twice and the graph is never empty. An article deleted
+    during the rebuild before being read is still subtracted from the new graph.
+    """
+
+    GRAPH = RedisWeightedGraph("tag", max_degree=500)
+    REBUILD_GRAPH = RedisWeightedGraph("tag:rebuild", max_degree=500)
+    REBUILD_KEY = "graph:tag:rebuild"
+
+    max_tags_per_article: int = 20
+
+    @classmethod
+    def _tags(cls, tags: Iterable[str]) -> list[str]:
+        return sorted({tag.strip() for tag in tags or [] if tag and tag.strip()})[:cls.max_tags_per_article]
+
+    @classmethod
+    def _weights(cls, tags_per_article: Iterable[Iterable[str]], step: float) -> tuple[Counter, Counter]:
+        nodes = Counter()
+        edges = Counter()
+        for tags in tags_per_article:
+            tags = cls._tags(tags)
+            for tag in tags:
+                nodes[tag] += step
+            for pair in combinations(tags, 2):
+                edges[pair] += step
+        return nodes, edges
+
+    @classmethod
+    def _update(cls, nodes: Counter, edges: Counter):
+        cls.GRAPH.update(nodes, edges)
+        if (nodes or edges) and RedisManagerInstance.get_instance().exists(cls.REBUILD_KEY):
+            cls.REBUILD_GRAPH.update(nodes, edges)
+
+    @classmethod
+    def record_articles(cls, tags_per_article: Iterable[Iterable[str]]):
+        cls._update(*cls._weights(tags_per_article, 1))
+
+    @classmethod
+    def remove_article(cls, tags: Iterable[str]):
+        cls._update(*cls._weights([tags], -1))
+
+    @classmethod
+    def is_built(cls) -> bool:
+        return cls.GRAPH.node_count() > 0
+
+    @classmethod
+    def rebuild(cls, batch_size: int = 5_000) -> int:
+        if not RedisManagerInstance.get_instance().set(key="graph:tag:rebuild:lock", value="1", ex=timedelta(hours=1), nx=True):
+            ApiLogger(f"[REDIS] [TAG GRAPH] [REBUILD] already running")
+            return 0
+
+        redis = RedisManagerInstance.get_instance()
+        api_logger = ApiLogger(f"[MONGODB] [TAG GRAPH] [REBUILD]")
+
+        total = 0
+        try:
+            cls.REBUILD_GRAPH.clear()
+            # from now on the saves also update the new graph: it only reads the older articles
+            redis.set(key=cls.REBUILD_KEY, value="1", ex=timedelta(hours=1))
+
+            articles = mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("article")]
+            with MONGO_QUERY_TIME.time():
+                last = articles.find_one({}, projection={"_id": 1}, sort=[("_id", -1)])
+
+            if last is not None:
+                batch = []
+                with MONGO_QUERY_TIME.time():
+                    for article in articles.find({"_id": {"$lte": last["_id"]}, "tags.0": {"$exists": True}}, projection={"_id": 0, "tags": 1}, batch_size=batch_size):
+                        batch.append(article["tags"])
+                        if len(batch) >= batch_size:
+                            cls.REBUILD_GRAPH.update(*cls._weights(batch, 1))
+                            total += len(batch)
+                            batch = []
+                cls.REBUILD_GRAPH.update(*cls._weights(batch, 1))
+                total += len(batch)
+
+            moved = cls.GRAPH.replace(cls.REBUILD_GRAPH)
+        except Exception as e:
+            api_logger.print_error(message_error=f"{e} after {total} articles")
+            raise
+        finally:
+            redis.delete(key=cls.REBUILD_KEY)
+            cls.REBUILD_GRAPH.clear()
+            redis.delete(key="graph:tag:rebuild:lock")
+
+        api_logger.print_log(extend_message=f"{total} articles and {moved} tags")
+        return total
+
+    @classmethod
+    def rebuild_in_background(cls):
+        thread = Thread(target=cls.rebuild)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def _counts(cls, tags: list[tuple[str, float]]) -> list[tuple[str, int]]:
+        weights = cls.GRAPH.node_weights([tag for tag, _ in tags])
+        return [(tag, int(weights.get(tag, 0))) for tag, _ in tags]
+
+    @classmethod
+    def related_tags(cls, tag: str, limit: int = 10) -> list[tuple[str, int]]:
+        """
+        (tag, number of articles) of the tags most often seen with the tag.
+        """
+        api_logger = ApiLogger(f"[REDIS] [TAG GRAPH] [RELATED] : tag={tag} and limit={limit}")
+
+        related = cls._counts(cls.GRAPH.related(tag.strip(), limit=limit))
+
+        api_logger.print_log()
+        return related
+
+    @classmethod
+    def suggest_tags(cls, preferences: list[str], limit: int = 10) -> list[tuple[str, int]]:
+        """
+        (tag, number of articles) close to the preferences (2 hops), that are not already preferences.
+        """
+        api_logger = ApiLogger(f"[REDIS] [TAG GRAPH] [SUGGEST] : preferences={preferences} and limit={limit}")
+
+        suggestions = cls._counts(cls.GRAPH.expand(cls._tags(preferences), limit=limit, hops=2))
+
+        api_logger.print_log()
+        return suggestions
@@ -0,0 +1,163 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional, Iterable
+
+from flask_restx import Namespace, fields
+from bson import ObjectId
+from pydantic import Field
+from pymongo import UpdateOne, ReplaceOne
+
+from src.lib.database.nosql.document.mongodb.base import MongoDBBaseModel
+from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+from src.lib.log.api_logger import ApiLogger
+from src.lib.search import text_analyzer
+
+
+def normalize_tag(tag: str) -> str:
+    return " ".join(text_analyzer.normalize(tag).split())
+
+
+class TagModel(MongoDBBaseModel):
+    """
+    Dictionary of the article tags, maintained incrementally on ingest.
+
+    The normalized tag is the document id, so a prefix search is an anchored
+    range scan on the _id index: normalized >= prefix and < prefix + U+FFFF.
+    """
+    normalized: str = Field(alias="_id")
+    tag: str
+    article_count: int = 0
+    last_seen: Optional[datetime] = None
+
+    @classmethod
+    def _name(cls) -> str:
+        return "tag"
+
+    @classmethod
+    def _id_name(cls) -> str:
+        return "normalized"
+
+    def _data_id(self):
+        return self.normalized
+
+    @classmethod
+    def init(cls):
+        try:
+            cls.collection().create_index([("article_count", -1)])
+        except Exception as e:
+            print(e)
+
+    @staticmethod
+    def to_model(name_space: Namespace):
+        return name_space.model('TagModel', {
+            'tag': fields.String(required=True),
+            'article_count': fields.Integer(required=False),
+            'last_seen': fields.DateTime(required=False),
+        })
+
+    @classmethod
+    def record_tags(cls, tags_per_article: Iterable[Iterable[str]], seen_at: Optional[datetime] = None) -> int:
+        """
+        Count the tags of newly inserted articles (one iterable of tags per article).
+        """
+        seen_at = seen_at or datetime.now(timezone.utc)
+
+        counts = Counter()
+        display = {}
+        for tags in tags_per_article:
+            for normalized, tag in {normalize_tag(tag): tag for tag in tags or [] if tag and tag.strip()}.items():
+                counts[normalized] += 1
+                display.setdefault(normalized, tag.strip())
+        if not counts:
+            return 0
+
+        api_logger = ApiLogger(f"[MONGODB] [TAG] [RECORD] : {len(counts)} tags")
+
+        operations = [
+            UpdateOne(
+                {"_id": normalized},
+                {
+                    "$inc": {"article_count": count},
+                    "$max": {"last_seen": seen_at},
+                    "$set": {"updated_at": seen_at},
+                    "$setOnInsert": {"tag": display[normalized], "created_at": seen_at},
+                },
+                upsert=True
+            )
+            for normalized, count in counts.items()
+        ]
+        with MONGO_QUERY_TIME.time():
+            cls.collection().bulk_write(operations, ordered=False)
+
+        api_logger.print_log()
+        return len(counts)
+
+    @classmethod
+    def remove_tags(cls, tags: Iterable[str]) -> int:
+        normalized_tags = {normalize_tag(tag) for tag in tags or [] if tag and tag.strip()}
+        if not normalized_tags:
+            return 0
+
+        api_logger = ApiLogger(f"[MONGODB] [TAG] [REMOVE] : {normalized_tags}")
+
+        with MONGO_QUERY_TIME.time():
+            cls.collection().update_many({"_id": {"$in": list(normalized_tags)}}, {"$inc": {"article_count": -1}})
+
+        api_logger.print_log()
+        return len(normalized_tags)
+
+    @classmethod
+    def replace_all(cls, tag_counts: dict[str, tuple[str, int, Optional[datetime]]], started_at: datetime, batch_size: int = 1_000) -> int:
+        """
+        Replace the dictionary with the given normalized tag -> (tag, article count, last seen),
+        counted from the articles as of `started_at`.
+
+        The rebuilt tags are marked with a new generation; the tags of another generation not
+        recorded since `started_at` (record_tags running during the rebuild) are deleted.
+        """
+        api_logger = ApiLogger(f"[MONGODB] [TAG] [REPLACE ALL] : {len(tag_counts)} tags")
+
+        generation = ObjectId()
+        now = datetime.now(timezone.utc)
+        operations = [
+            ReplaceOne(
+                {"_id": normalized},
+                {"tag": tag, "article_count": count, "last_seen": last_seen, "generation": generation, "created_at": now, "updated_at": now},
+                upsert=True
+            )
+            for normalized, (tag, count, last_seen) in tag_counts.items()
+        ]
+
+        with MONGO_QUERY_TIME.time():
+            for start in range(0, len(operations), batch_size):
+                cls.collection().bulk_write(operations[start:start + batch_size], ordered=False)
+            deleted = cls.collection().delete_many({"generation": {"$ne": generation}, "updated_at": {"$not": {"$gte": started_at}}}).deleted_count
+
+        api_logger.print_log(extend_message=f"{deleted} tags deleted")
+        return len(operations)
+
+    @classmethod
+    def search(cls, prefix: Optional[str] = None, limit: Optional[int] = None) -> list["TagModel"]:
+        """
+        Tags starting with the prefix (all tags without prefix), most used first.
+        """
+        query = {"article_count": {"$gt": 0}}
+        normalized_prefix = normalize_tag(prefix) if prefix else ""
+        if normalized_prefix:
+            query["_id"] = {"$gte": normalized_prefix, "$lt": normalized_prefix + "\uffff"}
+
+        api_logger = ApiLogger(f"[MONGODB] [TAG] [SEARCH] : prefix={normalized_prefix} and limit={limit}")
+
+        with MONGO_QUERY_TIME.time():
+            cursor = cls.collection().find(query).sort([("article_count", -1), ("_id", 1)])
+            if limit:
+                cursor = cursor.limit(limit)
+            tags = [cls(**tag) for tag in cursor]
+
+        api_logger.print_log()
+        return tags
+
+    @classmethod
+    def count(cls) -> int:
+        with MONGO_QUERY_TIME.time():
+            return cls.collection().estimated_document_count()
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from datetime import datetime, timezone
+
+import json
+from datetime import datetime, timezone, timedelta
 from typing import Optional, Literal
 
 from bson import ObjectId
@@ -10,9 +12,12 @@ from pymongo.errors import DuplicateKeyError
 from src.lib.database.nosql.document.mongodb.base import MongoDBBaseModel
 from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
 from src.lib.database.nosql.document.mongodb.objectid import PydanticObjectId
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
 from src.lib.log.api_logger import ApiLogger
 from src.models import DataBaseModel
+from src.models.article.article_readers_model import ArticleReadersModel
 from src.models.user.auth_model import UserToken
+from src.models.user.user_tag_affinity_model import UserTagAffinity
 from src.models.user.user_model import UserAuthor
 
 
@@ -168,7 +173,7 @@ class UserArticleInteractionModel(MongoDBBaseModel):
         return self.interaction_id
 
     @classmethod
-    def update_interaction_read(cls, user_token: UserToken, article_id: str, article_title: str, comment_id: str = None):
+    def update_interaction_read(cls, user_token: UserToken, article_id: str, article_title: str, comment_id: str = None, article_tags: Optional[list[str]] = None):
         api_logger = ApiLogger(f"[MONGODB] [USER ARTICLE INTERACTION] [UPDATE] : user={user_token.user_id}, article={article_id} and comment={comment_id}")
         filter_key = {"user_id": user_token.user_id, "article_id": article_id}
         filter_key |= {"comment_id": comment_id} if comment_id else {}
@@ -196,8 +201,41 @@ class UserArticleInteractionModel(MongoDBBaseModel):
                 upsert=True
             )
         cls._scache(user_token, article_id)
+        if comment_id is None:
+            ArticleReadersModel.add_reader(article_id=article_id, user_id=user_token.user_id, read_at=datetime_operation)
+            cls._record_tag_affinity(user_token, article_id, UserTagAffinity.weight_read, article_tags=article_tags)
         api_logger.print_log(f"Update result: {result.modified_count > 0}")
 
+    @staticmethod
+    def _affinity_weight(interaction: UserArticleInteraction | ArticleInteractionType) -> float:
+        if isinstance(interaction, UserArticleInteraction):
+            return (
+                (UserTagAffinity.weight_liked if interaction.liked else 0.0)
+                + (UserTagAffinity.weight_saved if interaction.saved else 0.0)
+                + (UserTagAffinity.weight_shared if interaction.shared else 0.0)
+            )
+        if not interaction.value:
+            return 0.0
+        return {
+            'liked': UserTagAffinity.weight_liked,
+            'saved': UserTagAffinity.weight_saved,
+            'shared': UserTagAffinity.weight_shared,
+        }.get(interaction.type, 0.0)
+
+    @classmethod
+    def _record_tag_affinity(cls, user_token: UserToken, article_id: str, weight: float, article_tags: Optional[list[str]] = None):
+        if weight <= 0:
+            return
+        try:
+            if article_tags is None:
+                from src.models.article.article_model import ArticleModel
+
+                article = ArticleModel.get(user_token, article_id)
+                article_tags = article.tags if article else []
+            UserTagAffinity.record(user_token.user_id, article_tags, weight)
+        except Exception as e:
+            ApiLogger(f"[REDIS] [USER TAG AFFINITY] [RECORD] : user={user_token.user_id} and article={article_id}").print_error(message_error=str(e))
+
     @classmethod
     def update_interaction(cls, user_token: UserToken, interaction: UserArticleInteraction | ArticleInteractionType, article_id: str, comment_id: str = None):
         api_logger = ApiLogger(f"[MONGODB] [USER ARTICLE INTERACTION] [UPDATE] : user={user_token.user_id}, article={article_id}, comment={comment_id} and interaction={interaction}")
@@ -211,6 +249,9 @@ class UserArticleInteractionModel(MongoDBBaseModel):
         preview_interaction.update(interaction)
         b = preview_interaction.save(user_token)
 
+        if b is not None and comment_id is None:
+            cls._record_tag_affinity(user_token, article_id, cls._affinity_weight(interaction))
+
         api_logger.print_log()
 
         return not b is None
@@ -258,13 +299,19 @@ class UserArticleInteractionModel(MongoDBBaseModel):
         api_logger.print_log()
         stats_list = list(stats)
         if stats_list:
-            return ArticleInteractionStats(
+            interaction_stats = ArticleInteractionStats(
                 liked=stats_list[0]["liked"],
                 saved=stats_list[0]["saved"],
                 shared=stats_list[0]["shared"],
                 report=stats_list[0]["report"],
             )
-        return ArticleInteractionStats()
+        else:
+            interaction_stats = ArticleInteractionStats()
+        if comment_id is None:
+            readers = ArticleReadersModel.get_stats(article_id=article_id)
+            interaction_stats.unique_readers_today = readers.unique_readers_today
+            interaction_stats.unique_readers_week = readers.unique_readers_week
+        return interaction_stats
 
     @classmethod
     def read_history_count(cls, user_id: str):
@@ -291,6 +338,26 @@ class UserArticleInteractionModel(MongoDBBaseModel):
         api_logger.print_error(message_error=f"User Article Interaction does not exist")
         return []
 
+    @classmethod
+    def count_by_article(cls, article_ids: list[str]) -> dict[str, int]:
+        """
+        Number of interactions of each article (articles without interaction are missing).
+        """
+        if not article_ids:
+            return {}
+
+        api_logger = ApiLogger(f"[MONGODB] [USER ARTICLE INTERACTION] [COUNT BY ARTICLE] : {len(article_ids)} articles")
+
+        pipeline = [
+            {"$match": {"article_id": {"$in": article_ids}}},
+            {"$group": {"_id": "$article_id", "count": {"$sum": 1}}},
+        ]
+        with MONGO_QUERY_TIME.time():
+            counts = {result["_id"]: result["count"] for result in cls.collection().aggregate(pipeline)}
+
+        api_logger.print_log()
+        return counts
+
 
 class UserArticleInteraction(DataBaseModel):
 
@@ -344,6 +411,8 @@ class ArticleInteractionStats(DataBaseModel):
     shared: Optional[int] = 0
     saved: Optional[int] = 0
     report: Optional[int] = 0
+    unique_readers_today: Optional[int] = 0
+    unique_readers_week: Optional[int] = 0
 
     @staticmethod
     def to_model(name_space: Namespace):
@@ -352,6 +421,8 @@ class ArticleInteractionStats(DataBaseModel):
             'shared': fields.Integer(required=False),
             'saved': fields.Integer(required=False),
             'report': fields.Integer(required=False),
+            'unique_readers_today': fields.Integer(required=False),
+            'unique_readers_week': fields.Integer(required=False),
         })
 
 
@@ -361,6 +432,7 @@ class ArticleInteractionDashboard(DataBaseModel):
     save_count: int = 0
     share_count: int = 0
     total_interactions: int = 0
+    unique_readers: int = 0
 
     article_id: str
     extern_api: str
@@ -379,6 +451,7 @@ class ArticleInteractionDashboard(DataBaseModel):
             'save_count': fields.Integer(required=False),
             'share_count': fields.Integer(required=False),
             'total_interactions': fields.Integer(required=False),
+            'unique_readers': fields.Integer(required=False),
             'article_id': fields.String(required=False),
             'extern_api': fields.String(required=False),
             'title': fields.String(required=False),
@@ -394,7 +467,38 @@ class ArticleInteractionDashboard(DataBaseModel):
         })
 
     @classmethod
-    def get_most_interacted_articles(cls, date_check = None):
+    def _cache_most_interacted_articles_key(cls, date_check=None, limit: int = 5):
+        return f"interaction:dashboard:top:{date_check.strftime('%Y%m%d') if date_check else 'all'}:{limit}"
+
+    @classmethod
+    def _get_most_interacted_articles(cls, date_check=None, limit: int = 5):
+        key = cls._cache_most_interacted_articles_key(date_check, limit)
+
+        api_logger = ApiLogger(f"[REDIS] [USER ARTICLE INTERACTION] [DASHBOARD] [MOST INTERACTED ARTICLES] [GET] : {key}")
+        data_caching = RedisManagerInstance.get_instance().get(key=key)
+        if data_caching:
+            api_logger.print_log()
+            return [cls(**data) for data in json.loads(data_caching)]
+        api_logger.print_error(message_error="Cache missing")
+        return None
+
+    @classmethod
+    def _cache_most_interacted_articles(cls, stats: list, date_check=None, limit: int = 5, expire: Optional[timedelta] = timedelta(minutes=10)):
+        key = cls._cache_most_interacted_articles_key(date_check, limit)
+
+        api_logger = ApiLogger(f"[REDIS] [USER ARTICLE INTERACTION] [DASHBOARD] [MOST INTERACTED ARTICLES] [CACHE] : key={key} and expire={expire}")
+
+        RedisManagerInstance.get_instance().set(key=key, value=json.dumps([stat.to_json() for stat in stats]), ex=expire)
+
+        api_logger.print_log()
+
+    @classmethod
+    def get_most_interacted_articles(cls, date_check = None, limit: int = 5, refresh: bool = False):
+        if not refresh:
+            stats_cache = cls._get_most_interacted_articles(date_check, limit)
+            if stats_cache is not None:
+                return stats_cache
+
         api_logger = ApiLogger(f"[MONGODB] [USER ARTICLE INTERACTION] [DASHBOARD] [MOST INTERACTED ARTICLES] ")
 
         if date_check:
@@ -426,7 +530,7 @@ class ArticleInteractionDashboard(DataBaseModel):
                         'total_interactions': -1
                     }
                 }, {
-                    '$limit': 5
+                    '$limit': limit
                 }, {
                     '$lookup': {
                         'from': 'articles',
@@ -476,7 +580,7 @@ class ArticleInteractionDashboard(DataBaseModel):
                         'total_interactions': -1
                     }
                 }, {
-                    '$limit': 5
+                    '$limit': limit
                 }, {
                     '$lookup': {
                         'from': 'articles',
@@ -513,10 +617,16 @@ class ArticleInteractionDashboard(DataBaseModel):
         api_logger.print_log()
         # print(stat_list)
 
+        start = date_check.date() if date_check else None
         for stat in stat_list:
             stat['article_id'] = str(stat['article_id'])
+            stat['unique_readers'] = ArticleReadersModel.count_unique_readers(article_id=stat['article_id'], start=start)
+
+        stats = [cls(**data) for data in stat_list]
+
+        cls._cache_most_interacted_articles(stats, date_check, limit)
 
-        return [cls(**data) for data in stat_list]
+        return stats
 
 
 
@@ -1,6 +1,9 @@
 from src.helpers.externapi.externapi_base import LogRequest
 from src.lib.log.api_logger import ApiLogger
+from src.models.article.article_inbox_model import ArticleInbox
 from src.models.article.article_model import ArticleModel
+from src.models.article.article_recommendation_model import ArticleCollaborativeFilter
+from src.models.article.article_story_model import ArticleStoryClusterer
 from src.models.article.comment_model import CommentModel
 from src.models.article.user_article_interaction_models import UserArticleInteractionModel
 from src.models.user.user_model import User
@@ -18,6 +21,19 @@ def init_article_model():
     api_logger = ApiLogger(f"[MONGODB] [ARTICLE] [INDEX CREATION] ")
 
     ArticleModel.init()
+    ArticleStoryClusterer.init()
+
+    api_logger.print_log()
+
+
+def init_article_inbox():
+    if not ArticleInbox.enabled or ArticleInbox.is_ready():
+        return
+
+    api_logger = ApiLogger(f"[REDIS] [ARTICLE INBOX] [TAG INDEX CREATION] ")
+
+    users = User.collection().find({"preferences_enable": True, "preferences.0": {"$exists": True}}, projection={"preferences": 1})
+    ArticleInbox.rebuild_tag_index((str(user["_id"]), user["preferences"]) for user in users)
 
     api_logger.print_log()
 
@@ -34,6 +50,7 @@ def init_interaction_model():
     api_logger = ApiLogger(f"[MONGODB] [INTERACTION] [INDEX CREATION] ")
 
     UserArticleInteractionModel.init()
+    ArticleCollaborativeFilter.init()
 
     api_logger.print_log()
 
@@ -49,6 +66,7 @@ def init_article_log_request_model():
 def init_all_model():
     init_user_model()
     init_article_model()
+    init_article_inbox()
     init_comment_model()
     init_interaction_model()
     init_article_log_request_model()
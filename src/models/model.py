@@ -20,5 +20,6 @@ class Model:
     def get_search_model(name_space: Namespace):
         return name_space.model('SearchModel', {
             'search': fields.String(required=False),
+            'limit': fields.Integer(required=False),
         })
 
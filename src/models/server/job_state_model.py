@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+
+from src.lib.database.nosql.document.mongodb.mongodb_manager import MongoDBManager, mongodb_client
+from src.lib.database.nosql.document.mongodb.mongodb_monitoring_middleware import MONGO_QUERY_TIME
+
+
+class JobState:
+    """
+    Progress of the background jobs, one document per job: {_id: <job name>, ..., updated_at}.
+    """
+
+    @classmethod
+    def states(cls):
+        return mongodb_client[MongoDBManager.database_name()][MongoDBManager.collection_name("job_state")]
+
+    @classmethod
+    def get(cls, name: str) -> dict:
+        with MONGO_QUERY_TIME.time():
+            return cls.states().find_one({"_id": name}) or {}
+
+    @classmethod
+    def save(cls, name: str, **values) -> dict:
+        values["updated_at"] = datetime.now(timezone.utc)
+        with MONGO_QUERY_TIME.time():
+            cls.states().update_one({"_id": name}, {"$set": values}, upsert=True)
+        return values
+
+    @classmethod
+    def reset(cls, name: str):
+        with MONGO_QUERY_TIME.time():
+            cls.states().delete_one({"_id": name})
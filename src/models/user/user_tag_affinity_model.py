@@ -0,0 +1,130 @@
+import math
+import time
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from src.lib.database.nosql.keyvalue.redis.redis_manager import RedisManagerInstance
+
+
+class UserTagAffinity:
+    """
+    Implicit interest of a user in each tag, learned from reads, likes, saves and shares.
+
+    Forward decay: an event of weight w at time t adds w * exp((t - landmark) / tau) to
+    the score of every tag of the article, and the affinity at time `now` is
+    score * exp(-(now - landmark) / tau). An update is one HINCRBYFLOAT per tag of the
+    article and never reads the other tags; scores are only rescaled (and pruned to the
+    `max_tags` best) when the exponent grows too large or the hash too long. Both run in
+    one Lua script (RECORD_SCRIPT).
+
+    Redis hash user:{user_id}:tag_affinity = {tag: score, "__landmark__": epoch seconds}.
+    """
+
+    LANDMARK_FIELD = "__landmark__"
+
+    weight_read: float = 1.0
+    weight_liked: float = 3.0
+    weight_saved: float = 3.0
+    weight_shared: float = 4.0
+
+    half_life: timedelta = timedelta(days=14)
+    max_tags: int = 200
+    max_exponent: float = 30.0
+    expire: timedelta = timedelta(days=180)
+
+    @classmethod
+    def _key(cls, user_id: str) -> str:
+        return f"user:{user_id}:tag_affinity"
+
+    @classmethod
+    def _tau(cls) -> float:
+        return cls.half_life.total_seconds() / math.log(2)
+
+    # KEYS: the hash. ARGV: now, tau, max exponent, max tags, expire (seconds), weight, tags...
+    # The landmark read, the increments and the rescales run atomically: a concurrent record
+    # can neither use a stale landmark nor be lost by a rescale rewriting the hash.
+    RECORD_SCRIPT = """
+    local key = KEYS[1]
+    local now, tau = tonumber(ARGV[1]), tonumber(ARGV[2])
+    local max_exponent, max_tags = tonumber(ARGV[3]), tonumber(ARGV[4])
+    local expire, weight = tonumber(ARGV[5]), tonumber(ARGV[6])
+
+    local function rescale(landmark)
+        local values = redis.call('HGETALL', key)
+        local decay = math.exp(-(now - landmark) / tau)
+        local scores = {}
+        for i = 1, #values, 2 do
+            if values[i] ~= '__landmark__' then
+                scores[#scores + 1] = {values[i], tonumber(values[i + 1]) * decay}
+            end
+        end
+        table.sort(scores, function(a, b) return a[2] > b[2] end)
+        redis.call('DEL', key)
+        redis.call('HSET', key, '__landmark__', string.format('%.17g', now))
+        for i = 1, math.min(#scores, max_tags) do
+            redis.call('HSET', key, scores[i][1], string.format('%.17g', scores[i][2]))
+        end
+        return now
+    end
+
+    local landmark = tonumber(redis.call('HGET', key, '__landmark__'))
+    if not landmark then
+        landmark = now
+        redis.call('HSET', key, '__landmark__', string.format('%.17g', now))
+    elseif (now - landmark) / tau > max_exponent then
+        landmark = rescale(landmark)
+    end
+
+    local increment = string.format('%.17g', weight * math.exp((now - landmark) / tau))
+    for i = 7, #ARGV do
+        redis.call('HINCRBYFLOAT', key, ARGV[i], increment)
+    end
+    if redis.call('HLEN', key) > 2 * max_tags + 1 then
+        rescale(landmark)
+    end
+    redis.call('EXPIRE', key, expire)
+    return landmark
+    """
+
+    _record_script = None
+
+    @classmethod
+    def _script(cls):
+        if cls._record_script is None:
+            cls._record_script = RedisManagerInstance.get_instance().register_script(cls.RECORD_SCRIPT)
+        return cls._record_script
+
+    @classmethod
+    def record(cls, user_id: str, tags: Iterable[str], weight: float, now: Optional[float] = None):
+        tags = {tag.strip() for tag in tags or [] if tag and tag.strip()}
+        if not tags or weight <= 0:
+            return
+
+        now = now or time.time()
+        cls._script()(
+            keys=[cls._key(user_id)],
+            args=[now, cls._tau(), cls.max_exponent, cls.max_tags, int(cls.expire.total_seconds()), weight, *sorted(tags)],
+        )
+
+    @classmethod
+    def affinities(cls, user_id: str, now: Optional[float] = None) -> dict[str, float]:
+        values = RedisManagerInstance.get_instance().hgetall(cls._key(user_id))
+        landmark = values.pop(cls.LANDMARK_FIELD, None)
+        if not values or landmark is None:
+            return {}
+
+        decay = math.exp(-((now or time.time()) - float(landmark)) / cls._tau())
+        return {tag: float(score) * decay for tag, score in values.items()}
+
+    @classmethod
+    def top_tags(cls, user_id: str, limit: int = 10, min_affinity: float = 0.5) -> list[str]:
+        """
+        Tags the user is the most interested in, usable as automatic preferences.
+        """
+        affinities = cls.affinities(user_id)
+        best = sorted(affinities.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [tag for tag, affinity in best if affinity >= min_affinity]
+
+    @classmethod
+    def clear(cls, user_id: str):
+        RedisManagerInstance.get_instance().delete(cls._key(user_id))
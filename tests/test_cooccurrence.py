@@ -0,0 +1,74 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from src.lib.search.cooccurrence import ItemCooccurrence
+
+
+def _add(cooccurrence: ItemCooccurrence, users: list[int], items: list[int], weights: list[float]):
+    cooccurrence.add_users(np.array(users), np.array(items), np.array(weights, dtype=np.float32))
+
+
+def test_counts_norms_and_cosine():
+    cooccurrence = ItemCooccurrence(item_count=3)
+    _add(cooccurrence, [0, 0, 1, 1, 1], [0, 1, 0, 1, 2], [1, 1, 1, 1, 1])
+
+    counts = cooccurrence.counts.toarray()
+    assert counts[0, 1] == counts[1, 0] == 2
+    assert counts[0, 2] == counts[1, 2] == 1
+    assert np.all(counts.diagonal() == 0)
+    assert cooccurrence.norms.tolist() == [2, 2, 1]
+    assert cooccurrence.users == 2
+
+    cosine = cooccurrence.cosine().toarray()
+    assert cosine[0, 1] == pytest.approx(1.0)
+    assert cosine[0, 2] == pytest.approx(1 / np.sqrt(2))
+
+
+def test_chunks_add_up():
+    whole = ItemCooccurrence(item_count=3)
+    _add(whole, [0, 0, 1, 1, 1], [0, 1, 0, 1, 2], [1, 1, 1, 1, 1])
+
+    chunked = ItemCooccurrence(item_count=3)
+    _add(chunked, [0, 0], [0, 1], [1, 1])
+    _add(chunked, [0, 0, 0], [0, 1, 2], [1, 1, 1])
+
+    assert np.array_equal(whole.counts.toarray(), chunked.counts.toarray())
+    assert np.array_equal(whole.norms, chunked.norms)
+    assert chunked.users == 2
+
+
+def test_duplicate_user_items_are_summed():
+    cooccurrence = ItemCooccurrence(item_count=2)
+    _add(cooccurrence, [0, 0, 0], [0, 0, 1], [1, 2, 1])
+
+    assert cooccurrence.norms.tolist() == [9, 1]
+    assert cooccurrence.counts[0, 1] == 3
+
+
+def test_empty_chunk_is_ignored():
+    cooccurrence = ItemCooccurrence(item_count=2)
+    _add(cooccurrence, [], [], [])
+
+    assert cooccurrence.users == 0
+    assert cooccurrence.counts.nnz == 0
+
+
+def test_prune_keeps_strongest_pairs_and_bounds_new_ones():
+    cooccurrence = ItemCooccurrence(item_count=4, max_pairs=4)
+    _add(cooccurrence, [0, 0, 1, 1], [0, 1, 2, 3], [3, 3, 1, 1])
+    assert cooccurrence.prunes == 0
+
+    _add(cooccurrence, [0, 0], [0, 2], [1, 1])
+    assert cooccurrence.prunes == 1
+    assert cooccurrence.counts.nnz == 2
+    assert cooccurrence.counts[0, 1] == 9
+    assert cooccurrence.counts[2, 3] == 0
+    assert cooccurrence.error == 9
+
+    # seen again after the prune: its count restarts, its upper bound does not
+    _add(cooccurrence, [0, 0], [2, 3], [1, 1])
+    assert cooccurrence.counts[2, 3] == 1
+    assert cooccurrence.errors[2, 3] == 9
+    assert cooccurrence.errors[0, 1] == 0
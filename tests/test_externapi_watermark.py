@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+import pytest
+
+for module in ("requests", "bson", "pydantic", "pymongo", "redis", "dotenv"):
+    pytest.importorskip(module)
+
+from src.helpers.externapi.externapi_base import ExternApiBase
+
+SINCE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+NEWEST = datetime(2026, 1, 2, tzinfo=timezone.utc)
+
+
+def _state(pages: int, complete: bool, cursor=None, newest=None) -> dict:
+    return {"pages": pages, "cursor": cursor, "newest": newest, "complete": complete}
+
+
+def test_no_pages_does_not_move_the_watermark():
+    assert ExternApiBase._pending_watermark(SINCE, "a1", _state(0, True)) is None
+    assert ExternApiBase._pending_watermark(SINCE, "a1", _state(2, True, newest=None)) is None
+
+
+def test_complete_head_moves_the_watermark_without_backfill():
+    pending = ExternApiBase._pending_watermark(SINCE, "a1", _state(2, True, newest=(NEWEST, "b9")))
+    assert pending == {"published_at": NEWEST, "extern_id": "b9", "pages": 2}
+
+
+def test_capped_head_moves_the_watermark_and_backfills_down_to_the_previous_one():
+    pending = ExternApiBase._pending_watermark(SINCE, "a1", _state(5, False, cursor="page-5", newest=(NEWEST, "b9")))
+    assert pending["published_at"] == NEWEST
+    assert pending["extern_id"] == "b9"
+    assert pending["backfill"] == {"cursor": "page-5", "published_at": SINCE, "extern_id": "a1"}
+
+
+def test_capped_first_run_moves_the_watermark():
+    pending = ExternApiBase._pending_watermark(None, None, _state(5, False, cursor="page-5", newest=(NEWEST, "b9")))
+    assert pending["published_at"] == NEWEST
+    assert pending["backfill"] == {"cursor": "page-5", "published_at": None, "extern_id": None}
+
+
+def test_backfill_is_dropped_once_complete():
+    backfill = {"cursor": "page-5", "published_at": SINCE, "extern_id": "a1"}
+    assert ExternApiBase._pending_backfill(backfill, _state(3, True, cursor="page-8"), failed=False) is None
+
+
+def test_backfill_is_dropped_when_its_cursor_returns_nothing():
+    backfill = {"cursor": "page-5", "published_at": SINCE, "extern_id": "a1"}
+    assert ExternApiBase._pending_backfill(backfill, _state(0, False, cursor="page-5"), failed=False) is None
+
+
+def test_backfill_keeps_its_cursor_on_failure_or_when_capped():
+    backfill = {"cursor": "page-5", "published_at": SINCE, "extern_id": "a1"}
+
+    assert ExternApiBase._pending_backfill(backfill, _state(0, False, cursor="page-5"), failed=True) == backfill
+    assert ExternApiBase._pending_backfill(backfill, _state(3, False, cursor="page-8"), failed=False) == backfill | {"cursor": "page-8"}
@@ -0,0 +1,61 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.lib.search.minhash import MinHasher, shingles
+
+
+def test_shingles_are_word_pairs_of_the_analyzed_text():
+    assert shingles("The News of the Day, and the weather") == {"news day", "day weather"}
+    assert shingles("News") == {"news"}
+    assert shingles("") == set()
+    assert shingles(None) == set()
+
+
+def test_num_perm_must_be_a_multiple_of_bands():
+    with pytest.raises(ValueError):
+        MinHasher(num_perm=64, bands=10)
+
+
+def test_signature_is_deterministic():
+    features = {"election night", "night results"}
+    assert np.array_equal(MinHasher().signature(features), MinHasher().signature(features))
+
+
+def test_empty_features_signature():
+    hasher = MinHasher(num_perm=32, bands=8)
+    signature = hasher.signature(set())
+    assert signature.shape == (32,)
+    assert np.all(signature == signature[0])
+
+
+def test_similarity_of_identical_and_disjoint_sets():
+    hasher = MinHasher()
+    first = {f"word{i}" for i in range(50)}
+    second = {f"other{i}" for i in range(50)}
+
+    assert MinHasher.similarity(hasher.signature(first), hasher.signature(first)) == 1.0
+    assert MinHasher.similarity(hasher.signature(first), hasher.signature(second)) < 0.1
+
+
+def test_similarity_estimates_jaccard():
+    hasher = MinHasher(num_perm=256, bands=16)
+    first = {f"word{i}" for i in range(100)}
+    second = {f"word{i}" for i in range(50, 150)}
+
+    # Jaccard similarity 50 / 150
+    assert MinHasher.similarity(hasher.signature(first), hasher.signature(second)) == pytest.approx(1 / 3, abs=0.12)
+
+
+def test_band_keys():
+    hasher = MinHasher(num_perm=64, bands=16)
+    first = {f"word{i}" for i in range(40)}
+    near = first | {"word40"}
+    other = {f"other{i}" for i in range(40)}
+
+    keys = hasher.band_keys(hasher.signature(first))
+    assert len(keys) == 16
+    assert keys == hasher.band_keys(hasher.signature(set(first)))
+    # near duplicates share bands, unrelated texts do not
+    assert set(keys) & set(hasher.band_keys(hasher.signature(near)))
+    assert not set(keys) & set(hasher.band_keys(hasher.signature(other)))
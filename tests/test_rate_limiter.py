@@ -0,0 +1,60 @@
+import pytest
+
+from src.lib.utility import rate_limiter
+from src.lib.utility.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", fake.sleep)
+    return fake
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_burst_is_at_least_one(clock):
+    assert TokenBucket(rate=1, burst=0).burst == 1
+
+
+def test_burst_is_available_at_once(clock):
+    bucket = TokenBucket(rate=1, burst=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_tokens_refill_at_rate_up_to_burst(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    for _ in range(3):
+        assert bucket.try_acquire()
+
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    clock.now += 100
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_acquire_waits_for_the_next_token(clock):
+    bucket = TokenBucket(rate=2, burst=1)
+    start = clock.now
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire(tokens=1) == pytest.approx(0.5)
+    assert clock.now - start == pytest.approx(1.0)
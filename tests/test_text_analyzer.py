@@ -0,0 +1,44 @@
+from src.lib.search import text_analyzer
+
+
+def test_normalize_lowercases_and_strips_accents():
+    assert text_analyzer.normalize("Café ÉTÉ") == "cafe ete"
+
+
+def test_tokenize_splits_on_punctuation_and_underscores():
+    assert text_analyzer.tokenize("Hello, world! snake_case 2024") == ["hello", "world", "snake", "case", "2024"]
+    assert text_analyzer.tokenize("") == []
+
+
+def test_stem_plurals_and_verb_suffixes():
+    assert text_analyzer.stem("cars") == "car"
+    assert text_analyzer.stem("stories") == "story"
+    assert text_analyzer.stem("boxes") == "box"
+    assert text_analyzer.stem("classes") == "class"
+    assert text_analyzer.stem("running") == "run"
+    assert text_analyzer.stem("stopped") == "stop"
+    assert text_analyzer.stem("falling") == "fall"
+
+
+def test_stem_keeps_short_words_numbers_and_non_plurals():
+    for token in ("bus", "gas", "2024", "glass", "status", "analysis", "news", "series", "species", "politics"):
+        assert text_analyzer.stem(token) == token
+
+
+def test_stem_does_not_merge_news_with_new():
+    assert text_analyzer.stem("news") != text_analyzer.stem("new")
+
+
+def test_analyze_drops_stopwords_and_single_letters():
+    assert text_analyzer.analyze("The latest News about a Series of elections") == ["latest", "news", "series", "election"]
+
+
+def test_term_frequencies_weights_fields():
+    frequencies, length = text_analyzer.term_frequencies([("Election results", 2.0), ("election night", 1.0)])
+    assert frequencies == {"election": 3.0, "result": 2.0, "night": 1.0}
+    assert length == 6.0
+
+
+def test_trigrams_pad_words():
+    assert text_analyzer.trigrams("Cat") == {"  c", " ca", "cat", "at "}
+    assert text_analyzer.trigrams("") == set()
@@ -0,0 +1,76 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+sparse = pytest.importorskip("scipy.sparse")
+
+from src.lib.search.tfidf import tfidf_matrix, tfidf_weight, top_k_cosine, top_k_rows
+
+
+def test_tfidf_matrix_rows_are_normalized():
+    matrix = tfidf_matrix([{"a": 1.0, "b": 1.0}, {"a": 1.0, "c": 2.0}, {"d": 1.0}])
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    assert np.allclose(norms, 1.0, rtol=1e-5)
+
+
+def test_tfidf_matrix_identical_documents_have_cosine_one():
+    matrix = tfidf_matrix([{"vote": 1.0, "poll": 2.0}, {"vote": 1.0, "poll": 2.0}, {"goal": 1.0}])
+    assert (matrix[0] @ matrix[1].T).toarray()[0, 0] == pytest.approx(1.0, rel=1e-5)
+    assert (matrix[0] @ matrix[2].T).nnz == 0
+
+
+def test_tfidf_matrix_term_frequencies_are_sublinear():
+    # "a" is the first column and "b" the second, both in every document: same idf
+    matrix = tfidf_matrix([{"a": 1.0, "b": 10.0}, {"a": 1.0, "b": 1.0}]).toarray()
+    assert matrix[0, 1] / matrix[0, 0] == pytest.approx(1.0 + np.log(10.0), rel=1e-5)
+
+
+def test_tfidf_matrix_drops_terms_above_max_df():
+    documents = [{"common": 1.0, f"term{i}": 1.0} for i in range(12)]
+    matrix = tfidf_matrix(documents, max_df=0.5)
+    # "common" is the first column
+    assert matrix[:, 0].nnz == 0
+    assert matrix.nnz == 12
+    assert np.allclose(matrix.data, 1.0)
+
+
+def test_tfidf_weight_keeps_unused_columns_and_empty_matrices():
+    matrix = sparse.csr_matrix(np.array([[1.0, 2.0, 0.0, 0.0], [0.0, 1.0, 3.0, 0.0]], dtype=np.float32))
+    weighted = tfidf_weight(matrix)
+    assert weighted.shape == (2, 4)
+    assert weighted[:, 3].nnz == 0
+
+    empty = sparse.csr_matrix((3, 5), dtype=np.float32)
+    assert tfidf_weight(empty).nnz == 0
+
+
+def test_top_k_rows_best_first_without_excluded_column():
+    similarities = sparse.csr_matrix(np.array([
+        [1.0, 0.2, 0.8, 0.5],
+        [0.3, 1.0, 0.04, 0.0],
+    ], dtype=np.float32))
+
+    neighbours = top_k_rows(similarities, k=2, min_score=0.05, exclude=np.array([0, 1]))
+
+    assert [column for column, _ in neighbours[0]] == [2, 3]
+    assert [score for _, score in neighbours[0]] == pytest.approx([0.8, 0.5])
+    assert [column for column, _ in neighbours[1]] == [0]
+
+
+def test_top_k_rows_without_exclude_keeps_every_column():
+    similarities = sparse.csr_matrix(np.array([[0.1, 0.9, 0.4]], dtype=np.float32))
+    assert [column for column, _ in top_k_rows(similarities, k=5)[0]] == [1, 2, 0]
+
+
+def test_top_k_cosine_across_blocks():
+    matrix = tfidf_matrix([
+        {"election": 1.0, "vote": 1.0},
+        {"election": 1.0, "vote": 1.0, "result": 1.0},
+        {"football": 1.0, "goal": 1.0},
+    ])
+
+    neighbours = top_k_cosine(matrix, np.arange(3), k=2, block_size=2)
+
+    assert [column for column, _ in neighbours[0]] == [1]
+    assert [column for column, _ in neighbours[1]] == [0]
+    assert neighbours[2] == []
+    assert 0.0 < neighbours[0][0][1] < 1.0